@@ -2,17 +2,22 @@ import streamlit as st
 import json
 import os
 import difflib
+import re
+import uuid
 from datetime import datetime
-import matplotlib.pyplot as plt
-import plotly.express as px
-import pandas as pd
 from dotenv import load_dotenv
-from utils.file_utils import load_json, save_json, save_version, regenerate_content, summarize_changes, generate_module
+from utils.file_utils import save_json
 from utils.database import (
-    init_db, save_module_to_db, get_module_by_id, get_all_modules,
-    update_section_content, approve_section, reject_section, publish_module,
-    get_module_stats, export_module_to_json, get_section_versions
+    DEFAULT_WORKSPACE, SectionMergeConflict, StaleSectionError, create_workspace, current_workspace,
+    get_workspace_stats, init_all_workspaces, list_workspaces, replica_reads, use_workspace,
 )
+from utils.repository import create_repository
+from utils.models import Module, set_content_source
+from utils.jobs import ACTIVE_STATUSES, JobQueue, QueueFullError, create_job_store
+from utils.content_pack import open_pack
+from utils.state_store import CachedStateStore, create_state_store, module_namespace
+from utils.query_trace import tracing_enabled, start_capture, stop_capture, summarize, slow_queries
+from utils.review_log import create_review_log, review_event
 
 # Page config must be first
 st.set_page_config(
@@ -25,8 +30,43 @@ st.set_page_config(
 # Load environment variables
 load_dotenv()
 
-# Initialize database
-init_db()
+# One-time process-level initialization (schema migrations, shared state
+# store). Streamlit reruns this script on every interaction, so cache it.
+@st.cache_resource
+def init_backend():
+    # Storage backend (STORAGE_BACKEND=sqlite|postgres)
+    repository = create_repository()
+    repository.init_schema()
+    if not hasattr(repository, "connection"):
+        # SQLite: every workspace shard is migrated as well
+        init_all_workspaces()
+    # Section bodies are loaded lazily through the same backend
+    set_content_source(repository)
+    # Optional background archival/compaction (MAINTENANCE_INTERVAL_HOURS=0 disables)
+    interval = float(os.getenv("MAINTENANCE_INTERVAL_HOURS", "0"))
+    if interval > 0:
+        from utils.maintenance import start_maintenance_thread
+        start_maintenance_thread(interval)
+    # Optional periodic online snapshots (BACKUP_INTERVAL_HOURS=0 disables)
+    interval = float(os.getenv("BACKUP_INTERVAL_HOURS", "0"))
+    if interval > 0:
+        from utils.backup import start_backup_thread
+        start_backup_thread(interval)
+    state_store = create_state_store(repository=repository)
+    # Background workers for LLM generation, regeneration and summaries (JOB_WORKERS)
+    jobs = JobQueue(create_job_store(repository), repository, state_store).start()
+    # Append-only log of reviewer actions, with throughput metrics kept up to date
+    review_log = create_review_log(repository)
+    return repository, state_store, jobs, review_log
+
+repo, shared_state, jobs, review_log = init_backend()
+
+# Shared state store (edits, diff summaries, publish info) so that several
+# worker processes serve reviewers consistently. Reads are cached per rerun.
+state = CachedStateStore(shared_state)
+
+# Opt-in SQL tracing (SQL_TRACE=1): collect this rerun's queries for the debug panel
+rerun_queries = start_capture(reset=True) if tracing_enabled() else None
 
 # Enhanced Custom CSS with modern design
 dark_css = """
@@ -200,6 +240,21 @@ dark_css = """
         color: white;
     }
     
+    .bloom-remember {
+        background: linear-gradient(135deg, #6E7681, #8b949e);
+        color: white;
+    }
+    
+    .bloom-analyze {
+        background: linear-gradient(135deg, #8957E5, #a371f7);
+        color: white;
+    }
+    
+    .bloom-create {
+        background: linear-gradient(135deg, #DA3633, #f85149);
+        color: white;
+    }
+    
     /* Progress Section */
     .progress-container {
         background: linear-gradient(135deg, rgba(22, 27, 51, 0.8), rgba(13, 17, 35, 0.8));
@@ -326,49 +381,169 @@ dark_css = """
 </style>
 """
 
-# Load mock AI output
+# Generated modules are also saved here as JSON
 AI_OUTPUT_FILE = "sample_ai_output.json"
-APPROVED_FILE = "approved_lessons.json"
 VERSIONS_DIR = "ai_copilot_hil_edit/versions"
 
 # Ensure directories exist
 os.makedirs(VERSIONS_DIR, exist_ok=True)
 
-# Load data
-ai_data = load_json(AI_OUTPUT_FILE)
-approved_data = load_json(APPROVED_FILE) if os.path.exists(APPROVED_FILE) else {}
-
-# Session state for edits and approvals
-if 'edits' not in st.session_state:
-    st.session_state.edits = {}
-if 'approvals' not in st.session_state:
-    st.session_state.approvals = {}
-if 'rejections' not in st.session_state:
-    st.session_state.rejections = {}
-if 'last_saved' not in st.session_state:
-    st.session_state.last_saved = None
-if 'rejection_comments' not in st.session_state:
-    st.session_state.rejection_comments = {}
-if 'diff_summaries' not in st.session_state:
-    st.session_state.diff_summaries = {}
+# Browser-local navigation state and view cache only
 if 'editor_module_id' not in st.session_state:
     st.session_state.editor_module_id = None
+if 'module_views' not in st.session_state:
+    st.session_state.module_views = {}
+# Background jobs started from this session's Editor: {job id: (kind, section key)}
+if 'editor_jobs' not in st.session_state:
+    st.session_state.editor_jobs = {}
+# Reviewer ids as generated below
+REVIEWER_ID = re.compile(r"^[0-9a-f]{12}$")
+# Identifies this reviewer: owner of their drafts and jobs (fair scheduling).
+# Kept in the URL so a reload or another worker process finds the same drafts.
+if 'reviewer_id' not in st.session_state:
+    reviewer = st.query_params.get("reviewer", "")
+    st.session_state.reviewer_id = reviewer if REVIEWER_ID.match(reviewer) else uuid.uuid4().hex[:12]
+st.query_params["reviewer"] = st.session_state.reviewer_id
+# Reviewer actions not yet written to the review log: [(workspace, event)]
+if 'review_events' not in st.session_state:
+    st.session_state.review_events = []
+
+# Seconds between change-feed polls for live updates (0 disables)
+LIVE_REFRESH_SECONDS = float(os.getenv("LIVE_REFRESH_SECONDS", "5"))
 
 # Helper functions
+def load_module_view(module_id):
+    """Return a module, refreshing only the rows changed since this session last saw it."""
+    view = st.session_state.module_views.get(module_id)
+    if view is None:
+        # Take the cursor before loading so no change can slip in between
+        change_cursor = repo.get_change_cursor()
+        row = repo.get_module_by_id(module_id, include_content=False)
+        if not row:
+            return None
+        # Sections hold metadata only; bodies come from the shared content cache
+        module = Module.from_row(row)
+        st.session_state.module_views[module_id] = {'module': module, 'cursor': change_cursor}
+        return module
+
+    changes, view['cursor'] = repo.changes_since(view['cursor'], module_id=module_id)
+    if changes and not view['module'].apply_changes(changes, repo):
+        del st.session_state.module_views[module_id]
+        return None
+    return view['module']
+
+def live_updates(module_id):
+    """Rerun the page when another session changes the module being viewed."""
+    if LIVE_REFRESH_SECONDS <= 0 or not st.session_state.get('live_updates', True):
+        return
+
+    # Fragment reruns skip the page's use_workspace() block, so re-enter it
+    workspace = current_workspace()
+
+    @st.fragment(run_every=LIVE_REFRESH_SECONDS)
+    def _poll_changes():
+        view = st.session_state.module_views.get(module_id)
+        if view is None:
+            return
+        with use_workspace(workspace):
+            changes, _ = repo.changes_since(view['cursor'], module_id=module_id, limit=1)
+        if changes:
+            st.rerun()
+
+    _poll_changes()
+
+# Seconds between job status polls while this session has jobs in flight
+JOB_REFRESH_SECONDS = float(os.getenv("JOB_REFRESH_SECONDS", "1"))
+
+def log_review(action, module_id, section_id=None):
+    """Buffer a reviewer action for the review log (see flush_review_events)."""
+    st.session_state.review_events.append(
+        (current_workspace(), review_event(action, module_id, section_id, st.session_state.reviewer_id))
+    )
+
+def flush_review_events():
+    """Write this session's buffered reviewer actions, one batch per workspace."""
+    pending = st.session_state.review_events
+    by_workspace = {}
+    for workspace, event in pending:
+        by_workspace.setdefault(workspace, []).append(event)
+    for workspace, events in by_workspace.items():
+        with use_workspace(workspace):
+            review_log.record(events)
+        # Written batches are dropped right away, so a failure keeps only the rest
+        pending[:] = [(w, e) for w, e in pending if w != workspace]
+
+def job_updates(job_ids):
+    """Rerun the page once any of the given background jobs has finished."""
+    if not job_ids:
+        return
+
+    workspace = current_workspace()
+
+    @st.fragment(run_every=JOB_REFRESH_SECONDS)
+    def _poll_jobs():
+        with use_workspace(workspace):
+            statuses = jobs.get_many(list(job_ids))
+        if any(job['status'] not in ACTIVE_STATUSES for job in statuses.values()):
+            st.rerun()
+
+    _poll_jobs()
+
+def sql_debug_panel(queries):
+    """Sidebar panel listing the SQL statements executed during this rerun."""
+    total_ms = sum(q.seconds for q in queries) * 1000
+    with st.sidebar.expander(f"🐞 SQL: {len(queries)} queries • {total_ms:.1f} ms"):
+        for group in summarize(queries)[:15]:
+            st.caption(f"{group['calls']}× • {group['total_ms']:.2f} ms • {group['rows']} rows • {group['callers']}")
+            st.code(group['sql'], language="sql")
+        if slow_queries:
+            st.markdown("**Recent slow queries**")
+            for slow in list(slow_queries)[-5:]:
+                st.caption(f"{slow['ms']:.1f} ms • {slow['caller']}")
+                st.code(slow['sql'] + "\n-- " + "\n-- ".join(slow['plan']), language="sql")
+
 def bloom_badge(level):
-    colors = {
-        'Apply': 'bloom-apply',
-        'Understand': 'bloom-understand',
-        'Evaluate': 'bloom-evaluate'
-    }
-    return f'<span class="bloom-badge {colors.get(level, "")}">{level}</span>'
+    from utils.bloom import BLOOM_LEVELS, normalize_level
 
-def show_progress():
-    total_sections = len(ai_data['sections'])
-    approved_count = sum(st.session_state.approvals.values())
-    progress = approved_count / total_sections
-    st.progress(progress)
-    st.write(f"Progress: {approved_count}/{total_sections} sections approved")
+    level = normalize_level(level) or level
+    css_class = f"bloom-{level.lower()}" if level in BLOOM_LEVELS else ""
+    return f'<span class="bloom-badge {css_class}">{level}</span>'
+
+# Section list orderings: label -> Section score attribute (None keeps module order)
+SECTION_ORDERS = {
+    "Module order": None,
+    "Quality (lowest first)": "quality_score",
+    "Readability (lowest first)": "readability_score",
+    "Length (lowest first)": "length_score",
+    "Verb coverage (lowest first)": "coverage_score",
+}
+
+def section_filters(prefix):
+    """Sort and quality filter controls above a section list; returns (order, max quality)."""
+    col1, col2 = st.columns(2)
+    with col1:
+        order = st.selectbox("Sort sections", list(SECTION_ORDERS), key=f"{prefix}_order")
+    with col2:
+        below = st.slider("Show quality up to", 0, 100, 100, key=f"{prefix}_below")
+    return order, below
+
+def filter_sections(sections, order, below):
+    """(position, section) pairs at or below the quality cap, in the chosen order."""
+    numbered = [
+        (idx, section) for idx, section in enumerate(sections, 1)
+        if below >= 100 or (section.quality_score is not None and section.quality_score <= below)
+    ]
+    column = SECTION_ORDERS[order]
+    if column:
+        # Unscored sections go last
+        numbered.sort(key=lambda pair: (getattr(pair[1], column) is None, getattr(pair[1], column) or 0))
+    return numbered
+
+def quality_caption(section):
+    if section.quality_score is None:
+        return "Quality not scored yet"
+    return (f"Quality {section.quality_score:.0f} · readability {section.readability_score:.0f} · "
+            f"length {section.length_score:.0f} · verbs {section.coverage_score:.0f}")
 
 def animated_header():
     st.markdown('<div class="hero-header">🎓 AI Copilot: Smart Module Editor</div>', unsafe_allow_html=True)
@@ -381,10 +556,12 @@ def footer():
     """, unsafe_allow_html=True)
 
 def modules_page():
+    import pandas as pd
+
     animated_header()
     st.markdown("### 📚 Module Library")
     
-    modules = get_all_modules()
+    modules = repo.get_all_modules()
     
     if not modules:
         st.info("🎯 No modules in the database yet. Generate your first module to get started!")
@@ -429,8 +606,13 @@ def modules_page():
     )
     
     if selected_module_id:
-        module = get_module_by_id(selected_module_id)
-        stats = get_module_stats(selected_module_id)
+        module = load_module_view(selected_module_id)
+        if module is None:
+            # Deleted or archived since the list was loaded
+            st.warning(f"⚠️ Module {selected_module_id} was not found. It may have been deleted or archived.")
+            return
+        live_updates(selected_module_id)
+        stats = repo.get_module_stats(selected_module_id)
         
         # Stats cards
         col1, col2, col3, col4 = st.columns(4)
@@ -445,30 +627,43 @@ def modules_page():
         
         st.markdown("---")
         
+        # Published copy, read from the module's content pack
+        pack = open_pack(selected_module_id) if module.status == 'published' else None
+        if pack is not None:
+            st.caption(f"📦 Published {pack.meta['published_at']} UTC · {len(pack)} sections in the content pack")
+        
         # Display sections
         st.markdown("### 📋 Sections")
-        for idx, section in enumerate(module['sections'], 1):
-            with st.expander(f"{idx}. {section['title']} • {section['type'].replace('_', ' ').title()}", expanded=False):
-                st.markdown(f"**ID:** `{section['section_id']}`")
-                st.markdown(f"**Type:** {section['type']}")
-                if section['bloom_level']:
-                    st.markdown(f"**Bloom Level:** {section['bloom_level']}")
+        order, below = section_filters("library")
+        module.prefetch_content()
+        shown = filter_sections(module.sections, order, below)
+        if not shown:
+            st.info("No sections at or below that quality score.")
+        for idx, section in shown:
+            with st.expander(f"{idx}. {section.title} • {section.type.replace('_', ' ').title()}", expanded=False):
+                st.markdown(f"**ID:** `{section.section_id}`")
+                st.markdown(f"**Type:** {section.type}")
+                if section.bloom_level:
+                    st.markdown(f"**Bloom Level:** {section.bloom_level}")
+                st.caption(quality_caption(section))
                 
                 st.markdown("**Content:**")
-                st.text_area("", value=section['content'], height=100, disabled=True, key=f"view_{section['id']}")
+                st.text_area("", value=section.content, height=100, disabled=True, key=f"view_{section.id}")
+                if pack is not None and (section.id not in pack or pack.get_content(section.id) != section.content):
+                    st.caption("✏️ Changed since publishing; publish again to update the published copy.")
                 
                 # Status badge
-                if section['is_approved']:
+                if section.is_approved:
                     st.markdown('<span class="status-badge status-approved">✅ Approved</span>', unsafe_allow_html=True)
-                elif section['is_rejected']:
+                elif section.is_rejected:
                     st.markdown(f'<span class="status-badge status-rejected">❌ Rejected</span>', unsafe_allow_html=True)
-                    if section['rejection_comments']:
-                        st.caption(f"💬 {section['rejection_comments']}")
+                    if section.rejection_comments:
+                        st.caption(f"💬 {section.rejection_comments}")
                 else:
                     st.markdown('<span class="status-badge status-pending">⏳ Pending</span>', unsafe_allow_html=True)
                 
                 # Version history
-                versions = get_section_versions(section['id'])
+                versions = repo.get_section_versions(section.id)
                 if versions and len(versions) > 0:
                     with st.expander(f"📜 Version History ({len(versions)} versions)"):
                         for v_idx, v in enumerate(versions, 1):
@@ -487,7 +682,7 @@ def modules_page():
         col1, col2, col3 = st.columns([1, 1, 1])
         with col2:
             if st.button("📥 Export as JSON", use_container_width=True):
-                export_data = export_module_to_json(selected_module_id)
+                export_data = repo.export_module_to_json(selected_module_id)
                 st.json(export_data)
                 st.download_button(
                     label="⬇️ Download JSON",
@@ -509,6 +704,8 @@ def generate_module_page():
         st.session_state.generated_module = None
     if 'module_saved' not in st.session_state:
         st.session_state.module_saved = False
+    if 'generation_job' not in st.session_state:
+        st.session_state.generation_job = None
 
     # Input area
     user_prompt = st.text_area(
@@ -524,15 +721,29 @@ def generate_module_page():
             if not user_prompt.strip():
                 st.error("⚠️ Please provide a description for your module.")
             else:
-                with st.spinner("🤖 AI is generating your module..."):
-                    generated_data, error = generate_module("", "", user_prompt)
+                # Runs on a background worker; the job survives reruns and navigation
+                try:
+                    st.session_state.generation_job = jobs.submit(
+                        'generate_module', {'prompt': user_prompt}, owner=st.session_state.reviewer_id
+                    )
+                except QueueFullError:
+                    st.warning("⏳ Too many modules are waiting to be generated. Please try again in a few minutes.")
 
-                if error:
-                    st.error(f"❌ Generation failed: {error}")
-                else:
-                    st.success("🎉 Module generated successfully!")
-                    st.session_state.generated_module = generated_data
-                    st.session_state.module_saved = False
+    if st.session_state.generation_job:
+        job = jobs.get(st.session_state.generation_job)
+        if job is None:
+            st.session_state.generation_job = None
+        elif job['status'] in ACTIVE_STATUSES:
+            st.info("🤖 AI is generating your module... You can leave this page; the result will be waiting here.")
+            job_updates([job['id']])
+        else:
+            st.session_state.generation_job = None
+            if job['status'] == 'failed':
+                st.error(f"❌ Generation failed: {job['error']}")
+            else:
+                st.success("🎉 Module generated successfully!")
+                st.session_state.generated_module = job['result']
+                st.session_state.module_saved = False
 
     # Preview section
     if st.session_state.generated_module:
@@ -552,15 +763,34 @@ def generate_module_page():
             with col2:
                 if st.button("📝 Load into Editor", use_container_width=True, type="primary"):
                     try:
-                        module_id = save_module_to_db(
+                        from utils.bloom import classify_sections, get_classifier, tag_sections
+                        from utils.quality import queue_low_quality_regeneration
+
+                        # Normalize the LLM's Bloom tags and fill in missing ones locally
+                        classifier = get_classifier(repo)
+                        sections = tag_sections(st.session_state.generated_module['sections'], classifier)
+                        module_id = repo.save_module_to_db(
                             st.session_state.generated_module['module_title'], 
-                            st.session_state.generated_module['sections']
+                            sections
                         )
                         save_json(AI_OUTPUT_FILE, st.session_state.generated_module)
                         st.session_state.module_saved = True
                         # Set the editor module id so Editor loads this module immediately
                         st.session_state.editor_module_id = module_id
                         st.success(f"✅ Module saved! (ID: {module_id})")
+                        flagged = [
+                            f"{section['title']} (tagged {check['tagged']}, reads as {check['predicted']})"
+                            for section, check in zip(sections, classify_sections(sections, classifier))
+                            if not check['consistent']
+                        ]
+                        if flagged:
+                            st.warning("🔎 Bloom tags to double-check: " + "; ".join(flagged))
+                        # Weak sections get a rewrite queued before anyone reviews them
+                        queued = queue_low_quality_regeneration(jobs, repo.get_module_by_id(module_id))
+                        for key, job_id in queued.items():
+                            st.session_state.editor_jobs[job_id] = ('regenerate_section', key)
+                        if queued:
+                            st.info(f"✨ Regenerating {len(queued)} low-quality section(s) in the background.")
                         st.info("👉 Go to **Editor** to review and approve sections.")
                     except Exception as e:
                         st.error(f"❌ Error saving: {str(e)}")
@@ -572,10 +802,15 @@ def generate_module_page():
     footer()
 
 def editor_page():
+    import pandas as pd
+    # Bloom classification and quality scoring pull in numpy
+    from utils.bloom import classify_sections, get_classifier
+    from utils.quality import score_sections
+
     animated_header()
 
     # Get latest module
-    all_modules = get_all_modules()
+    all_modules = repo.get_all_modules()
     if not all_modules:
         st.info("🎯 No modules found. Generate a module first and load it into the editor.")
         return
@@ -583,63 +818,74 @@ def editor_page():
     # all_modules is ordered by created_at DESC (newest first) in the DB helper
     # pick index 0 as the newest module
     latest_module_id = all_modules[0]['id']
-    current_module = get_module_by_id(latest_module_id)
+    current_module = load_module_view(latest_module_id)
     
-    if not current_module or 'sections' not in current_module:
+    if not current_module:
         st.error("❌ Error loading module details.")
         return
     
-    sections_data = current_module['sections']
-    
-    # Initialize session state safely for the current module and avoid KeyErrors
-    if 'editor_module_id' not in st.session_state or st.session_state.editor_module_id != current_module['id']:
-        st.session_state.editor_module_id = current_module['id']
-
-        # Ensure core containers exist
-        if 'approvals' not in st.session_state:
-            st.session_state.approvals = {}
-        if 'edits' not in st.session_state:
-            st.session_state.edits = {}
-        if 'rejections' not in st.session_state:
-            st.session_state.rejections = {}
-        if 'rejection_comments' not in st.session_state:
-            st.session_state.rejection_comments = {}
-        if 'diff_summaries' not in st.session_state:
-            st.session_state.diff_summaries = {}
-
-        # Populate defaults for all current sections and build valid id set
-        valid_ids = set()
-        for section in sections_data:
-            # Prefer stable external section id; fallback to DB numeric id
-            sec_key = section.get('section_id') or section.get('id')
-            sec_key = str(sec_key)
-            valid_ids.add(sec_key)
-
-            # Populate missing entries
-            if sec_key not in st.session_state.approvals:
-                st.session_state.approvals[sec_key] = bool(section.get('is_approved', False))
-            if sec_key not in st.session_state.edits:
-                st.session_state.edits[sec_key] = section.get('content', '')
-            if sec_key not in st.session_state.rejections:
-                st.session_state.rejections[sec_key] = bool(section.get('is_rejected', False))
-            if sec_key not in st.session_state.rejection_comments:
-                st.session_state.rejection_comments[sec_key] = section.get('rejection_comments', '')
-            if sec_key not in st.session_state.diff_summaries:
-                st.session_state.diff_summaries[sec_key] = ''
-
-        # Remove keys from previous modules that are no longer valid
-        st.session_state.approvals = {k: v for k, v in st.session_state.approvals.items() if k in valid_ids}
-        st.session_state.edits = {k: v for k, v in st.session_state.edits.items() if k in valid_ids}
-        st.session_state.rejections = {k: v for k, v in st.session_state.rejections.items() if k in valid_ids}
-        st.session_state.rejection_comments = {k: v for k, v in st.session_state.rejection_comments.items() if k in valid_ids}
-        st.session_state.diff_summaries = {k: v for k, v in st.session_state.diff_summaries.items() if k in valid_ids}
+    sections_data = current_module.sections
+    
+    module_id = current_module.id
+    st.session_state.editor_module_id = module_id
+    if st.session_state.get('review_viewed') != (current_workspace(), module_id):
+        st.session_state.review_viewed = (current_workspace(), module_id)
+        log_review('view', module_id)
+    live_updates(module_id)
+
+    # Unsaved edits and diff summaries live in the shared state store, one
+    # namespace per reviewer so reviewers never overwrite each other's drafts.
+    # Quality rewrites queued in the background are shared suggestions, shown
+    # until the reviewer edits the section. Approval status comes straight
+    # from the database.
+    reviewer = st.session_state.reviewer_id
+    edits_ns = module_namespace(module_id, "edits", reviewer)
+    suggestions_ns = module_namespace(module_id, "edits")
+    summaries_ns = module_namespace(module_id, "diff_summaries", reviewer)
+    publish_ns = module_namespace(module_id, "publish")
+
+    # Collect finished regenerate/summary jobs (their results are already in the state store)
+    editor_jobs = st.session_state.editor_jobs
+    pending_jobs = {}
+    statuses = jobs.get_many(list(editor_jobs)) if editor_jobs else {}
+    for job_id, (kind, key) in list(editor_jobs.items()):
+        job = statuses.get(job_id)
+        if job is not None and job['status'] in ACTIVE_STATUSES:
+            pending_jobs[(kind, key)] = job_id
+            continue
+        del editor_jobs[job_id]
+        if job is None:
+            continue
+        if job['status'] == 'failed':
+            st.error(f"Error: {job['error']}")
+        elif kind == 'regenerate_section':
+            # Drop the widget's own value so the regenerated edit is shown
+            st.session_state.pop(f"edit_{key}", None)
+            st.success("✨ Regenerated!")
+
+    suggestions = state.get_all(suggestions_ns)
+    edits = {**suggestions, **state.get_all(edits_ns)}
+    diff_summaries = state.get_all(summaries_ns)
+
+    def discard_draft(key):
+        """Drop this reviewer's draft and the shared suggestion it may have come from."""
+        state.delete(edits_ns, key)
+        if key in suggestions:
+            state.delete(suggestions_ns, key)
+
+    approvals = {}
+    rejections = {}
+    for section in sections_data:
+        # Prefer stable external section id; fallback to DB numeric id
+        approvals[section.key] = bool(section.is_approved)
+        rejections[section.key] = bool(section.is_rejected)
 
     # Progress section with enhanced styling
     st.markdown('<div class="progress-container">', unsafe_allow_html=True)
     st.markdown("### 📊 Module Progress")
     total_sections = len(sections_data)
-    approved_count = sum(st.session_state.approvals.values())
-    rejected_count = sum(st.session_state.rejections.values())
+    approved_count = sum(approvals.values())
+    rejected_count = sum(rejections.values())
     progress = approved_count / total_sections if total_sections > 0 else 0
     
     col1, col2, col3 = st.columns(3)
@@ -654,8 +900,8 @@ def editor_page():
     st.markdown('</div>', unsafe_allow_html=True)
 
     # Check checkpoints
-    checkpoints = [s for s in sections_data if s['type'] in ['learning_objective', 'assessment']]
-    all_checkpoints_approved = all(st.session_state.approvals.get(s['section_id'], False) for s in checkpoints) if checkpoints else False
+    checkpoints = [s for s in sections_data if s.type in ['learning_objective', 'assessment']]
+    all_checkpoints_approved = all(approvals.get(s.key, False) for s in checkpoints) if checkpoints else False
 
     if not all_checkpoints_approved:
         st.warning("⚠️ **Critical:** All Learning Objectives and Assessments must be approved before publishing.")
@@ -665,18 +911,78 @@ def editor_page():
     with col2:
         if st.button("🚀 Publish Module", disabled=not all_checkpoints_approved, use_container_width=True, type="primary"):
             try:
-                publish_module(st.session_state.editor_module_id)
-                st.session_state.last_saved = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                repo.publish_module(module_id)
+                log_review('publish', module_id)
+                state.set(publish_ns, 'last_published', datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
                 st.balloons()
                 st.success("✅ Module published successfully! 🎉")
             except Exception as e:
                 st.error(f"❌ Error: {str(e)}")
 
-    if st.session_state.last_saved:
-        st.info(f"📅 Last published: {st.session_state.last_saved}")
+    last_published = state.get(publish_ns, 'last_published')
+    if last_published:
+        st.info(f"📅 Last published: {last_published}")
 
     st.markdown("---")
 
+    # Bulk actions: one transaction per action however many sections are picked
+    with st.expander("🗂️ Bulk Actions", expanded=bool(st.session_state.get('bulk_message'))):
+        if st.session_state.get('bulk_message'):
+            st.success(st.session_state.pop('bulk_message'))
+        by_key = {section.key: section for section in sections_data}
+        selected = st.multiselect(
+            "Sections", list(by_key), format_func=lambda key: by_key[key].title, key="bulk_selection"
+        )
+        bulk_comment = st.text_input("Reason for rejection:", key="bulk_comment")
+        bulk_col1, bulk_col2, bulk_col3, bulk_col4 = st.columns(4)
+        with bulk_col1:
+            approve_clicked = st.button("✅ Approve Selected", disabled=not selected, use_container_width=True)
+        with bulk_col2:
+            reject_clicked = st.button("❌ Reject Selected", disabled=not selected, use_container_width=True)
+        with bulk_col3:
+            save_clicked = st.button("💾 Save Selected Edits", disabled=not selected, use_container_width=True)
+        with bulk_col4:
+            open_checkpoints = [s.key for s in checkpoints if not approvals.get(s.key)]
+            checkpoints_clicked = st.button(
+                "🎯 Approve All Checkpoints", disabled=not open_checkpoints, use_container_width=True
+            )
+
+        targets = [by_key[key] for key in (open_checkpoints if checkpoints_clicked else selected)]
+        if approve_clicked or save_clicked or checkpoints_clicked:
+            # Pending edits are saved first, against the versions this page was rendered from
+            pending = {
+                s.id: edits[s.key] for s in targets
+                if s.key in edits and edits[s.key] != s.content
+            }
+            try:
+                repo.apply_edits(pending, {s.id: s.version for s in targets if s.id in pending})
+                for s in targets:
+                    if s.id in pending:
+                        discard_draft(s.key)
+                        st.session_state.pop(f"edit_{s.key}", None)
+                if save_clicked:
+                    st.session_state.bulk_message = f"💾 Saved {len(pending)} edit(s)."
+                else:
+                    repo.approve_sections([s.id for s in targets])
+                    for s in targets:
+                        log_review('accept', module_id, s.id)
+                    st.session_state.bulk_message = f"✅ Approved {len(targets)} section(s)."
+                st.rerun()
+            except StaleSectionError:
+                st.warning("⚠️ Another reviewer changed some of these sections; nothing was saved. "
+                           "Review them one by one.")
+            except Exception as e:
+                st.error(f"Error: {str(e)}")
+        elif reject_clicked:
+            try:
+                repo.reject_sections([s.id for s in targets], bulk_comment)
+                for s in targets:
+                    log_review('reject', module_id, s.id)
+                st.session_state.bulk_message = f"❌ Rejected {len(targets)} section(s)."
+                st.rerun()
+            except Exception as e:
+                st.error(f"Error: {str(e)}")
+
     # Two-column editor layout
     col1, col2 = st.columns(2)
 
@@ -686,16 +992,26 @@ def editor_page():
         st.markdown("### ✏️ Your Edits")
 
     # Sections
-    for idx, section in enumerate(sections_data, 1):
+    order, below = section_filters("editor")
+    current_module.prefetch_content()
+    classifier = get_classifier(repo)
+    bloom_checks = classify_sections(sections_data, classifier)
+    shown = filter_sections(sections_data, order, below)
+    if not shown:
+        st.info("No sections at or below that quality score.")
+    for idx, section in shown:
         st.markdown('<div class="section-card">', unsafe_allow_html=True)
         
-        badge = bloom_badge(section.get('bloom_level', '')) if 'bloom_level' in section else ''
-        # Normalize section identifier to match session_state keys (prefer external section_id)
-        section_id = str(section.get('section_id') or section.get('id'))
+        badge = bloom_badge(section.bloom_level or '')
+        # Normalize section identifier to match state keys (prefer external section_id)
+        section_id = section.key
         
         # Header
-        st.markdown(f"### {idx}. {section['title']} {badge}", unsafe_allow_html=True)
-        st.caption(f"Type: {section['type'].replace('_', ' ').title()}")
+        st.markdown(f"### {idx}. {section.title} {badge}", unsafe_allow_html=True)
+        st.caption(f"Type: {section.type.replace('_', ' ').title()} · {quality_caption(section)}")
+        check = bloom_checks[idx - 1]
+        if not check['consistent']:
+            st.caption(f"🔎 Tagged {check['tagged']}, but reads as **{check['predicted']}** ({check['confidence']:.0%})")
         
         # Two columns for content
         col1, col2 = st.columns(2)
@@ -703,85 +1019,122 @@ def editor_page():
         with col1:
             st.text_area(
                 "AI Version",
-                value=section['content'],
+                value=section.content,
                 height=180,
                 disabled=True,
-                key=f"ai_{section_id}",
+                key=f"ai_{section_id}_v{section.version}",
                 label_visibility="collapsed"
             )
 
         with col2:
             edited_text = st.text_area(
                 "Your Edit",
-                value=st.session_state.edits.get(section_id, section['content']),
+                value=edits.get(section_id, section.content),
                 height=180,
                 key=f"edit_{section_id}",
                 label_visibility="collapsed"
             )
-            st.session_state.edits[section_id] = edited_text
+            if edited_text != edits.get(section_id, section.content):
+                edits[section_id] = edited_text
+                state.set(edits_ns, section_id, edited_text)
+                log_review('edit', module_id, section.id)
+            if edited_text != section.content:
+                st.caption(f"Edited quality {score_sections([edited_text], [section.type])[0][0]:.0f}")
 
         # Action buttons
         btn_col1, btn_col2, btn_col3, btn_col4 = st.columns(4)
         
         with btn_col1:
             if st.button(f"✅ Accept", key=f"accept_{section_id}", use_container_width=True):
-                st.session_state.approvals[section_id] = True
-                st.session_state.rejections[section_id] = False
                 try:
-                    update_section_content(section['id'], edited_text)
-                    approve_section(section['id'])
+                    if edited_text != section.content:
+                        # Conditional save against the version this page was rendered from
+                        _, saved_content = repo.save_section_edit(section.id, edited_text, section.version)
+                        discard_draft(section_id)
+                        if saved_content != edited_text:
+                            st.session_state.pop(f"edit_{section_id}", None)
+                            st.info("🔀 Merged with changes saved by another reviewer.")
+                    repo.approve_section(section.id)
+                    log_review('accept', module_id, section.id)
+                    if edited_text != section.content:
+                        edited_check = classify_sections([{
+                            'title': section.title, 'content': edited_text, 'bloom_level': section.bloom_level
+                        }], classifier)[0]
+                        if not edited_check['consistent']:
+                            st.warning(f"🔎 The edited text reads as {edited_check['predicted']}, not {edited_check['tagged']}.")
+                    approvals[section_id] = True
+                    rejections[section_id] = False
                     st.success("✅ Accepted!")
+                except SectionMergeConflict as e:
+                    state.set(edits_ns, section_id, e.merged_content)
+                    st.session_state.pop(f"edit_{section_id}", None)
+                    st.warning("⚠️ Another reviewer changed this section. Resolve the marked conflicts and accept again.")
                 except Exception as e:
                     st.error(f"Error: {str(e)}")
         
         with btn_col2:
             if st.button(f"❌ Reject", key=f"reject_{section_id}", use_container_width=True):
-                st.session_state.approvals[section_id] = False
-                st.session_state.rejections[section_id] = True
+                approvals[section_id] = False
+                rejections[section_id] = True
                 comment = st.text_input(f"Reason for rejection:", key=f"comment_{section_id}")
-                st.session_state.rejection_comments[section_id] = comment
                 try:
-                    reject_section(section['id'], comment)
+                    repo.reject_section(section.id, comment)
+                    log_review('reject', module_id, section.id)
                     st.warning("❌ Rejected")
                 except Exception as e:
                     st.error(f"Error: {str(e)}")
         
         with btn_col3:
             if st.button(f"🔄 Reset", key=f"reset_{section_id}", use_container_width=True):
-                st.session_state.edits[section_id] = section['content']
+                discard_draft(section_id)
+                st.session_state.pop(f"edit_{section_id}", None)
                 st.info("🔄 Reset to AI version")
                 st.rerun()
         
         with btn_col4:
-            if st.button(f"✨ Regenerate", key=f"regenerate_{section_id}", use_container_width=True):
+            regenerating = ('regenerate_section', section_id) in pending_jobs
+            if st.button(f"✨ Regenerate", key=f"regenerate_{section_id}", use_container_width=True, disabled=regenerating):
                 try:
-                    new_content = regenerate_content(edited_text)
-                    st.session_state.edits[section_id] = new_content
-                    st.success("✨ Regenerated!")
-                    st.rerun()
+                    job_id = jobs.submit('regenerate_section', {
+                        'namespace': edits_ns, 'key': section_id, 'text': edited_text
+                    }, module_id=module_id, owner=st.session_state.reviewer_id)
+                    editor_jobs[job_id] = ('regenerate_section', section_id)
+                    log_review('regenerate', module_id, section.id)
+                    pending_jobs[('regenerate_section', section_id)] = job_id
+                    regenerating = True
                 except Exception as e:
                     st.error(f"Error: {str(e)}")
+            if regenerating:
+                st.caption("⏳ Regenerating...")
 
         # Show diff if edited
-        if edited_text != section['content']:
+        if edited_text != section.content:
             with st.expander("🔍 View Changes"):
                 diff = difflib.unified_diff(
-                    section['content'].splitlines(keepends=True),
+                    section.content.splitlines(keepends=True),
                     edited_text.splitlines(keepends=True),
                     fromfile='AI',
                     tofile='Edited'
                 )
                 st.code(''.join(diff), language='diff')
                 
-                if st.button(f"🧠 AI Explain Changes", key=f"diff_{section_id}"):
-                    if section_id not in st.session_state.diff_summaries:
+                summarizing = ('summarize_changes', section_id) in pending_jobs
+                if st.button(f"🧠 AI Explain Changes", key=f"diff_{section_id}", disabled=summarizing):
+                    if not diff_summaries.get(section_id):
                         try:
-                            summary = summarize_changes(section['content'], edited_text)
-                            st.session_state.diff_summaries[section_id] = summary
+                            job_id = jobs.submit('summarize_changes', {
+                                'namespace': summaries_ns, 'key': section_id,
+                                'before': section.content, 'after': edited_text
+                            }, module_id=module_id, owner=st.session_state.reviewer_id)
+                            editor_jobs[job_id] = ('summarize_changes', section_id)
+                            pending_jobs[('summarize_changes', section_id)] = job_id
+                            summarizing = True
                         except Exception as e:
                             st.error(f"Summary failed: {str(e)}")
-                    if section_id in st.session_state.diff_summaries:
-                        st.info(st.session_state.diff_summaries[section_id])
+                if summarizing:
+                    st.caption("⏳ Summarizing changes...")
+                elif diff_summaries.get(section_id):
+                    st.info(diff_summaries[section_id])
         
         st.markdown('</div>', unsafe_allow_html=True)
         st.markdown("<br>", unsafe_allow_html=True)
@@ -792,12 +1145,12 @@ def editor_page():
     
     status_data = []
     for section in sections_data:
-        # Normalize section identifier to match session_state keys
-        section_id = str(section.get('section_id') or section.get('id'))
+        # Normalize section identifier to match the approval keys
+        section_id = section.key
         
         # Safe key lookup with default values
-        is_approved = st.session_state.approvals.get(section_id, False)
-        is_rejected = st.session_state.rejections.get(section_id, False)
+        is_approved = approvals.get(section_id, False)
+        is_rejected = rejections.get(section_id, False)
         
         if is_approved:
             status = "✅ Approved"
@@ -810,25 +1163,50 @@ def editor_page():
             status_class = "status-pending"
         
         status_data.append({
-            "Section": section['title'],
-            "Type": section['type'].replace('_', ' ').title(),
+            "Section": section.title,
+            "Type": section.type.replace('_', ' ').title(),
             "Status": status
         })
 
     status_df = pd.DataFrame(status_data)
     st.dataframe(status_df, use_container_width=True, height=300)
 
+    job_updates(pending_jobs.values())
+    # This rerun's reviewer actions go to the review log as one batch
+    flush_review_events()
+
     footer()
 
+def format_minutes(seconds):
+    return "-" if seconds is None else f"{seconds / 60:.1f} min"
+
 def analytics_page():
+    # Heavy charting libraries are only needed on this page
+    import pandas as pd
+    import plotly.express as px
+    from utils.bloom import normalize_level
+
     animated_header()
     st.markdown("### 📊 Analytics Dashboard")
     st.caption("Comprehensive insights into your module development process")
 
+    # Analytics follow the module currently open in the Editor
+    all_modules = repo.get_all_modules()
+    if not all_modules:
+        st.info("🎯 No modules found. Generate a module first to see analytics.")
+        return
+    module = load_module_view(st.session_state.editor_module_id or all_modules[0]['id'])
+    if not module:
+        module = load_module_view(all_modules[0]['id'])
+    if module is None:
+        st.warning("⚠️ The module was not found. It may have been deleted or archived.")
+        return
+    sections_data = module.sections
+
     # Calculate stats
-    total_sections = len(ai_data['sections'])
-    approved_count = sum(st.session_state.approvals.values())
-    rejected_count = sum(st.session_state.rejections.values())
+    total_sections = len(sections_data)
+    approved_count = sum(1 for s in sections_data if s.is_approved)
+    rejected_count = sum(1 for s in sections_data if s.is_rejected)
     pending_count = total_sections - approved_count - rejected_count
 
     # Top metrics
@@ -848,8 +1226,8 @@ def analytics_page():
     col1, col2 = st.columns(2)
 
     bloom_counts = {}
-    for section in ai_data['sections']:
-        level = section.get('bloom_level', 'None')
+    for section in sections_data:
+        level = normalize_level(section.bloom_level) or section.bloom_level or 'None'
         bloom_counts[level] = bloom_counts.get(level, 0) + 1
 
     with col1:
@@ -913,15 +1291,61 @@ def analytics_page():
 
     st.markdown("---")
 
+    st.markdown("#### ⚙️ AI Job Queue")
+    queue_df = pd.DataFrame([
+        {'Priority': name, 'Queued': q['queued'], 'Running': q['running'],
+         'Oldest queued (s)': q['oldest_queued_s'], 'Started (1h)': q['started'],
+         'Wait p50 (s)': q['wait_p50_s'], 'Wait p95 (s)': q['wait_p95_s'], 'Refused': q['refused']}
+        for name, q in jobs.stats().items()
+    ])
+    st.dataframe(queue_df, use_container_width=True, hide_index=True)
+    st.markdown("---")
+
+    # Precomputed from the review log, so this does not scan the events
+    st.markdown("#### ⏱️ Reviewer Throughput")
+    throughput = review_log.summary()
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Median time to approval", format_minutes(throughput['median_time_to_approval']))
+    with col2:
+        rate = throughput['regenerations_per_approval']
+        st.metric("Regenerations per approval", "-" if rate is None else f"{rate:.2f}")
+    with col3:
+        per_module = throughput['sessions_per_module']
+        st.metric("Review sessions per module", "-" if per_module is None else f"{per_module:.1f}")
+    with col4:
+        st.metric("Sections approved", throughput['approved_sections'])
+    titles = {m['id']: m['module_title'] for m in all_modules}
+    module_rows = [row for row in review_log.module_metrics(limit=20) if row['module_id'] in titles]
+    if module_rows:
+        st.dataframe(pd.DataFrame([
+            {'Module': titles[row['module_id']], 'Sessions': row['sessions'], 'Reviewers': row['reviewers'],
+             'Approved': row['approved_sections'],
+             'Avg time to approval': format_minutes(row['avg_time_to_approval']),
+             'Regenerations': row['regenerations'], 'Edits': row['edits'], 'Rejects': row['rejects'],
+             'Last activity': str(row['last_event_at'])[:16]}
+            for row in module_rows
+        ]), use_container_width=True, hide_index=True)
+    st.markdown("---")
+
+    if SHARDED and len(list_workspaces()) > 1:
+        st.markdown("#### 🏢 Workspaces")
+        workspace_df = pd.DataFrame([
+            {'Workspace': name, **stats}
+            for name, stats in get_workspace_stats().items()
+        ])
+        st.dataframe(workspace_df, use_container_width=True, hide_index=True)
+        st.markdown("---")
+
     # Rejection log
     st.markdown("#### 📝 Rejection Log")
     rejection_data = []
-    for section in ai_data['sections']:
-        if st.session_state.rejections.get(section['id'], False):
-            comment = st.session_state.rejection_comments.get(section['id'], 'No comment')
+    for section in sections_data:
+        if section.is_rejected:
+            comment = section.rejection_comments
             rejection_data.append({
-                'Section': section['title'],
-                'Type': section['type'],
+                'Section': section.title,
+                'Type': section.type,
                 'Reason': comment if comment else 'No reason provided'
             })
     
@@ -933,6 +1357,22 @@ def analytics_page():
 
     footer()
 
+# Workspaces (SQLite only): each team's modules live in their own database shard
+SHARDED = not hasattr(repo, "connection")
+# Widget state tied to one workspace's sections, dropped when switching
+WORKSPACE_WIDGET_PREFIXES = ("ai_", "edit_", "comment_", "view_", "bulk_")
+
+def add_workspace():
+    """on_click for the New workspace button (runs before widgets are drawn)."""
+    name = st.session_state.new_workspace.strip().lower()
+    try:
+        create_workspace(name)
+    except ValueError as e:
+        st.session_state.workspace_error = str(e)
+        return
+    st.session_state.workspace = name
+    st.session_state.new_workspace = ""
+
 # Main app
 st.markdown(dark_css, unsafe_allow_html=True)
 
@@ -946,7 +1386,21 @@ with st.sidebar:
         ["🚀 Generate Module", "📝 Editor", "📚 Module Library", "📊 Analytics"],
         label_visibility="collapsed"
     )
-    
+
+    workspace = DEFAULT_WORKSPACE
+    if SHARDED:
+        st.markdown("---")
+        workspace = st.selectbox("🏢 Workspace", list_workspaces(), key="workspace")
+        with st.expander("➕ New workspace"):
+            st.text_input("Name", key="new_workspace", placeholder="e.g. biology-team")
+            st.button("Create", on_click=add_workspace, use_container_width=True)
+            if 'workspace_error' in st.session_state:
+                st.error(st.session_state.pop('workspace_error'))
+
+    st.markdown("---")
+    st.toggle("🔴 Live updates", value=True, key="live_updates",
+              help="Refresh automatically when another reviewer changes this module")
+
     st.markdown("---")
     st.markdown("### 💡 Quick Tips")
     st.caption("• Generate modules with AI")
@@ -954,11 +1408,32 @@ with st.sidebar:
     st.caption("• Track your progress")
     st.caption("• Publish when ready")
 
-if page == "🚀 Generate Module":
-    generate_module_page()
-elif page == "📝 Editor":
-    editor_page()
-elif page == "📚 Module Library":
-    modules_page()
-elif page == "📊 Analytics":
-    analytics_page()
\ No newline at end of file
+# Open modules, views and jobs belong to one workspace; start over after switching
+if st.session_state.get('active_workspace', workspace) != workspace:
+    st.session_state.editor_module_id = None
+    st.session_state.module_views = {}
+    st.session_state.editor_jobs = {}
+    for key in list(st.session_state):
+        if key in ('generation_job', 'generated_module') or key.startswith(WORKSPACE_WIDGET_PREFIXES):
+            del st.session_state[key]
+st.session_state.active_workspace = workspace
+
+# Actions buffered before an st.rerun() (e.g. bulk approve) are written here
+flush_review_events()
+
+with use_workspace(workspace):
+    if page == "🚀 Generate Module":
+        generate_module_page()
+    elif page == "📝 Editor":
+        editor_page()
+    elif page == "📚 Module Library":
+        # Browsing pages tolerate a few seconds of lag (READ_REPLICA=memory)
+        with replica_reads():
+            modules_page()
+    elif page == "📊 Analytics":
+        with replica_reads():
+            analytics_page()
+
+if rerun_queries is not None:
+    stop_capture(rerun_queries)
+    sql_debug_panel(rerun_queries)
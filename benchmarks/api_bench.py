@@ -0,0 +1,120 @@
+import argparse
+import http.client
+import json
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+
+# Ensure the project root is importable when running benchmarks directly
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from benchmarks.synthetic import use_temp_database, seed_database
+from utils import database
+from utils.api import ModuleAPI, create_server
+from utils.repository import create_repository
+
+
+class UncachedModuleAPI(ModuleAPI):
+    """Builds every response from the database (the baseline)."""
+
+    def _cached(self, key, build):
+        with self._lock:
+            self._refresh()
+            published = self._published
+        return build(published)
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def load(address, paths, headers, clients, seconds):
+    """Keep-alive clients requesting random paths until the deadline; returns req/s and latencies."""
+    latencies = [[] for _ in range(clients)]
+    deadline = time.perf_counter() + seconds
+
+    def client(n):
+        rng = random.Random(n)
+        conn = http.client.HTTPConnection(*address)
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            conn.request("GET", rng.choice(paths), headers=headers)
+            response = conn.getresponse()
+            response.read()
+            assert response.status in (200, 304), response.status
+            latencies[n].append((time.perf_counter() - started) * 1000)
+        conn.close()
+
+    threads = [threading.Thread(target=client, args=(n,)) for n in range(clients)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+    flat = [ms for per_client in latencies for ms in per_client]
+    return {
+        "requests_per_second": round(len(flat) / elapsed),
+        "p50_ms": round(statistics.median(flat), 2),
+        "p95_ms": round(_percentile(flat, 95), 2),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Requests/s of the published-module HTTP API")
+    parser.add_argument("--modules", type=int, default=100)
+    parser.add_argument("--sections", type=int, default=20, help="Sections per module")
+    parser.add_argument("--clients", type=int, default=8, help="Concurrent keep-alive clients")
+    parser.add_argument("--seconds", type=float, default=3)
+    parser.add_argument("--json", help="Write results to this JSON file")
+    args = parser.parse_args(argv)
+
+    use_temp_database()
+    module_ids = seed_database(args.modules, args.sections, words=120)
+    for module_id in module_ids:
+        database.publish_module(module_id)
+    module_paths = [f"/modules/{module_id}" for module_id in module_ids]
+
+    results = []
+    for name, api_class in (("uncached", UncachedModuleAPI), ("cached", ModuleAPI)):
+        server = create_server(api_class(create_repository("sqlite")), port=0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            # One pass fills the cache and collects the ETags for conditional requests
+            etags = {}
+            for path in module_paths:
+                conn = http.client.HTTPConnection(*server.server_address)
+                conn.request("GET", path)
+                response = conn.getresponse()
+                response.read()
+                etags[path] = response.getheader("ETag")
+                conn.close()
+            scenarios = {
+                "list": (["/modules?page=1", "/modules?page=2"], {}),
+                "module": (module_paths, {}),
+                "module gzip": (module_paths, {"Accept-Encoding": "gzip"}),
+                # Every client revalidates the same module, as an LMS polling for updates would
+                "module 304": (module_paths[:1], {"If-None-Match": etags[module_paths[0]]}),
+            }
+            for scenario, (paths, headers) in scenarios.items():
+                result = {"api": name, "scenario": scenario,
+                          **load(server.server_address, paths, headers, args.clients, args.seconds)}
+                results.append(result)
+                print(f"{name:>8} {scenario:<12} {result['requests_per_second']:>7,} req/s  "
+                      f"p50 {result['p50_ms']:>6.2f} ms  p95 {result['p95_ms']:>6.2f} ms")
+        finally:
+            server.shutdown()
+            server.server_close()
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
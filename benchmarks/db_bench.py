@@ -0,0 +1,253 @@
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+# Ensure the project root is importable when running benchmarks directly
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from benchmarks.synthetic import use_temp_database, seed_database, synthetic_sections, synthetic_text
+from utils import database
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+# (modules, sections per module, versions per section)
+SCALES = {
+    "small": (20, 10, 2),
+    "medium": (200, 20, 3),
+    "large": (1000, 40, 5),
+}
+
+OPERATIONS = [
+    "save_module_to_db",
+    "get_module_by_id",
+    "get_module_stats",
+    "update_section_content",
+    "get_section_versions",
+]
+
+
+class Workload:
+    """Calls the hot-path database functions with random but valid arguments."""
+
+    def __init__(self, module_ids, sections_per_module, seed=0):
+        self.module_ids = list(module_ids)
+        self.sections_per_module = sections_per_module
+        self.local = threading.local()
+        self.seed = seed
+        with database.get_db_connection() as conn:
+            self.section_ids = [row[0] for row in conn.execute("SELECT id FROM sections")]
+
+    @property
+    def rng(self):
+        if not hasattr(self.local, "rng"):
+            self.local.rng = random.Random(self.seed + threading.get_ident())
+        return self.local.rng
+
+    def call(self, operation):
+        rng = self.rng
+        if operation == "save_module_to_db":
+            database.save_module_to_db("Bench Module", synthetic_sections(rng, self.sections_per_module))
+        elif operation == "get_module_by_id":
+            database.get_module_by_id(rng.choice(self.module_ids))
+        elif operation == "get_module_stats":
+            database.get_module_stats(rng.choice(self.module_ids))
+        elif operation == "update_section_content":
+            database.update_section_content(rng.choice(self.section_ids), synthetic_text(rng))
+        elif operation == "get_section_versions":
+            database.get_section_versions(rng.choice(self.section_ids))
+        else:
+            raise ValueError(f"Unknown operation: {operation}")
+
+
+def summarize(samples, elapsed=None):
+    """Latency distribution in milliseconds for a list of per-call samples (seconds)."""
+    ordered = sorted(samples)
+    count = len(ordered)
+
+    def pct(p):
+        return round(ordered[min(count - 1, int(p / 100 * count))] * 1000, 3)
+
+    summary = {
+        "count": count,
+        "mean_ms": round(sum(ordered) / count * 1000, 3),
+        "p50_ms": pct(50),
+        "p90_ms": pct(90),
+        "p95_ms": pct(95),
+        "p99_ms": pct(99),
+        "max_ms": round(ordered[-1] * 1000, 3),
+    }
+    if elapsed:
+        summary["ops_per_second"] = round(count / elapsed, 1)
+    return summary
+
+
+def run_single(workload, iterations):
+    """Measure each operation on its own in the calling thread."""
+    results = {}
+    for operation in OPERATIONS:
+        samples = []
+        started = time.perf_counter()
+        for _ in range(iterations):
+            t = time.perf_counter()
+            workload.call(operation)
+            samples.append(time.perf_counter() - t)
+        results[operation] = summarize(samples, time.perf_counter() - started)
+    return results
+
+
+def run_concurrent(workload, threads, iterations):
+    """Run a mixed workload on several threads and report per-operation latency."""
+    samples = {operation: [] for operation in OPERATIONS}
+    errors = []
+    lock = threading.Lock()
+
+    def worker(n):
+        local = {operation: [] for operation in OPERATIONS}
+        for i in range(iterations):
+            operation = OPERATIONS[(n + i) % len(OPERATIONS)]
+            t = time.perf_counter()
+            try:
+                workload.call(operation)
+            except sqlite3.OperationalError as e:
+                errors.append(f"{operation}: {e}")
+                continue
+            local[operation].append(time.perf_counter() - t)
+        with lock:
+            for operation, values in local.items():
+                samples[operation].extend(values)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(worker, range(threads)))
+    elapsed = time.perf_counter() - started
+
+    results = {op: summarize(values, elapsed) for op, values in samples.items() if values}
+    results["_errors"] = len(errors)
+    results["_total_ops_per_second"] = round(sum(len(v) for v in samples.values()) / elapsed, 1)
+    return results
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, cwd=ROOT, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run(scales, iterations, threads):
+    report = {
+        "revision": git_revision(),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "scales": {},
+    }
+    for scale in scales:
+        modules, sections, versions = SCALES[scale]
+        workdir = tempfile.mkdtemp(prefix=f"db_bench_{scale}_")
+        use_temp_database(workdir)
+        t = time.perf_counter()
+        module_ids = seed_database(modules, sections, versions)
+        seed_seconds = time.perf_counter() - t
+
+        workload = Workload(module_ids, sections)
+        entry = {
+            "modules": modules,
+            "sections_per_module": sections,
+            "versions_per_section": versions,
+            "seed_seconds": round(seed_seconds, 3),
+            "single_threaded": run_single(workload, iterations),
+        }
+        for count in threads:
+            entry[f"threads_{count}"] = run_concurrent(workload, count, iterations)
+        report["scales"][scale] = entry
+        _print_scale(scale, entry)
+    return report
+
+
+def _print_scale(scale, entry):
+    print(f"\n== {scale}: {entry['modules']} modules x {entry['sections_per_module']} sections "
+          f"x {entry['versions_per_section']} versions (seeded in {entry['seed_seconds']}s)")
+    for mode, results in entry.items():
+        if not isinstance(results, dict):
+            continue
+        print(f"  {mode}")
+        for operation in OPERATIONS:
+            if operation in results:
+                r = results[operation]
+                print(f"    {operation:<24} p50 {r['p50_ms']:>8.3f}  p95 {r['p95_ms']:>8.3f}  "
+                      f"p99 {r['p99_ms']:>8.3f} ms  ({r.get('ops_per_second', 0):.0f} ops/s)")
+        if "_errors" in results and results["_errors"]:
+            print(f"    lock errors: {results['_errors']}")
+
+
+def compare(baseline, current, threshold):
+    """Print p95 changes against a baseline report and return the regressions."""
+    regressions = []
+    for scale, entry in current["scales"].items():
+        base_entry = baseline.get("scales", {}).get(scale)
+        if not base_entry:
+            continue
+        for mode, results in entry.items():
+            base_results = base_entry.get(mode)
+            if not isinstance(results, dict) or not isinstance(base_results, dict):
+                continue
+            for operation in OPERATIONS:
+                if operation not in results or operation not in base_results:
+                    continue
+                before, after = base_results[operation]["p95_ms"], results[operation]["p95_ms"]
+                change = (after - before) / before if before else 0.0
+                marker = "REGRESSION" if change > threshold else ""
+                print(f"  {scale:<6} {mode:<16} {operation:<24} p95 {before:>8.3f} -> {after:>8.3f} ms "
+                      f"({change:+.0%}) {marker}")
+                if marker:
+                    regressions.append((scale, mode, operation, change))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Latency benchmark for the database hot paths")
+    parser.add_argument("--scales", nargs="+", choices=list(SCALES), default=["small", "medium"])
+    parser.add_argument("--iterations", type=int, default=200, help="Calls per operation (per thread when concurrent)")
+    parser.add_argument("--threads", type=int, nargs="+", default=[4, 8], help="Thread counts for the concurrent runs")
+    parser.add_argument("--output", help="Result file (default: benchmarks/results/db_bench-<time>-<rev>.json)")
+    parser.add_argument("--compare", help="Baseline result file to compare p95 latencies against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Relative p95 slowdown counted as a regression")
+    args = parser.parse_args(argv)
+
+    report = run(args.scales, args.iterations, args.threads)
+
+    output = args.output
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        output = os.path.join(RESULTS_DIR, f"db_bench-{stamp}-{report['revision']}.json")
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print(f"\nComparison with {args.compare}:")
+        if compare(baseline, report, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
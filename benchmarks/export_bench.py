@@ -0,0 +1,79 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+import tracemalloc
+
+# Ensure the project root is importable when running benchmarks directly
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from benchmarks.synthetic import use_temp_database, seed_database
+from utils.export import EXPORT_FORMATS, export_modules
+
+SCALES = {
+    "small": (50, 10),
+    "medium": (500, 20),
+    "large": (2000, 40),
+}
+
+
+def run(scales, formats, words):
+    """Export each synthetic library in each format and record throughput and peak memory."""
+    results = []
+    warmed_up = False
+    for scale in scales:
+        modules, sections = SCALES[scale]
+        workdir = tempfile.mkdtemp(prefix=f"export_bench_{scale}_")
+        use_temp_database(workdir)
+        seed_database(modules, sections, words=words)
+
+        if not warmed_up:
+            # One untimed pass so library imports and codec setup are not billed to the first run
+            for export_format in formats:
+                export_modules(os.path.join(workdir, f"warmup.{export_format}"), export_format)
+            warmed_up = True
+
+        for export_format in formats:
+            output = os.path.join(workdir, f"export.{export_format}")
+            tracemalloc.start()
+            stats = export_modules(output, export_format)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            result = {
+                "scale": scale,
+                "format": export_format,
+                "modules": stats['modules'],
+                "sections": stats['sections'],
+                "seconds": round(stats['seconds'], 4),
+                "sections_per_second": round(stats['sections_per_second'], 1),
+                "mb_per_second": round(stats['bytes'] / 1e6 / stats['seconds'], 2) if stats['seconds'] else 0,
+                "output_bytes": stats['bytes'],
+                "peak_python_memory_kib": round(peak / 1024, 1),
+            }
+            results.append(result)
+            print(
+                f"{scale:>6} {export_format:>7}: {result['sections_per_second']:>10.0f} sections/s, "
+                f"{result['mb_per_second']:>6.2f} MB/s, peak {result['peak_python_memory_kib']:>8.1f} KiB"
+            )
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export throughput benchmark")
+    parser.add_argument("--scales", nargs="+", choices=list(SCALES), default=["small", "medium"])
+    parser.add_argument("--formats", nargs="+", choices=EXPORT_FORMATS, default=list(EXPORT_FORMATS))
+    parser.add_argument("--words", type=int, default=80, help="Words per section")
+    parser.add_argument("--json", help="Write results to this JSON file")
+    args = parser.parse_args(argv)
+
+    results = run(args.scales, args.formats, args.words)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
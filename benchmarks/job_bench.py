@@ -0,0 +1,90 @@
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+# Ensure the project root is importable when running benchmarks directly
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from benchmarks.llm_stub import install_stub_llm
+from benchmarks.synthetic import use_temp_database
+from utils.jobs import ACTIVE_STATUSES, JobQueue, SQLiteJobStore
+from utils.state_store import MemoryStateStore
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def run_batch(workers, jobs_count, poll_interval):
+    """Submit a batch of regenerate jobs and poll them like the Editor does.
+
+    Returns jobs/s and the latency of each UI-side call (submit and status poll).
+    """
+    queue = JobQueue(SQLiteJobStore(), state_store=MemoryStateStore(), workers=workers).start()
+    ui_ms = []
+    started = time.perf_counter()
+    try:
+        job_ids = []
+        for n in range(jobs_count):
+            t = time.perf_counter()
+            job_ids.append(queue.submit('regenerate_section', {
+                'namespace': 'module:1:edits', 'key': f"sec{n}", 'text': f"Section {n} text"
+            }, module_id=1))
+            ui_ms.append((time.perf_counter() - t) * 1000)
+
+        pending = set(job_ids)
+        while pending:
+            time.sleep(poll_interval)
+            t = time.perf_counter()
+            statuses = queue.get_many(list(pending))
+            ui_ms.append((time.perf_counter() - t) * 1000)
+            pending = {i for i, job in statuses.items() if job['status'] in ACTIVE_STATUSES}
+        seconds = time.perf_counter() - started
+    finally:
+        queue.stop()
+
+    return {
+        "workers": workers,
+        "jobs": jobs_count,
+        "seconds": round(seconds, 3),
+        "jobs_per_second": round(jobs_count / seconds, 2),
+        "ui_p50_ms": round(statistics.median(ui_ms), 3),
+        "ui_p95_ms": round(_percentile(ui_ms, 95), 3),
+        "ui_max_ms": round(max(ui_ms), 3),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Background job throughput and UI latency")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--jobs", type=int, default=40, help="Jobs per batch")
+    parser.add_argument("--llm-delay", type=float, default=0.2, help="Seconds per stub LLM call")
+    parser.add_argument("--poll", type=float, default=0.05, help="Seconds between status polls")
+    parser.add_argument("--json", help="Write results to this JSON file")
+    args = parser.parse_args(argv)
+
+    use_temp_database()
+    install_stub_llm(args.llm_delay)
+    print(f"Inline (previous behaviour): the script thread blocks {args.llm_delay * 1000:.0f} ms per call")
+    results = []
+    for workers in args.workers:
+        result = run_batch(workers, args.jobs, args.poll)
+        results.append(result)
+        print(
+            f"{workers:>3} workers: {result['jobs_per_second']:>7.2f} jobs/s, "
+            f"UI call p50 {result['ui_p50_ms']:.2f} ms, p95 {result['ui_p95_ms']:.2f} ms, "
+            f"max {result['ui_max_ms']:.2f} ms"
+        )
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
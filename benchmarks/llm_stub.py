@@ -0,0 +1,53 @@
+import json
+import threading
+import time
+from types import SimpleNamespace
+
+from utils import file_utils
+
+STUB_MODULE = {
+    "module_title": "Stub Module",
+    "sections": [
+        {"id": "sec1", "title": "Objective", "content": "Explain the core idea.", "type": "learning_objective", "bloom_level": "Understand"},
+        {"id": "sec2", "title": "Lesson", "content": "Apply the idea to an example.", "type": "lesson", "bloom_level": "Apply"},
+        {"id": "sec3", "title": "Check", "content": "Evaluate a worked solution.", "type": "assessment", "bloom_level": "Evaluate"},
+    ],
+}
+
+
+class StubLLMClient:
+    """Stand-in for the Groq client: answers after a fixed delay and counts calls.
+
+    generate_delay, if given, replaces delay for module generation prompts,
+    which are much longer calls than rewrites and summaries.
+    """
+
+    def __init__(self, delay=0.0, generate_delay=None):
+        self.delay = delay
+        self.generate_delay = delay if generate_delay is None else generate_delay
+        self.calls = 0
+        self._lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, model, messages, temperature=None, max_tokens=None):
+        with self._lock:
+            self.calls += 1
+        prompt = messages[-1]["content"]
+        delay = self.generate_delay if "Generate a JSON" in prompt else self.delay
+        if delay:
+            time.sleep(delay)
+        if "Generate a JSON" in prompt:
+            text = json.dumps(STUB_MODULE)
+        elif "Summarize the semantic differences" in prompt:
+            text = "Version B is clearer."
+        else:
+            text = "Rewritten: " + prompt.strip().splitlines()[-1]
+        message = SimpleNamespace(content=text)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+def install_stub_llm(delay=0.0, generate_delay=None):
+    """Route utils.file_utils LLM calls to a StubLLMClient and return it."""
+    client = StubLLMClient(delay, generate_delay)
+    file_utils.get_client = lambda: client
+    return client
@@ -0,0 +1,91 @@
+import argparse
+import gc
+import json
+import os
+import sys
+import tracemalloc
+
+# Ensure the project root is importable when running benchmarks directly
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from benchmarks.synthetic import use_temp_database, seed_database
+from utils import database
+from utils.models import CONTENT_CACHE, Module
+
+
+def _measure(build, sessions):
+    """Python heap bytes retained by `sessions` results of build()."""
+    gc.collect()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    views = [build() for _ in range(sessions)]
+    gc.collect()
+    after, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del views
+    return after - before, peak - before
+
+
+def dict_view(module_id):
+    """Previous session view: full dict copies of every section, content included."""
+    return database.get_module_by_id(module_id)
+
+
+def model_view(module_id):
+    """Current session view: slotted sections, bodies in the shared content cache."""
+    module = Module.from_row(database.get_module_by_id(module_id, include_content=False))
+    module.prefetch_content()
+    return module
+
+
+def run(sections, words, session_counts):
+    use_temp_database()
+    module_id = seed_database(1, sections, words=words)[0]
+    results = []
+    for sessions in session_counts:
+        CONTENT_CACHE.clear()
+        dict_bytes, dict_peak = _measure(lambda: dict_view(module_id), sessions)
+        CONTENT_CACHE.clear()
+        # The shared cache is filled inside the measurement, so its cost is included once
+        model_bytes, model_peak = _measure(lambda: model_view(module_id), sessions)
+        result = {
+            "sections": sections,
+            "words": words,
+            "sessions": sessions,
+            "dict_bytes": dict_bytes,
+            "model_bytes": model_bytes,
+            "dict_bytes_per_session": dict_bytes // sessions,
+            "model_bytes_per_session": model_bytes // sessions,
+            "dict_peak_bytes": dict_peak,
+            "model_peak_bytes": model_peak,
+            "saving": round(1 - model_bytes / dict_bytes, 3) if dict_bytes else 0,
+        }
+        results.append(result)
+        print(
+            f"{sessions:>4} sessions: dicts {dict_bytes / 1024:>9.1f} KiB "
+            f"({result['dict_bytes_per_session'] / 1024:.1f}/session), "
+            f"models {model_bytes / 1024:>9.1f} KiB "
+            f"({result['model_bytes_per_session'] / 1024:.1f}/session), "
+            f"saving {result['saving']:.0%}"
+        )
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Per-session memory of the module view")
+    parser.add_argument("--sections", type=int, default=200, help="Sections in the module")
+    parser.add_argument("--words", type=int, default=300, help="Words per section")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--json", help="Write results to this JSON file")
+    args = parser.parse_args(argv)
+
+    results = run(args.sections, args.words, args.sessions)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# Ensure the project root is importable when running benchmarks directly
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from benchmarks.synthetic import use_temp_database, seed_database
+from utils import database
+from utils.content_pack import open_pack
+
+
+def _read_sections(source, db_path, sections, reads, seed):
+    """Read random published (module id, section id) pairs through SQLite or the packs; returns reads/s."""
+    database.DB_PATH = db_path
+    rng = random.Random(seed)
+    picks = [rng.choice(sections) for _ in range(reads)]
+    started = time.perf_counter()
+    for module_id, section_id in picks:
+        if source == "sqlite":
+            section = database.get_sections_by_ids([section_id])[0]
+            assert section['content']
+        else:
+            assert open_pack(module_id).get_content(section_id) is not None
+    return reads / (time.perf_counter() - started)
+
+
+def run(source, db_path, sections, readers, reads):
+    if readers == 1:
+        return _read_sections(source, db_path, sections, reads, 0)
+    with ProcessPoolExecutor(readers) as pool:
+        rates = pool.map(_read_sections, *zip(*[
+            (source, db_path, sections, reads, n) for n in range(readers)
+        ]))
+        return sum(rates)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Published section reads: SQLite vs content packs")
+    parser.add_argument("--modules", type=int, default=20)
+    parser.add_argument("--sections", type=int, default=40, help="Sections per module")
+    parser.add_argument("--words", type=int, default=300, help="Words per section")
+    parser.add_argument("--readers", type=int, nargs="+", default=[1, 4], help="Reader processes")
+    parser.add_argument("--reads", type=int, default=5000, help="Reads per reader")
+    parser.add_argument("--json", help="Write results to this JSON file")
+    args = parser.parse_args(argv)
+
+    db_path = use_temp_database()
+    module_ids = seed_database(args.modules, args.sections, words=args.words)
+    started = time.perf_counter()
+    for module_id in module_ids:
+        database.publish_module(module_id)
+    print(f"Published {len(module_ids)} modules in {time.perf_counter() - started:.2f}s")
+    with database.get_db_connection() as conn:
+        sections = [tuple(row) for row in conn.execute("SELECT module_id, id FROM sections")]
+
+    results = []
+    for readers in args.readers:
+        row = {"readers": readers}
+        for source in ("sqlite", "pack"):
+            row[source] = round(run(source, db_path, sections, readers, args.reads))
+        results.append(row)
+        print(f"{readers:>3} readers: SQLite {row['sqlite']:>9,} reads/s, pack {row['pack']:>9,} reads/s "
+              f"({row['pack'] / row['sqlite']:.0f}x)")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+import argparse
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+
+# Ensure the project root is importable when running benchmarks directly
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from benchmarks.llm_stub import install_stub_llm
+from benchmarks.synthetic import use_temp_database
+from utils.database import get_db_connection
+from utils.jobs import ACTIVE_STATUSES, JobQueue, SQLiteJobStore
+from utils.state_store import MemoryStateStore
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def run(scheduled, workers, generations, reviewers, clicks, click_interval):
+    """A burst of module generations, then reviewers clicking Regenerate while it drains.
+
+    Unscheduled, every job is in one class with no owner, so jobs run in
+    submission order (the previous behaviour).
+    Returns the click-to-result latency of the Regenerate clicks.
+    """
+    store = SQLiteJobStore()
+    with get_db_connection() as conn:
+        conn.execute("DELETE FROM jobs")
+    queue = JobQueue(store, state_store=MemoryStateStore(), workers=workers, poll_interval=0.02,
+                     background_slots=max(1, workers - 1) if scheduled else workers,
+                     queue_limits={}).start()
+    try:
+        for n in range(generations):
+            queue.submit('generate_module', {'prompt': f"Module {n}"},
+                         priority='batch' if scheduled else 'interactive',
+                         owner="batch-import" if scheduled else None)
+        latencies = []
+        lock = threading.Lock()
+
+        def reviewer(name):
+            for n in range(clicks):
+                started = time.perf_counter()
+                job_id = queue.submit('regenerate_section', {
+                    'namespace': "module:1:edits", 'key': f"{name}-{n}", 'text': f"Section {n}"
+                }, owner=name if scheduled else None)
+                while queue.get(job_id)['status'] in ACTIVE_STATUSES:
+                    time.sleep(0.01)
+                with lock:
+                    latencies.append(time.perf_counter() - started)
+                time.sleep(click_interval)
+
+        threads = [threading.Thread(target=reviewer, args=(f"reviewer{n}",)) for n in range(reviewers)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        stats = queue.stats()
+    finally:
+        queue.stop()
+    return {
+        "scheduler": "priority" if scheduled else "fifo",
+        "workers": workers,
+        "regenerate_p50_s": round(statistics.median(latencies), 2),
+        "regenerate_p95_s": round(_percentile(latencies, 95), 2),
+        "regenerate_max_s": round(max(latencies), 2),
+        "interactive_wait_p95_s": stats['interactive']['wait_p95_s'],
+        "batch_wait_p95_s": stats['batch']['wait_p95_s'],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Regenerate latency while a batch of generations is queued")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--generations", type=int, default=10, help="generate_module jobs queued up front")
+    parser.add_argument("--reviewers", type=int, default=3)
+    parser.add_argument("--clicks", type=int, default=4, help="Regenerate clicks per reviewer")
+    parser.add_argument("--click-interval", type=float, default=0.2)
+    parser.add_argument("--llm-delay", type=float, default=0.2, help="Seconds per rewrite/summary call")
+    parser.add_argument("--generate-delay", type=float, default=1.0, help="Seconds per generate_module call")
+    parser.add_argument("--json", help="Write results to this JSON file")
+    args = parser.parse_args(argv)
+
+    use_temp_database()
+    install_stub_llm(args.llm_delay, args.generate_delay)
+    results = []
+    for scheduled in (False, True):
+        result = run(scheduled, args.workers, args.generations, args.reviewers, args.clicks, args.click_interval)
+        results.append(result)
+        print(f"{result['scheduler']:>8}: Regenerate p50 {result['regenerate_p50_s']:.2f}s, "
+              f"p95 {result['regenerate_p95_s']:.2f}s, max {result['regenerate_max_s']:.2f}s; "
+              f"queue wait p95 interactive {result['interactive_wait_p95_s']}s"
+              + (f", batch {result['batch_wait_p95_s']}s" if result['batch_wait_p95_s'] is not None else ""))
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
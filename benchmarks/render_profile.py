@@ -0,0 +1,175 @@
+import argparse
+import cProfile
+import json
+import os
+import pstats
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+# Ensure the project root is importable when running benchmarks directly
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from benchmarks.llm_stub import install_stub_llm
+from benchmarks.synthetic import use_temp_database, seed_database
+from utils.query_trace import add_listener, enable_tracing, summarize
+
+PAGES = {
+    "generate": ("🚀 Generate Module", "generate_module_page"),
+    "editor": ("📝 Editor", "editor_page"),
+    "library": ("📚 Module Library", "modules_page"),
+    "analytics": ("📊 Analytics", "analytics_page"),
+}
+
+
+class QueryRecorder:
+    """Collects query_trace entries from every thread (AppTest runs the script in its own)."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.queries = []
+
+    def __call__(self, entry):
+        with self.lock:
+            self.queries.append(entry)
+
+    def drain(self):
+        with self.lock:
+            queries, self.queries = self.queries, []
+        return queries
+
+
+RECORDER = QueryRecorder()
+
+
+def _run_profiled(at):
+    """Run one rerun with cProfile enabled inside the script thread."""
+    profiler = cProfile.Profile()
+
+    def bootstrap(frame, event, arg):
+        # First event in the new script thread: hand over to cProfile
+        sys.setprofile(None)
+        profiler.enable()
+
+    threading.setprofile(bootstrap)
+    try:
+        at.run()
+    finally:
+        threading.setprofile(None)
+    profiler.create_stats()
+    return profiler
+
+
+def _function_time(stats, function_name):
+    """Cumulative seconds spent in an app.py function according to pstats."""
+    total = 0.0
+    for (filename, _, name), (_, _, _, cumulative, _) in stats.stats.items():
+        if name == function_name and filename.endswith("app.py"):
+            total += cumulative
+    return total
+
+
+def profile_page(at, page_key, reruns, profile_reruns):
+    label, function_name = PAGES[page_key]
+    at.sidebar.radio[0].set_value(label).run()
+    RECORDER.drain()
+
+    # Timing pass: wall time and SQL, no profiler overhead
+    walls, query_counts, query_seconds = [], [], []
+    all_queries = []
+    for _ in range(reruns):
+        t = time.perf_counter()
+        at.run()
+        walls.append((time.perf_counter() - t) * 1000)
+        queries = RECORDER.drain()
+        query_counts.append(len(queries))
+        query_seconds.append(sum(q.seconds for q in queries) * 1000)
+        all_queries.extend(queries)
+
+    # Profile pass: time spent inside the page function
+    combined = None
+    function_ms = []
+    for _ in range(profile_reruns):
+        profiler = _run_profiled(at)
+        stats = pstats.Stats(profiler)
+        function_ms.append(_function_time(stats, function_name) * 1000)
+        if combined is None:
+            combined = stats
+        else:
+            combined.add(profiler)
+    RECORDER.drain()
+
+    return {
+        "page": label,
+        "reruns": reruns,
+        "wall_ms_median": round(statistics.median(walls), 2),
+        "wall_ms_max": round(max(walls), 2),
+        "queries_per_rerun": round(statistics.mean(query_counts), 1),
+        "sql_ms_per_rerun": round(statistics.mean(query_seconds), 2),
+        "page_function": function_name,
+        "page_function_ms_median": round(statistics.median(function_ms), 2) if function_ms else None,
+        "top_statements": [
+            dict(group, sql=group["sql"][:160]) for group in summarize(all_queries)[:5]
+        ],
+        "errors": [str(e.value) for e in at.exception] if at.exception else [],
+    }, combined
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless render profile of app.py pages via AppTest")
+    parser.add_argument("--pages", nargs="+", choices=list(PAGES), default=list(PAGES))
+    parser.add_argument("--reruns", type=int, default=10, help="Timed reruns per page")
+    parser.add_argument("--profile-reruns", type=int, default=3, help="cProfile reruns per page")
+    parser.add_argument("--modules", type=int, default=20, help="Synthetic modules to seed")
+    parser.add_argument("--sections", type=int, default=15, help="Sections per synthetic module")
+    parser.add_argument("--versions", type=int, default=2, help="Versions per synthetic section")
+    parser.add_argument("--llm-delay", type=float, default=0.0, help="Seconds the stub LLM waits per call")
+    parser.add_argument("--cprofile", help="Write combined cProfile stats here (view with snakeviz or flameprof)")
+    parser.add_argument("--json", help="Write results to this JSON file")
+    args = parser.parse_args(argv)
+
+    from streamlit.testing.v1 import AppTest
+
+    use_temp_database(tempfile.mkdtemp(prefix="render_profile_"))
+    seed_database(args.modules, args.sections, args.versions)
+    install_stub_llm(args.llm_delay)
+    # Keep the slow-query log quiet; the profile reports timings itself
+    enable_tracing(slow_ms=float("inf"))
+    add_listener(RECORDER)
+
+    os.chdir(ROOT)
+    at = AppTest.from_file("app.py", default_timeout=120)
+    at.run()
+
+    results = []
+    combined = None
+    for page_key in args.pages:
+        result, stats = profile_page(at, page_key, args.reruns, args.profile_reruns)
+        results.append(result)
+        if stats is not None:
+            if combined is None:
+                combined = stats
+            else:
+                combined.add(stats)
+        print(f"{result['page']:<20} wall {result['wall_ms_median']:>8.1f} ms (max {result['wall_ms_max']:.1f})  "
+              f"{result['queries_per_rerun']:>6.1f} queries / {result['sql_ms_per_rerun']:>7.2f} ms SQL  "
+              f"{result['page_function']} {result['page_function_ms_median'] or 0:>8.1f} ms")
+        for statement in result['top_statements'][:3]:
+            print(f"    {statement['calls']:>5}x {statement['total_ms']:>8.2f} ms  {statement['sql'][:90]}")
+        for error in result['errors']:
+            print(f"    ERROR: {error}")
+
+    if args.cprofile and combined is not None:
+        combined.dump_stats(args.cprofile)
+        print(f"\ncProfile stats written to {args.cprofile}")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+import argparse
+import json
+import multiprocessing
+import os
+import sqlite3
+import statistics
+import sys
+import time
+
+# Ensure the project root is importable when running benchmarks directly
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from benchmarks.synthetic import use_temp_database, seed_database
+from utils import database
+from utils.database import create_workspace, get_module_by_id, update_section_content, use_workspace
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def team_writer(db_path, workspace, module_id, start_at, seconds):
+    """One team's reviewer process: save section edits back to back until the deadline."""
+    database.DB_PATH = db_path
+    with use_workspace(workspace):
+        section_ids = [s['id'] for s in get_module_by_id(module_id, include_content=False)['sections']]
+        latencies, errors = [], 0
+        time.sleep(max(0.0, start_at - time.time()))
+        n = 0
+        while time.time() < start_at + seconds:
+            t = time.perf_counter()
+            try:
+                update_section_content(section_ids[n % len(section_ids)], f"Edit {n} by {workspace}")
+            except sqlite3.OperationalError:
+                # database is locked: the busy timeout ran out
+                errors += 1
+            latencies.append((time.perf_counter() - t) * 1000)
+            n += 1
+    return latencies, errors
+
+
+def run(teams, seconds, sharded, sections):
+    """Each team writes from its own process, into one shared file or its own shard."""
+    db_path = use_temp_database()
+    jobs = []
+    for n in range(teams):
+        workspace = f"team{n + 1}" if sharded else database.DEFAULT_WORKSPACE
+        if sharded:
+            create_workspace(workspace)
+        with use_workspace(workspace):
+            module_id = seed_database(1, sections, seed=n)[0]
+        jobs.append((workspace, module_id))
+
+    start_at = time.time() + 1
+    with multiprocessing.Pool(teams) as pool:
+        results = pool.starmap(team_writer, [
+            (db_path, workspace, module_id, start_at, seconds) for workspace, module_id in jobs
+        ])
+    latencies = [ms for per_team, _ in results for ms in per_team]
+    return {
+        "layout": "sharded" if sharded else "single",
+        "teams": teams,
+        "writes_per_second": round(len(latencies) / seconds),
+        "p50_ms": round(statistics.median(latencies), 2),
+        "p95_ms": round(_percentile(latencies, 95), 2),
+        "errors": sum(errors for _, errors in results),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write throughput of N teams on one database vs one shard per team")
+    parser.add_argument("--teams", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--seconds", type=float, default=3)
+    parser.add_argument("--sections", type=int, default=20, help="Sections in each team's module")
+    parser.add_argument("--json", help="Write results to this JSON file")
+    args = parser.parse_args(argv)
+
+    results = []
+    for teams in args.teams:
+        for sharded in (False, True):
+            result = run(teams, args.seconds, sharded, args.sections)
+            results.append(result)
+            print(f"{result['layout']:>8} {teams:>3} teams  {result['writes_per_second']:>6,} writes/s  "
+                  f"p50 {result['p50_ms']:>7.2f} ms  p95 {result['p95_ms']:>7.2f} ms  errors {result['errors']}")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
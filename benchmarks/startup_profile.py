@@ -0,0 +1,174 @@
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# Ensure the project root is importable when running benchmarks directly
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+# Modules that must not be loaded by the first (Generate page) run
+DEFERRED_MODULES = ["matplotlib", "plotly.express", "pandas", "numpy", "groq"]
+
+PAGES = ["🚀 Generate Module", "📝 Editor", "📚 Module Library", "📊 Analytics"]
+
+# Default budgets in milliseconds (Render free tier is roughly 2x slower than a laptop)
+DEFAULT_COLD_BUDGET_MS = 4000
+DEFAULT_RERUN_BUDGET_MS = 400
+
+
+def _seed(db_path):
+    """Create the synthetic library the child profiles against."""
+    from utils import database
+    from benchmarks.synthetic import seed_database
+    database.DB_PATH = db_path
+    database.init_db()
+    seed_database(5, 12)
+
+
+def _child(reruns, db_path):
+    """Measure a cold start and warm reruns inside a fresh interpreter; print JSON.
+
+    The database is seeded by the parent: seeding scores sections, which would
+    import numpy here before the app gets a chance to defer it.
+    """
+    t0 = time.perf_counter()
+    from streamlit.testing.v1 import AppTest
+    streamlit_import = time.perf_counter() - t0
+
+    from utils import database
+    database.DB_PATH = db_path
+
+    os.chdir(ROOT)
+    at = AppTest.from_file("app.py", default_timeout=120)
+    t1 = time.perf_counter()
+    at.run()
+    first_run = time.perf_counter() - t1
+    loaded_after_first_run = [m for m in DEFERRED_MODULES if m in sys.modules]
+
+    per_page = {}
+    for page in PAGES:
+        at.sidebar.radio[0].set_value(page).run()
+        samples = []
+        for _ in range(reruns):
+            t = time.perf_counter()
+            at.run()
+            samples.append((time.perf_counter() - t) * 1000)
+        per_page[page] = {
+            'median_ms': round(statistics.median(samples), 2),
+            'max_ms': round(max(samples), 2),
+        }
+
+    print(json.dumps({
+        'streamlit_import_ms': round(streamlit_import * 1000, 2),
+        'first_run_ms': round(first_run * 1000, 2),
+        'cold_start_ms': round((streamlit_import + first_run) * 1000, 2),
+        'deferred_modules_loaded': loaded_after_first_run,
+        'reruns': per_page,
+        'errors': [str(e.value) for e in at.exception] if at.exception else [],
+    }))
+
+
+def _parse_importtime(stderr, top):
+    """Return the top cumulative import offenders from -X importtime output."""
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        entries.append((int(cumulative_us), int(self_us), name.strip()))
+    entries.sort(reverse=True)
+    return [
+        {'module': name, 'cumulative_ms': round(cum / 1000, 2), 'self_ms': round(own / 1000, 2)}
+        for cum, own, name in entries[:top]
+    ]
+
+
+def profile(reruns=5, top=15):
+    """Run the measurement in a fresh interpreter so imports are truly cold."""
+    workdir = tempfile.mkdtemp(prefix="startup_profile_")
+    db_path = os.path.join(workdir, "modules.db")
+    _seed(db_path)
+    try:
+        wall_start = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", os.path.abspath(__file__), "--child",
+             "--reruns", str(reruns), "--db", db_path],
+            capture_output=True, text=True, cwd=ROOT
+        )
+        wall = time.perf_counter() - wall_start
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    json_lines = [line for line in proc.stdout.splitlines() if line.startswith("{")]
+    if proc.returncode != 0 or not json_lines:
+        raise RuntimeError(f"Profiling child failed:\n{proc.stderr[-4000:]}")
+    result = json.loads(json_lines[-1])
+    result['process_wall_ms'] = round(wall * 1000, 2)
+    result['top_imports'] = _parse_importtime(proc.stderr, top)
+    return result
+
+
+def check(result, cold_budget_ms, rerun_budget_ms):
+    """Return a list of budget violations."""
+    problems = []
+    if result['cold_start_ms'] > cold_budget_ms:
+        problems.append(f"cold start {result['cold_start_ms']:.0f}ms exceeds {cold_budget_ms}ms")
+    for page, stats in result['reruns'].items():
+        if stats['median_ms'] > rerun_budget_ms:
+            problems.append(f"{page} rerun {stats['median_ms']:.0f}ms exceeds {rerun_budget_ms}ms")
+    for module in result['deferred_modules_loaded']:
+        problems.append(f"{module} is imported on startup but should be loaded lazily")
+    for error in result['errors']:
+        problems.append(f"app raised: {error}")
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cold-start and per-rerun profile of app.py")
+    parser.add_argument("--reruns", type=int, default=5, help="Warm reruns measured per page")
+    parser.add_argument("--top", type=int, default=15, help="Slowest imports to list")
+    parser.add_argument("--check", action="store_true", help="Exit non-zero when a budget is exceeded")
+    parser.add_argument("--cold-budget-ms", type=float, default=DEFAULT_COLD_BUDGET_MS)
+    parser.add_argument("--rerun-budget-ms", type=float, default=DEFAULT_RERUN_BUDGET_MS)
+    parser.add_argument("--json", help="Write the full result to this JSON file")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--db", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        _child(args.reruns, args.db)
+        return 0
+
+    result = profile(args.reruns, args.top)
+    print(f"Streamlit import:      {result['streamlit_import_ms']:>9.1f} ms")
+    print(f"First app run:         {result['first_run_ms']:>9.1f} ms")
+    print(f"Cold start:            {result['cold_start_ms']:>9.1f} ms")
+    print(f"Process wall time:     {result['process_wall_ms']:>9.1f} ms")
+    print(f"Deferred modules loaded at startup: {', '.join(result['deferred_modules_loaded']) or 'none'}")
+    print("\nPer-rerun budget (median / max):")
+    for page, stats in result['reruns'].items():
+        print(f"  {page:<20} {stats['median_ms']:>8.1f} ms / {stats['max_ms']:>8.1f} ms")
+    print("\nSlowest imports (cumulative):")
+    for entry in result['top_imports']:
+        print(f"  {entry['cumulative_ms']:>9.1f} ms  {entry['module']}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(result, f, indent=2)
+
+    if args.check:
+        problems = check(result, args.cold_budget_ms, args.rerun_budget_ms)
+        for problem in problems:
+            print(f"FAIL: {problem}")
+        return 1 if problems else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
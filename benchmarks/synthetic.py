@@ -0,0 +1,103 @@
+import os
+import random
+import sys
+import tempfile
+
+# Ensure the project root is importable when running benchmarks directly
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from utils import database
+
+SECTION_TYPES = ["learning_objective", "lesson", "lesson", "lesson", "assessment"]
+BLOOM_LEVELS = ["Remember", "Understand", "Apply", "Analyze", "Evaluate", "Create"]
+WORDS = (
+    "learners will explain apply analyze compare evaluate design variables data "
+    "functions loops models feedback project rubric concept example practice "
+    "review summary question context outcome skill strategy reflection"
+).split()
+
+
+def use_temp_database(directory=None):
+    """Point utils.database at a fresh, initialized database file and return its path."""
+    directory = directory or tempfile.mkdtemp(prefix="ai_copilot_bench_")
+    path = os.path.join(directory, "modules.db")
+    database.DB_PATH = path
+    database.init_db()
+    return path
+
+
+def synthetic_text(rng, words=60):
+    """Return pseudo-educational filler text."""
+    sentences = []
+    remaining = words
+    while remaining > 0:
+        length = min(remaining, rng.randint(8, 18))
+        sentence = " ".join(rng.choice(WORDS) for _ in range(length))
+        sentences.append(sentence.capitalize() + ".")
+        remaining -= length
+    return " ".join(sentences)
+
+
+def synthetic_sections(rng, count, words=60):
+    """Return section dicts in the generate_module layout."""
+    return [
+        {
+            "id": f"sec{i + 1}",
+            "title": f"Section {i + 1}",
+            "content": synthetic_text(rng, words),
+            "type": SECTION_TYPES[i % len(SECTION_TYPES)],
+            "bloom_level": rng.choice(BLOOM_LEVELS),
+        }
+        for i in range(count)
+    ]
+
+
+def seed_database(modules, sections_per_module, versions_per_section=0, words=60, seed=0):
+    """Fill the current database with synthetic modules, sections and versions.
+
+    Returns the list of created module ids.
+    """
+    rng = random.Random(seed)
+    module_ids = []
+    for m in range(modules):
+        module_id = database.save_module_to_db(
+            f"Synthetic Module {m + 1}",
+            synthetic_sections(rng, sections_per_module, words)
+        )
+        module_ids.append(module_id)
+
+    if versions_per_section:
+        # Each section gets a chain of edits and ends at its latest version,
+        # as update_section_content would leave it
+        from utils.quality import QUALITY_COLUMNS, score_sections
+        with database.get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"""
+                SELECT id, content, type FROM sections
+                WHERE module_id IN ({','.join('?' * len(module_ids))}) ORDER BY id
+            """, module_ids)
+            rows = cursor.fetchall()
+            versions, latest = [], []
+            for row in rows:
+                content = row['content']
+                for v in range(versions_per_section):
+                    edited = synthetic_text(rng, words)
+                    versions.append((row['id'], content, edited, v + 2))
+                    content = edited
+                latest.append(content)
+            cursor.executemany("""
+                INSERT INTO versions (section_id, original_content, edited_content, version)
+                VALUES (?, ?, ?, ?)
+            """, versions)
+            scores = score_sections(latest, [row['type'] for row in rows])
+            cursor.executemany(f"""
+                UPDATE sections
+                SET content = ?, version = ?, {', '.join(f'{c} = ?' for c in QUALITY_COLUMNS)}
+                WHERE id = ?
+            """, [
+                (content, versions_per_section + 1, *score, row['id'])
+                for content, score, row in zip(latest, scores, rows)
+            ])
+    return module_ids
@@ -0,0 +1,289 @@
+import argparse
+import gzip
+import hashlib
+import json
+import logging
+import math
+import os
+import sys
+import threading
+import time
+from calendar import timegm
+from email.utils import formatdate, parsedate_tz, mktime_tz
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+# Allow running as `python utils/api.py` as well as `python -m utils.api`
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from utils.content_pack import export_published_module, pack_path
+from utils.database import use_workspace
+from utils.repository import create_repository
+
+logger = logging.getLogger(__name__)
+
+API_HOST = os.getenv("API_HOST", "127.0.0.1")
+API_PORT = int(os.getenv("API_PORT", "8502"))
+# How often the response cache checks for newly published modules
+API_CACHE_CHECK_SECONDS = float(os.getenv("API_CACHE_CHECK_SECONDS", "2"))
+# Page size for /modules (?per_page= may ask for up to MAX_PER_PAGE)
+DEFAULT_PER_PAGE = 50
+MAX_PER_PAGE = 200
+# Bodies smaller than this are not worth compressing
+GZIP_MIN_BYTES = 1024
+
+
+class Response:
+    """A rendered JSON response with its validators and (lazily) gzipped body."""
+
+    __slots__ = ("status", "body", "etag", "last_modified", "headers", "_gzipped")
+
+    def __init__(self, status, payload, last_modified=None, headers=None):
+        self.status = status
+        self.body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        self.etag = '"%s"' % hashlib.sha1(self.body).hexdigest()[:20]
+        self.last_modified = last_modified
+        self.headers = headers or {}
+        self._gzipped = None
+
+    @property
+    def gzipped(self):
+        if self._gzipped is None:
+            self._gzipped = gzip.compress(self.body, compresslevel=6, mtime=0)
+        return self._gzipped
+
+
+def _http_date(timestamp):
+    """'YYYY-MM-DD HH:MM:SS' UTC (as stored) -> IMF-fixdate."""
+    if not timestamp:
+        return None
+    return formatdate(timegm(time.strptime(timestamp[:19], "%Y-%m-%d %H:%M:%S")), usegmt=True)
+
+
+def _not_modified(request_headers, response, etag):
+    """Conditional GET check; If-None-Match wins over If-Modified-Since."""
+    if_none_match = request_headers.get("If-None-Match")
+    if if_none_match:
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or etag in tags
+    if_modified_since = request_headers.get("If-Modified-Since")
+    if if_modified_since and response.last_modified:
+        parsed = parsedate_tz(if_modified_since)
+        last = parsedate_tz(response.last_modified)
+        return parsed is not None and mktime_tz(last) <= mktime_tz(parsed)
+    return False
+
+
+class ModuleAPI:
+    """Builds and caches the API's responses for published modules.
+
+    Responses are cached per path and query. The whole cache is dropped
+    when the published set changes: any module published, republished or
+    unpublished, whichever process did it. That is checked at most every
+    check_interval seconds, or right away after invalidate(). An API serves
+    one workspace (the default one unless given).
+    """
+
+    def __init__(self, repository=None, check_interval=API_CACHE_CHECK_SECONDS, workspace=None):
+        self.repository = repository or create_repository()
+        self.check_interval = check_interval
+        self.workspace = workspace
+        self._lock = threading.Lock()
+        self._cache = {}
+        self._published = []
+        self._signature = None
+        self._checked_at = None
+        self.stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+    def invalidate(self):
+        """Recheck the published set on the next request (e.g. right after publishing)."""
+        with self._lock:
+            self._checked_at = None
+
+    def _refresh(self):
+        now = time.monotonic()
+        if self._checked_at is not None and now - self._checked_at < self.check_interval:
+            return
+        published = [m for m in self.repository.get_all_modules() if m['status'] == 'published']
+        # Pack stamps catch a republish within the same second as updated_at
+        signature = tuple(
+            (m['id'], m['updated_at'], self._pack_stamp(m['id'])) for m in published
+        )
+        if signature != self._signature:
+            if self._signature is not None:
+                self.stats["invalidations"] += 1
+            self._cache.clear()
+            self._signature = signature
+            self._published = published
+        self._checked_at = now
+
+    @staticmethod
+    def _pack_stamp(module_id):
+        try:
+            return os.stat(pack_path(module_id)).st_mtime_ns
+        except OSError:
+            return None
+
+    def respond(self, path, query):
+        """Response for a GET of path (without query) and its parsed query string."""
+        with use_workspace(self.workspace):
+            return self._respond(path, query)
+
+    def _respond(self, path, query):
+        if path.rstrip("/") == "/modules":
+            try:
+                page = int(query.get("page", ["1"])[0])
+                per_page = int(query.get("per_page", [str(DEFAULT_PER_PAGE)])[0])
+            except ValueError:
+                return Response(400, {"error": "page and per_page must be integers"})
+            if page < 1 or not 1 <= per_page <= MAX_PER_PAGE:
+                return Response(400, {"error": f"page must be >= 1 and per_page between 1 and {MAX_PER_PAGE}"})
+            return self._cached(("list", page, per_page), lambda published: self._module_list(published, page, per_page))
+
+        parts = path.strip("/").split("/")
+        if len(parts) == 2 and parts[0] == "modules" and parts[1].isdigit():
+            module_id = int(parts[1])
+            return self._cached(("module", module_id), lambda published: self._module(published, module_id))
+        return Response(404, {"error": "not found"})
+
+    def _cached(self, key, build):
+        with self._lock:
+            self._refresh()
+            response = self._cache.get(key)
+            if response is not None:
+                self.stats["hits"] += 1
+                return response
+            self.stats["misses"] += 1
+            published = self._published
+        # Built outside the lock so slow queries do not hold up cache hits
+        response = build(published)
+        with self._lock:
+            # Only keep it if the published set did not change meanwhile
+            if self._published is published:
+                response = self._cache.setdefault(key, response)
+        return response
+
+    def _module_list(self, published, page, per_page):
+        pages = max(1, math.ceil(len(published) / per_page))
+        if page > pages:
+            return Response(404, {"error": f"page {page} is past the last page ({pages})"})
+        rows = published[(page - 1) * per_page:page * per_page]
+        links = []
+        if page > 1:
+            links.append(f'</modules?page={page - 1}&per_page={per_page}>; rel="prev"')
+        if page < pages:
+            links.append(f'</modules?page={page + 1}&per_page={per_page}>; rel="next"')
+        return Response(200, {
+            "modules": [
+                {
+                    "id": m['id'],
+                    "module_title": m['module_title'],
+                    "created_at": m['created_at'],
+                    "updated_at": m['updated_at'],
+                    "url": f"/modules/{m['id']}",
+                }
+                for m in rows
+            ],
+            "page": page,
+            "per_page": per_page,
+            "total": len(published),
+            "pages": pages,
+        }, _http_date(max((m['updated_at'] for m in published), default=None)),
+            {"Link": ", ".join(links)} if links else None)
+
+    def _module(self, published, module_id):
+        module = next((m for m in published if m['id'] == module_id), None)
+        # The pack is the published copy; modules published before packs existed
+        # fall back to the live tables until `--build-all` is run
+        exported = module and (export_published_module(module_id)
+                               or self.repository.export_module_to_json(module_id))
+        if not exported:
+            return Response(404, {"error": f"module {module_id} is not published"})
+        return Response(200, {"id": module_id, "updated_at": module['updated_at'], **exported},
+                        _http_date(module['updated_at']))
+
+
+class APIRequestHandler(BaseHTTPRequestHandler):
+    """GET/HEAD handler for the ModuleAPI on self.server.api."""
+
+    protocol_version = "HTTP/1.1"
+    server_version = "ModuleAPI/1.0"
+    # Headers and body go out in separate writes; without TCP_NODELAY each
+    # keep-alive response waits ~40 ms for the client's delayed ACK
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self._send(head=False)
+
+    def do_HEAD(self):
+        self._send(head=True)
+
+    def _send(self, head):
+        url = urlsplit(self.path)
+        try:
+            response = self.server.api.respond(url.path, parse_qs(url.query))
+        except Exception:
+            logger.exception("API request failed: %s", self.path)
+            response = Response(500, {"error": "internal error"})
+
+        use_gzip = (len(response.body) >= GZIP_MIN_BYTES
+                    and "gzip" in self.headers.get("Accept-Encoding", ""))
+        # Each encoding is its own representation, with its own validator
+        etag = response.etag[:-1] + '-gz"' if use_gzip else response.etag
+        if response.status == 200 and _not_modified(self.headers, response, etag):
+            self.send_response(304)
+            body = b""
+        else:
+            self.send_response(response.status)
+            body = response.gzipped if use_gzip else response.body
+            self.send_header("Content-Type", "application/json")
+            if use_gzip:
+                self.send_header("Content-Encoding", "gzip")
+            for name, value in response.headers.items():
+                self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Vary", "Accept-Encoding")
+        if response.status == 200:
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "public, no-cache")
+            if response.last_modified:
+                self.send_header("Last-Modified", response.last_modified)
+        self.end_headers()
+        if not head:
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+
+def create_server(api=None, host=API_HOST, port=API_PORT):
+    """A ThreadingHTTPServer for the API (not yet serving); port 0 picks a free port."""
+    server = ThreadingHTTPServer((host, port), APIRequestHandler)
+    server.daemon_threads = True
+    server.api = api or ModuleAPI()
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Read-only HTTP API for published modules")
+    parser.add_argument("--host", default=API_HOST)
+    parser.add_argument("--port", type=int, default=API_PORT)
+    parser.add_argument("--workspace", help="Workspace to serve (default: the default workspace)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    server = create_server(ModuleAPI(workspace=args.workspace), host=args.host, port=args.port)
+    print(f"Serving published modules on http://{args.host}:{server.server_address[1]}/modules")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,211 @@
+import argparse
+import gzip
+import logging
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+# Allow running as `python utils/backup.py` as well as `python -m utils.backup`
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from utils import database
+
+logger = logging.getLogger(__name__)
+
+# Pages copied per backup step; the source is only read-locked during a step
+BACKUP_STEP_PAGES = 256
+# Seconds to sleep between steps so writers can get in
+BACKUP_STEP_PAUSE = 0.01
+# Snapshots kept by default
+KEEP_BACKUPS = 14
+TIMESTAMP_FORMAT = "%Y%m%d-%H%M%S-%f"
+
+
+def default_backup_dir(db_path=None):
+    return os.path.join(os.path.dirname(os.path.abspath(db_path or database.current_db_path())), "backups")
+
+
+def _snapshot_name(db_path, when):
+    base = os.path.splitext(os.path.basename(db_path))[0]
+    return f"{base}-{when.strftime(TIMESTAMP_FORMAT)}.db.gz"
+
+
+def _check_integrity(path):
+    conn = sqlite3.connect(path)
+    try:
+        result = conn.execute("PRAGMA quick_check").fetchone()[0]
+    finally:
+        conn.close()
+    if result != "ok":
+        raise sqlite3.DatabaseError(f"Integrity check failed for {path}: {result}")
+
+
+def backup_database(dest_dir=None, db_path=None, pages=BACKUP_STEP_PAGES, pause=BACKUP_STEP_PAUSE,
+                    keep=KEEP_BACKUPS, max_age_days=None, progress=None):
+    """Write a compressed, timestamped snapshot of the database. Returns its path.
+
+    Uses the SQLite online backup API in small steps. In WAL mode (set by
+    init_db) the copy runs inside one read transaction, so it sees a single
+    point-in-time snapshot and never blocks or restarts because of the
+    Editor's writes. In rollback-journal mode each step only holds a short
+    read lock, but a concurrent write restarts the copy.
+    """
+    db_path = db_path or database.current_db_path()
+    dest_dir = dest_dir or default_backup_dir(db_path)
+    os.makedirs(dest_dir, exist_ok=True)
+    started = time.perf_counter()
+
+    # Copy into a scratch file next to the destination, then compress it
+    fd, raw_path = tempfile.mkstemp(prefix=".backup-", suffix=".db", dir=dest_dir)
+    os.close(fd)
+    try:
+        source = sqlite3.connect(db_path)
+        target = sqlite3.connect(raw_path)
+        try:
+            if source.execute("PRAGMA journal_mode").fetchone()[0] == "wal":
+                # Pin the snapshot: later commits go to the WAL and are not copied
+                source.execute("BEGIN")
+                source.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+            source.backup(target, pages=pages, progress=progress, sleep=pause)
+        finally:
+            target.close()
+            source.close()
+        _check_integrity(raw_path)
+
+        final_path = os.path.join(dest_dir, _snapshot_name(db_path, datetime.now()))
+        partial_path = final_path + ".partial"
+        with open(raw_path, 'rb') as src, gzip.open(partial_path, 'wb', compresslevel=6) as dst:
+            shutil.copyfileobj(src, dst, 1024 * 1024)
+        os.replace(partial_path, final_path)
+    finally:
+        if os.path.exists(raw_path):
+            os.remove(raw_path)
+
+    logger.info("Backed up %s to %s in %.2fs", db_path, final_path, time.perf_counter() - started)
+    prune_backups(dest_dir, keep, max_age_days, db_path)
+    return final_path
+
+
+def list_backups(dest_dir=None, db_path=None):
+    """Snapshots for a database, newest first: dicts with path, created and size."""
+    db_path = db_path or database.current_db_path()
+    dest_dir = dest_dir or default_backup_dir(db_path)
+    prefix = os.path.splitext(os.path.basename(db_path))[0] + "-"
+    backups = []
+    if not os.path.isdir(dest_dir):
+        return backups
+    for name in os.listdir(dest_dir):
+        if not (name.startswith(prefix) and name.endswith(".db.gz")):
+            continue
+        try:
+            created = datetime.strptime(name[len(prefix):-len(".db.gz")], TIMESTAMP_FORMAT)
+        except ValueError:
+            continue
+        path = os.path.join(dest_dir, name)
+        backups.append({'path': path, 'created': created, 'size': os.path.getsize(path)})
+    return sorted(backups, key=lambda b: b['created'], reverse=True)
+
+
+def prune_backups(dest_dir=None, keep=KEEP_BACKUPS, max_age_days=None, db_path=None):
+    """Delete snapshots beyond the newest `keep` and, optionally, older than max_age_days.
+
+    The newest snapshot is never deleted. Returns the removed paths.
+    """
+    backups = list_backups(dest_dir, db_path)
+    removed = []
+    for index, entry in enumerate(backups):
+        too_many = keep is not None and index >= max(keep, 1)
+        too_old = (max_age_days is not None and index > 0
+                   and (datetime.now() - entry['created']).days > max_age_days)
+        if too_many or too_old:
+            os.remove(entry['path'])
+            removed.append(entry['path'])
+    return removed
+
+
+def restore_backup(snapshot_path, db_path=None, safety_backup=True):
+    """Replace the live database contents with a snapshot.
+
+    The snapshot is copied in through the backup API rather than by replacing
+    the file, so connections held by a running app see the restored data.
+    Unless disabled, the current database is snapshotted first.
+    """
+    db_path = db_path or database.current_db_path()
+    fd, raw_path = tempfile.mkstemp(prefix=".restore-", suffix=".db", dir=os.path.dirname(os.path.abspath(db_path)))
+    os.close(fd)
+    try:
+        opener = gzip.open if snapshot_path.endswith(".gz") else open
+        with opener(snapshot_path, 'rb') as src, open(raw_path, 'wb') as dst:
+            shutil.copyfileobj(src, dst, 1024 * 1024)
+        _check_integrity(raw_path)
+        if safety_backup and os.path.exists(db_path):
+            backup_database(db_path=db_path, keep=None)
+
+        source = sqlite3.connect(raw_path)
+        target = sqlite3.connect(db_path)
+        try:
+            source.backup(target)
+        finally:
+            target.close()
+            source.close()
+    finally:
+        os.remove(raw_path)
+    logger.info("Restored %s from %s", db_path, snapshot_path)
+
+
+def start_backup_thread(interval_hours, **options):
+    """Take a snapshot every `interval_hours` on a daemon thread; returns a stop event."""
+    stop = threading.Event()
+
+    def loop():
+        while not stop.wait(interval_hours * 3600):
+            try:
+                backup_database(**options)
+            except Exception:
+                logger.exception("Scheduled backup failed")
+
+    threading.Thread(target=loop, name="modules-db-backup", daemon=True).start()
+    return stop
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Online backup and restore of modules.db")
+    parser.add_argument("--database", help="Database file (default: modules.db)")
+    parser.add_argument("--dir", help="Backup directory (default: backups/ next to the database)")
+    parser.add_argument("--keep", type=int, default=KEEP_BACKUPS, help="Number of snapshots to keep")
+    parser.add_argument("--max-age-days", type=int, help="Also delete snapshots older than this")
+    parser.add_argument("--step-pages", type=int, default=BACKUP_STEP_PAGES, help="Pages copied per locked step")
+    parser.add_argument("--list", action="store_true", help="List snapshots")
+    parser.add_argument("--restore", metavar="SNAPSHOT", help="Restore the database from a snapshot file")
+    parser.add_argument("--no-safety-backup", action="store_true", help="Do not snapshot the current database before restoring")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for entry in list_backups(args.dir, args.database):
+            print(f"  {entry['created']:%Y-%m-%d %H:%M:%S}  {entry['size']:>14,} bytes  {entry['path']}")
+        return 0
+    if args.restore:
+        restore_backup(args.restore, args.database, safety_backup=not args.no_safety_backup)
+        print(f"Restored from {args.restore}")
+        return 0
+
+    def progress(status, remaining, total):
+        done = total - remaining
+        print(f"\r  {done:,}/{total:,} pages", end="", flush=True)
+
+    started = time.perf_counter()
+    path = backup_database(args.dir, args.database, args.step_pages, keep=args.keep,
+                           max_age_days=args.max_age_days, progress=progress)
+    print(f"\nSnapshot written to {path} ({os.path.getsize(path):,} bytes) in {time.perf_counter() - started:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,363 @@
+import argparse
+import os
+import re
+import sys
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+import numpy as np
+
+# Allow running as `python utils/bloom.py` as well as `python -m utils.bloom`
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from utils import database
+from utils.database import get_db_connection
+
+BLOOM_LEVELS = ("Remember", "Understand", "Apply", "Analyze", "Evaluate", "Create")
+# Prefixes accepted when normalizing tags such as "apply", "Analysing" or "Evaluation"
+_LEVEL_PREFIXES = ("remem", "under", "appl", "analy", "evalu", "creat")
+
+CURRICULUM_PATH = os.path.join(ROOT, "prompts", "curriculum.md")
+
+# Action verbs per level; prompts/curriculum.md adds the words of its own
+# "Bloom's Taxonomy Integration" list on top of these
+BASE_VERBS = {
+    "Remember": "define list recall identify name state recognize memorize repeat label match locate record",
+    "Understand": "explain describe summarize interpret classify discuss paraphrase illustrate infer translate outline",
+    "Apply": "apply use implement execute solve demonstrate calculate practice operate compute modify",
+    "Analyze": "analyze break differentiate organize compare contrast examine distinguish investigate debug deconstruct",
+    "Evaluate": "evaluate judge critique assess justify defend argue appraise recommend prioritize validate",
+    "Create": "create design build develop compose construct produce plan formulate invent generate author",
+}
+_STOPWORDS = frozenset("with from into that this their them make work information".split())
+
+# Hashed bag-of-words size for the learned part of the model
+HASH_DIM = 2 ** 12
+# Only the start of a section is scored; objectives and tasks lead with their verb
+MAX_TOKENS = 400
+# Lexicon hits count this much (in log-odds), doubled inside the first sentence
+LEXICON_WEIGHT = 1.5
+FIRST_SENTENCE_WEIGHT = 2.0
+# Naive Bayes treats every token as independent evidence, which makes it
+# wildly overconfident on long texts; scores are scaled to this many tokens
+EFFECTIVE_TOKENS = 20
+# The learned model is only used once this many approved, tagged sections exist
+MIN_TRAINING_SECTIONS = 20
+TRAINING_LIMIT = 1000
+# Predictions at or above this confidence that disagree with the tag are flagged
+FLAG_CONFIDENCE = float(os.getenv("BLOOM_FLAG_CONFIDENCE", "0.6"))
+# How long a trained model is reused before retraining on newer approvals
+RETRAIN_SECONDS = float(os.getenv("BLOOM_RETRAIN_SECONDS", "600"))
+
+_WORD = re.compile(r"[a-z]+")
+_SENTENCE_END = re.compile(r"[.!?\n]")
+
+
+def normalize_level(level):
+    """Canonical Bloom level for a tag (case and word form insensitive), or None."""
+    text = (level or "").strip().lower()
+    for prefix, canonical in zip(_LEVEL_PREFIXES, BLOOM_LEVELS):
+        if text.startswith(prefix):
+            return canonical
+    return None
+
+
+def _stem(word):
+    """Crude suffix stripping so "analyzes", "analyzed" and "analyzing" match "analyze"."""
+    if word.endswith(("ies", "ied")) and len(word) > 4:
+        return word[:-3] + "y"
+    for suffix in ("ing", "ed", "es", "s"):
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            word = word[:-len(suffix)]
+            break
+    return word.rstrip("e") if len(word) > 3 else word
+
+
+def load_lexicon(path=CURRICULUM_PATH):
+    """Return {stem: level index}; stems claimed by more than one level are dropped."""
+    words = {level: set(verbs.split()) for level, verbs in BASE_VERBS.items()}
+    if path and os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                match = re.match(r"\s*-\s+\*\*(\w+)\*\*:\s*(.+)", line)
+                level = normalize_level(match.group(1)) if match else None
+                if level:
+                    words[level].update(
+                        w for w in _WORD.findall(match.group(2).lower())
+                        if len(w) > 3 and w not in _STOPWORDS
+                    )
+    owners = {}
+    for level, level_words in words.items():
+        for stem in {_stem(w) for w in level_words}:
+            owners.setdefault(stem, set()).add(BLOOM_LEVELS.index(level))
+    return {stem: levels.pop() for stem, levels in owners.items() if len(levels) == 1}
+
+
+def section_text(title, content):
+    # Joined with a colon so the title counts as part of the first sentence
+    return f"{title or ''}: {content or ''}"
+
+
+def _field(section, name):
+    return section.get(name) if isinstance(section, dict) else getattr(section, name)
+
+
+class BloomClassifier:
+    """Verb lexicon plus a multinomial naive Bayes model over hashed words.
+
+    Both parts are linear in the token counts, so a whole module is scored
+    with a few numpy operations. Until fit() has seen enough examples only
+    the lexicon is used.
+    """
+
+    def __init__(self, lexicon=None, dim=HASH_DIM):
+        self.lexicon = load_lexicon() if lexicon is None else lexicon
+        self.dim = dim
+        self.weights = np.zeros((len(BLOOM_LEVELS), dim), dtype=np.float32)
+        self.bias = np.zeros(len(BLOOM_LEVELS), dtype=np.float32)
+        self.trained_on = 0
+        self._tokens = {}
+        self._predictions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _token(self, word):
+        """(hash bucket, lexicon level or -1) for a word, memoized."""
+        entry = self._tokens.get(word)
+        if entry is None:
+            stem = _stem(word)
+            entry = (zlib.crc32(stem.encode()) % self.dim, self.lexicon.get(stem, -1))
+            if len(self._tokens) < 200_000:
+                self._tokens[word] = entry
+        return entry
+
+    def _features(self, texts):
+        """Token buckets (flattened), owning document of each token, lengths and lexicon scores."""
+        buckets, lengths = [], []
+        lexicon = np.zeros((len(texts), len(BLOOM_LEVELS)), dtype=np.float32)
+        for row, text in enumerate(texts):
+            text = (text or "").lower()
+            end = _SENTENCE_END.search(text)
+            first_sentence = len(_WORD.findall(text[:end.start()])) if end else MAX_TOKENS
+            words = _WORD.findall(text)[:MAX_TOKENS]
+            for position, word in enumerate(words):
+                bucket, level = self._token(word)
+                buckets.append(bucket)
+                if level >= 0:
+                    lexicon[row, level] += FIRST_SENTENCE_WEIGHT if position < first_sentence else 1.0
+            lengths.append(len(words))
+        lengths = np.array(lengths, dtype=np.int64)
+        doc_ids = np.repeat(np.arange(len(texts)), lengths)
+        return np.array(buckets, dtype=np.int64), doc_ids, lengths, lexicon
+
+    def fit(self, texts, labels, alpha=1.0):
+        """Train on texts with Bloom tags; unknown tags are skipped. Returns self."""
+        pairs = [(t, BLOOM_LEVELS.index(level)) for t, level in zip(texts, map(normalize_level, labels)) if level]
+        counts = np.zeros((len(BLOOM_LEVELS), self.dim), dtype=np.float64)
+        priors = np.ones(len(BLOOM_LEVELS))
+        if pairs:
+            buckets, doc_ids, _, _ = self._features([t for t, _ in pairs])
+            labels = np.array([label for _, label in pairs])
+            np.add.at(counts, (labels[doc_ids], buckets), 1.0)
+            priors += np.bincount(labels, minlength=len(BLOOM_LEVELS))
+        smoothed = counts + alpha
+        log_probs = np.log(smoothed / smoothed.sum(axis=1, keepdims=True))
+        # Subtract the mean over levels so words seen everywhere carry no weight
+        self.weights = (log_probs - log_probs.mean(axis=0)).astype(np.float32)
+        self.bias = np.log(priors / priors.sum()).astype(np.float32)
+        self.trained_on = len(pairs)
+        with self._lock:
+            self._predictions.clear()
+        return self
+
+    @property
+    def trained(self):
+        return self.trained_on >= MIN_TRAINING_SECTIONS
+
+    def scores(self, texts):
+        """Log-odds per level, shape (len(texts), 6)."""
+        buckets, doc_ids, lengths, lexicon = self._features(texts)
+        logits = lexicon * LEXICON_WEIGHT
+        if self.trained and len(buckets):
+            token_weights = self.weights[:, buckets]
+            likelihood = np.stack([
+                np.bincount(doc_ids, weights=token_weights[level], minlength=len(texts))
+                for level in range(len(BLOOM_LEVELS))
+            ], axis=1)
+            scale = np.minimum(lengths, EFFECTIVE_TOKENS) / np.maximum(lengths, 1)
+            logits = logits + likelihood * scale[:, None] + self.bias
+        return logits
+
+    def predict(self, texts):
+        """[(level, confidence)] per text; (None, 0.0) when there is no evidence at all."""
+        results = [None] * len(texts)
+        missing = []
+        with self._lock:
+            for i, text in enumerate(texts):
+                cached = self._predictions.get(text)
+                if cached is None:
+                    missing.append(i)
+                else:
+                    self._predictions.move_to_end(text)
+                    results[i] = cached
+        if missing:
+            logits = self.scores([texts[i] for i in missing])
+            probs = np.exp(logits - logits.max(axis=1, keepdims=True))
+            probs /= probs.sum(axis=1, keepdims=True)
+            best = probs.argmax(axis=1)
+            with self._lock:
+                for row, i in enumerate(missing):
+                    if not logits[row].any():
+                        prediction = (None, 0.0)
+                    else:
+                        prediction = (BLOOM_LEVELS[best[row]], float(probs[row, best[row]]))
+                    results[i] = prediction
+                    self._predictions[texts[i]] = prediction
+                while len(self._predictions) > 4096:
+                    self._predictions.popitem(last=False)
+        return results
+
+
+_classifier = None
+_classifier_trained_at = 0.0
+_classifier_lock = threading.Lock()
+
+
+def get_classifier(source=None, max_age=RETRAIN_SECONDS):
+    """Process-wide classifier trained on approved sections, retrained every max_age seconds."""
+    global _classifier, _classifier_trained_at
+    with _classifier_lock:
+        if _classifier is None or time.monotonic() - _classifier_trained_at > max_age:
+            rows = (source or database).get_labelled_sections(TRAINING_LIMIT)
+            classifier = BloomClassifier()
+            classifier.fit([section_text(r['title'], r['content']) for r in rows], [r['bloom_level'] for r in rows])
+            _classifier, _classifier_trained_at = classifier, time.monotonic()
+        return _classifier
+
+
+def classify_sections(sections, classifier=None):
+    """Score sections (dicts or utils.models.Section) in one batch.
+
+    Returns one dict per section: tagged (normalized tag), predicted,
+    confidence and consistent (False only for confident disagreements).
+    """
+    classifier = classifier or get_classifier()
+    texts = [section_text(_field(s, 'title'), _field(s, 'content')) for s in sections]
+    results = []
+    for section, (predicted, confidence) in zip(sections, classifier.predict(texts)):
+        tagged = normalize_level(_field(section, 'bloom_level'))
+        results.append({
+            'tagged': tagged,
+            'predicted': predicted,
+            'confidence': confidence,
+            'consistent': not (tagged and predicted and predicted != tagged and confidence >= FLAG_CONFIDENCE),
+        })
+    return results
+
+
+def tag_sections(sections, classifier=None):
+    """Copies of generated section dicts with normalized tags; missing tags are predicted."""
+    tagged = []
+    for section, result in zip(sections, classify_sections(sections, classifier)):
+        section = dict(section)
+        section['bloom_level'] = result['tagged'] or result['predicted']
+        tagged.append(section)
+    return tagged
+
+
+def backfill_bloom_levels(batch_size=500, dry_run=False, classifier=None):
+    """Normalize non-canonical tags and predict missing ones across the database.
+
+    Returns counts of tags normalized, predicted and left empty (no evidence).
+    """
+    classifier = classifier or get_classifier()
+    report = {'normalized': 0, 'predicted': 0, 'unresolved': 0}
+    last_id = 0
+    placeholders = ",".join("?" * len(BLOOM_LEVELS))
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        while True:
+            cursor.execute(f"""
+                SELECT id, title, content, bloom_level FROM sections
+                WHERE id > ? AND (bloom_level IS NULL OR bloom_level NOT IN ({placeholders}))
+                ORDER BY id LIMIT ?
+            """, (last_id, *BLOOM_LEVELS, batch_size))
+            rows = cursor.fetchall()
+            if not rows:
+                return report
+            last_id = rows[-1]['id']
+            updates = []
+            for row, result in zip(rows, classify_sections([dict(r) for r in rows], classifier)):
+                if result['tagged']:
+                    report['normalized'] += 1
+                    updates.append((result['tagged'], row['id']))
+                elif result['predicted']:
+                    report['predicted'] += 1
+                    updates.append((result['predicted'], row['id']))
+                else:
+                    report['unresolved'] += 1
+            if updates and not dry_run:
+                cursor.executemany("UPDATE sections SET bloom_level = ? WHERE id = ?", updates)
+                conn.commit()
+
+
+def find_inconsistent_tags(min_confidence=FLAG_CONFIDENCE, batch_size=1000, classifier=None):
+    """Sections across the database whose tag confidently disagrees with their content."""
+    classifier = classifier or get_classifier()
+    flagged = []
+    last_id = 0
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        while True:
+            cursor.execute("""
+                SELECT id, module_id, section_id, title, content, bloom_level FROM sections
+                WHERE id > ? ORDER BY id LIMIT ?
+            """, (last_id, batch_size))
+            rows = [dict(r) for r in cursor.fetchall()]
+            if not rows:
+                return flagged
+            last_id = rows[-1]['id']
+            for row, result in zip(rows, classify_sections(rows, classifier)):
+                if (result['tagged'] and result['predicted'] != result['tagged']
+                        and result['confidence'] >= min_confidence):
+                    flagged.append({
+                        'id': row['id'], 'module_id': row['module_id'], 'title': row['title'],
+                        'tagged': result['tagged'], 'predicted': result['predicted'],
+                        'confidence': result['confidence'],
+                    })
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local Bloom-level tagging for modules.db")
+    parser.add_argument("--backfill", action="store_true", help="Fill in missing and normalize non-standard tags")
+    parser.add_argument("--report", action="store_true", help="List sections whose tag disagrees with their content")
+    parser.add_argument("--min-confidence", type=float, default=FLAG_CONFIDENCE, help="Confidence needed to flag a tag")
+    parser.add_argument("--dry-run", action="store_true", help="Count backfill changes without writing")
+    parser.add_argument("--classify", metavar="TEXT", help="Classify a piece of text")
+    args = parser.parse_args(argv)
+
+    database.init_db()
+    classifier = get_classifier()
+    source = f"{classifier.trained_on} approved sections" if classifier.trained else "verb lexicon only"
+    print(f"Classifier: {source}")
+    if args.classify:
+        level, confidence = classifier.predict([args.classify])[0]
+        print(f"{level or 'unknown'} ({confidence:.0%})")
+    if args.backfill:
+        started = time.perf_counter()
+        report = backfill_bloom_levels(dry_run=args.dry_run, classifier=classifier)
+        prefix = "Would update" if args.dry_run else "Updated"
+        print(f"{prefix}: {report['normalized']} normalized, {report['predicted']} predicted, "
+              f"{report['unresolved']} left empty ({time.perf_counter() - started:.2f}s)")
+    if args.report:
+        for row in find_inconsistent_tags(args.min_confidence, classifier=classifier):
+            print(f"  module {row['module_id']:>5} section {row['id']:>7}  tagged {row['tagged']:<10} "
+                  f"reads as {row['predicted']:<10} ({row['confidence']:.0%})  {row['title']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,55 @@
+import sys
+import os
+import importlib
+# Ensure the project root is importable when running tests directly
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import pytest
+
+from utils import database
+from utils.repository import create_repository
+
+# Set REQUIRE_POSTGRES=1 (e.g. in CI) to fail instead of skipping when the
+# PostgreSQL test dependencies (requirements-postgres.txt) are missing
+REQUIRE_POSTGRES = os.getenv("REQUIRE_POSTGRES") == "1"
+
+# Tables the Postgres backend, job store and state store create
+POSTGRES_TABLES = "changes, versions, approvals, sections, modules, jobs, app_state"
+
+
+def _require(module):
+    try:
+        return importlib.import_module(module)
+    except ImportError:
+        reason = f"PostgreSQL tests need {module}: pip install -r requirements-postgres.txt"
+        if REQUIRE_POSTGRES:
+            pytest.fail(reason, pytrace=False)
+        pytest.skip(reason)
+
+
+@pytest.fixture(scope="session")
+def postgres_dsn(tmp_path_factory):
+    """TEST_DATABASE_URL, or a throwaway embedded server when pgserver is installed."""
+    _require("psycopg2")
+    dsn = os.getenv("TEST_DATABASE_URL")
+    if dsn:
+        yield dsn
+        return
+    pgserver = _require("pgserver")
+    server = pgserver.get_server(str(tmp_path_factory.mktemp("pgdata")), cleanup_mode="stop")
+    yield server.get_uri()
+    server.cleanup()
+
+
+@pytest.fixture
+def postgres_repository(postgres_dsn, tmp_path, monkeypatch):
+    """PostgresRepository on empty tables (content packs go to tmp_path)."""
+    monkeypatch.setattr(database, "DB_PATH", str(tmp_path / "modules.db"))
+    repository = create_repository("postgres", postgres_dsn)
+    with repository.connection() as conn:
+        conn.cursor().execute(f"DROP TABLE IF EXISTS {POSTGRES_TABLES} CASCADE")
+    repository.init_schema()
+    yield repository
+    repository.close()
@@ -0,0 +1,242 @@
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import threading
+import zlib
+from datetime import datetime, timezone
+
+# Allow running as `python utils/content_pack.py` as well as `python -m utils.content_pack`
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from utils import database
+
+# Where publish writes packs; defaults to packs/ next to the (workspace's) database
+# file. Non-default workspaces get a subdirectory of CONTENT_PACK_DIR when it is set.
+CONTENT_PACK_DIR = os.getenv("CONTENT_PACK_DIR", "")
+# zlib level for section bodies (bodies that do not shrink are stored as-is)
+COMPRESSION_LEVEL = 6
+
+# Pack layout, little-endian:
+#   header | index (one entry per section, sorted by id) | metadata (zlib JSON) | bodies
+# Header: magic, format version, reserved, module id, section count, metadata length
+HEADER = struct.Struct("<4sHHqII")
+# Index entry: section id, body offset, stored length, text length, compressed flag
+ENTRY = struct.Struct("<qQIIB3x")
+MAGIC = b"MPAK"
+FORMAT_VERSION = 1
+
+
+class ContentPackError(Exception):
+    """Raised for files that are not valid content packs."""
+
+
+def pack_dir(db_path=None):
+    if CONTENT_PACK_DIR:
+        workspace = database.current_workspace()
+        if workspace == database.DEFAULT_WORKSPACE:
+            return CONTENT_PACK_DIR
+        return os.path.join(CONTENT_PACK_DIR, workspace)
+    return os.path.join(os.path.dirname(os.path.abspath(db_path or database.current_db_path())), "packs")
+
+
+def pack_path(module_id, directory=None):
+    return os.path.join(directory or pack_dir(), f"module_{module_id}.pack")
+
+
+def build_pack(module, directory=None):
+    """Compile a get_module_by_id() dict (with content) into its pack file; returns the path.
+
+    The file is written next to its final name and renamed into place, so
+    readers that already mapped the previous pack keep a consistent copy.
+    """
+    sections = module['sections']
+    bodies = []
+    for section in sections:
+        text = section['content'].encode('utf-8')
+        packed = zlib.compress(text, COMPRESSION_LEVEL)
+        compressed = len(packed) < len(text)
+        bodies.append((section['id'], packed if compressed else text, len(text), compressed))
+    meta = zlib.compress(json.dumps({
+        'module_id': module['id'],
+        'module_title': module['module_title'],
+        'published_at': datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S"),
+        'sections': [
+            {key: section.get(key) for key in
+             ('id', 'section_id', 'title', 'type', 'bloom_level', 'version', 'is_approved',
+              'rejection_comments')}
+            for section in sections
+        ],
+    }).encode('utf-8'), COMPRESSION_LEVEL)
+
+    index = bytearray()
+    offset = HEADER.size + ENTRY.size * len(bodies) + len(meta)
+    for section_id, data, text_length, compressed in sorted(bodies):
+        index += ENTRY.pack(section_id, offset, len(data), text_length, compressed)
+        offset += len(data)
+
+    directory = directory or pack_dir()
+    os.makedirs(directory, exist_ok=True)
+    path = pack_path(module['id'], directory)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, FORMAT_VERSION, 0, module['id'], len(bodies), len(meta)))
+            f.write(index)
+            f.write(meta)
+            for _, data, _, _ in sorted(bodies):
+                f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return path
+
+
+class ContentPack:
+    """Read-only, memory-mapped view of one pack file.
+
+    Any number of processes can map the same file; the OS shares the pages.
+    raw() hands out slices of the mapping without copying, get_content()
+    decodes (and decompresses) one section.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size < HEADER.size:
+                raise ContentPackError(f"{path}: truncated header")
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+        magic, version, _, self.module_id, count, meta_length = HEADER.unpack_from(self._view)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            self.close()
+            raise ContentPackError(f"{path}: not a version {FORMAT_VERSION} content pack")
+        index_end = HEADER.size + ENTRY.size * count
+        self._index = {
+            entry[0]: entry[1:] for entry in ENTRY.iter_unpack(self._view[HEADER.size:index_end])
+        }
+        self.meta = json.loads(zlib.decompress(self._view[index_end:index_end + meta_length]))
+
+    def __contains__(self, section_id):
+        return section_id in self._index
+
+    def __len__(self):
+        return len(self._index)
+
+    @property
+    def sections(self):
+        """Section metadata (no content) in module order."""
+        return self.meta['sections']
+
+    def raw(self, section_id):
+        """(stored bytes as a memoryview into the mapping, compressed flag)."""
+        offset, length, _, compressed = self._index[section_id]
+        return self._view[offset:offset + length], bool(compressed)
+
+    def get_content(self, section_id):
+        data, compressed = self.raw(section_id)
+        if compressed:
+            return zlib.decompress(data).decode('utf-8')
+        return str(data, 'utf-8')
+
+    def close(self):
+        """Unmap the file. Fails with BufferError while raw() views are still referenced."""
+        self._view.release()
+        self._mmap.close()
+
+
+_open_packs = {}
+_open_packs_lock = threading.Lock()
+
+
+def open_pack(module_id, directory=None):
+    """Shared ContentPack for a module, or None if it has not been published.
+
+    A republished pack (a new file under the same name) is picked up on the
+    next call; the previous mapping is left to readers still holding it.
+    """
+    path = pack_path(module_id, directory)
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    signature = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+    with _open_packs_lock:
+        cached = _open_packs.get(path)
+        if cached is None or cached[0] != signature:
+            cached = _open_packs[path] = (signature, ContentPack(path))
+        return cached[1]
+
+
+def get_published_section(module_id, section_id, directory=None):
+    """Published metadata and content of one section (by database id), or None."""
+    pack = open_pack(module_id, directory)
+    if pack is None or section_id not in pack:
+        return None
+    meta = next(s for s in pack.sections if s['id'] == section_id)
+    return {**meta, 'content': pack.get_content(section_id)}
+
+
+def export_published_module(module_id, directory=None):
+    """A module's published copy in the export_module_to_json layout, or None without a pack."""
+    pack = open_pack(module_id, directory)
+    if pack is None:
+        return None
+    return {
+        'module_title': pack.meta['module_title'],
+        'sections': [
+            {
+                'id': s['section_id'],
+                'title': s['title'],
+                'content': pack.get_content(s['id']),
+                'type': s['type'],
+                'bloom_level': s['bloom_level'],
+                'is_approved': s['is_approved'],
+                'rejection_comments': s.get('rejection_comments'),
+            }
+            for s in pack.sections
+        ],
+    }
+
+
+def build_all(directory=None):
+    """(Re)build the pack of every published module; returns the paths written."""
+    return [
+        build_pack(database.get_module_by_id(module['id']), directory)
+        for module in database.get_all_modules() if module['status'] == 'published'
+    ]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build and inspect content packs of published modules")
+    parser.add_argument("--build-all", action="store_true", help="Rebuild the packs of all published modules")
+    parser.add_argument("--show", type=int, metavar="MODULE_ID", help="List the sections in a module's pack")
+    parser.add_argument("--dir", help=f"Pack directory (default {pack_dir()})")
+    args = parser.parse_args(argv)
+
+    if args.build_all:
+        paths = build_all(args.dir)
+        print(f"Built {len(paths)} packs ({sum(os.path.getsize(p) for p in paths)} bytes) in {args.dir or pack_dir()}")
+    if args.show is not None:
+        pack = open_pack(args.show, args.dir)
+        if pack is None:
+            print(f"Module {args.show} has no pack")
+            return 1
+        print(f"{pack.meta['module_title']} (published {pack.meta['published_at']}), {len(pack)} sections")
+        for section in pack.sections:
+            data, compressed = pack.raw(section['id'])
+            print(f"  {section['id']:>7}  {section['section_id']:<12} {len(data):>7} bytes"
+                  f"{' (zlib)' if compressed else ''}  {section['title']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,31 +1,297 @@
 import sqlite3
 import json
 import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
 from datetime import datetime
 from contextlib import contextmanager
+from urllib.parse import quote
+from utils.merge import three_way_merge
 
 # Database configuration - get path relative to this file
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 DB_PATH = os.path.join(SCRIPT_DIR, "..", "modules.db")
 
+# Connection class used for every connection; profiling and tracing tools
+# swap in a sqlite3.Connection subclass here.
+CONNECTION_FACTORY = sqlite3.Connection
+
+# Workspace shards: every workspace (team/organization) other than the
+# default one has its own database file, WORKSPACES_DIR/<name>/modules.db,
+# so teams do not queue behind each other's writes. Defaults to workspaces/
+# next to DB_PATH; the default workspace is DB_PATH itself.
+WORKSPACES_DIR = os.getenv("WORKSPACES_DIR", "")
+DEFAULT_WORKSPACE = "default"
+_WORKSPACE_NAME = re.compile(r"^[a-z0-9][a-z0-9_-]{0,62}$")
+_workspace = ContextVar("workspace", default=None)
+
+# Open connections kept per thread (one per database file and mode)
+CONNECTION_CACHE_SIZE = int(os.getenv("CONNECTION_CACHE_SIZE", "8"))
+
+def workspaces_dir():
+    return WORKSPACES_DIR or os.path.join(os.path.dirname(os.path.abspath(DB_PATH)), "workspaces")
+
+def workspace_db_path(workspace):
+    """Database file of a workspace (DB_PATH for the default workspace)."""
+    if workspace in (None, DEFAULT_WORKSPACE):
+        return DB_PATH
+    if not _WORKSPACE_NAME.match(workspace):
+        raise ValueError(f"Invalid workspace name: {workspace!r} (use a-z, 0-9, '-' and '_')")
+    return os.path.join(workspaces_dir(), workspace, "modules.db")
+
+def current_workspace():
+    return _workspace.get() or DEFAULT_WORKSPACE
+
+def current_db_path():
+    """Database file that database calls on this thread/context go to."""
+    return workspace_db_path(_workspace.get())
+
 @contextmanager
-def get_db_connection():
-    """Context manager for database connections."""
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
+def use_workspace(workspace):
+    """Route every database call in this block to the workspace's shard.
+
+    The choice is held in a ContextVar, so it does not carry over into
+    threads started inside the block.
+    """
+    workspace_db_path(workspace)
+    token = _workspace.set(workspace)
     try:
+        yield
+    finally:
+        _workspace.reset(token)
+
+def list_workspaces():
+    """The default workspace plus every shard under workspaces_dir()."""
+    try:
+        names = sorted(
+            name for name in os.listdir(workspaces_dir())
+            if _WORKSPACE_NAME.match(name) and os.path.exists(workspace_db_path(name))
+        )
+    except FileNotFoundError:
+        names = []
+    return [DEFAULT_WORKSPACE] + [name for name in names if name != DEFAULT_WORKSPACE]
+
+def create_workspace(workspace):
+    """Create (or migrate) a workspace's shard; returns its database path."""
+    path = workspace_db_path(workspace)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with use_workspace(workspace):
+        init_db()
+    return path
+
+def init_all_workspaces():
+    """Create or migrate the tables of every workspace's database."""
+    for workspace in list_workspaces():
+        with use_workspace(workspace):
+            init_db()
+
+def fan_out(fn, workspaces=None, max_workers=8):
+    """Call fn() once per workspace, in parallel, each routed to its shard.
+
+    Returns {workspace: result} in workspace order.
+    """
+    workspaces = list_workspaces() if workspaces is None else list(workspaces)
+
+    def run(workspace):
+        with use_workspace(workspace):
+            return fn()
+
+    if len(workspaces) <= 1:
+        return {workspace: run(workspace) for workspace in workspaces}
+    with ThreadPoolExecutor(min(max_workers, len(workspaces))) as pool:
+        return dict(zip(workspaces, pool.map(run, workspaces)))
+
+class _ConnectionCache(threading.local):
+    """Connections kept open per thread for reuse by later calls.
+
+    A connection already in use further up the stack is not shared: nested
+    calls get a private connection that is closed afterwards. Connections
+    are dropped after an error and whenever the connection factory changes.
+    """
+
+    def __init__(self):
+        self.entries = OrderedDict()
+
+    @contextmanager
+    def checkout(self, key, connect):
+        entry = self.entries.get(key)
+        if entry is not None and entry['busy']:
+            conn = connect()
+            try:
+                yield conn
+            finally:
+                conn.close()
+            return
+        if entry is None:
+            entry = self.entries[key] = {'conn': connect(), 'busy': False}
+        self.entries.move_to_end(key)
+        entry['busy'] = True
+        self._evict()
+        try:
+            yield entry['conn']
+        except BaseException:
+            del self.entries[key]
+            entry['conn'].close()
+            raise
+        else:
+            # Traced connections (utils.query_trace) record SELECTs whose rows were
+            # not all read here; read-only connections never commit to do it
+            flush = getattr(entry['conn'], "_flush_cursors", None)
+            if flush is not None:
+                flush()
+        finally:
+            entry['busy'] = False
+            if CONNECTION_CACHE_SIZE <= 0:
+                self.entries.pop(key, None)
+                entry['conn'].close()
+
+    def _evict(self):
+        for key in list(self.entries):
+            if len(self.entries) <= CONNECTION_CACHE_SIZE:
+                return
+            if not self.entries[key]['busy']:
+                self.entries.pop(key)['conn'].close()
+
+    def clear(self):
+        for key in [k for k, entry in self.entries.items() if not entry['busy']]:
+            self.entries.pop(key)['conn'].close()
+
+_connections = _ConnectionCache()
+
+def _connect(path):
+    conn = sqlite3.connect(path, factory=CONNECTION_FACTORY)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+@contextmanager
+def get_db_connection():
+    """Context manager for connections to the current workspace's database.
+
+    Commits on success and rolls back on error. The connection comes from a
+    per-thread cache (see _ConnectionCache), so callers must not close it.
+    """
+    path = current_db_path()
+    with _connections.checkout(("rw", path, CONNECTION_FACTORY), lambda: _connect(path)) as conn:
+        try:
+            yield conn
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            raise e
+
+@contextmanager
+def get_attached_connection(path, alias):
+    """get_db_connection() with another database file ATTACHed as `alias`.
+
+    The transaction is committed before the DETACH, so the cached connection
+    goes back to later callers without the attachment (after an error the
+    connection is dropped from the cache instead).
+    """
+    with get_db_connection() as conn:
+        conn.execute(f"ATTACH DATABASE ? AS {alias}", (path,))
         yield conn
         conn.commit()
-    except Exception as e:
-        conn.rollback()
-        raise e
+        conn.execute(f"DETACH DATABASE {alias}")
+
+# Where read-only helpers read from:
+#   "primary" - the same read/write connection as writers
+#   "ro"      - a separate mode=ro connection (WAL: never blocks or is blocked by writers)
+#   "memory"  - like "ro", plus an in-memory copy for code running inside replica_reads()
+READ_REPLICA = os.getenv("READ_REPLICA", "ro")
+# Maximum age of the in-memory replica before it is checked against the primary
+REPLICA_REFRESH_SECONDS = float(os.getenv("REPLICA_REFRESH_SECONDS", "2"))
+
+_replica_reads = ContextVar("replica_reads", default=False)
+_replica_lock = threading.Lock()
+# In-memory replicas by database file: {path: {'conn', 'head', 'checked_at'}}
+_replicas = {}
+
+@contextmanager
+def replica_reads():
+    """Let read-only helpers in this block use the in-memory replica (may lag by seconds)."""
+    token = _replica_reads.set(True)
+    try:
+        yield
     finally:
-        conn.close()
+        _replica_reads.reset(token)
+
+def _change_head(conn):
+    return conn.execute("SELECT COALESCE(MAX(id), 0) FROM changes").fetchone()[0]
+
+def _memory_replica():
+    """Return the in-memory copy of the current database, refreshing it when it is stale."""
+    path = current_db_path()
+    with _replica_lock:
+        now = time.monotonic()
+        replica = _replicas.get(path)
+        if replica is not None and now - replica['checked_at'] < REPLICA_REFRESH_SECONDS:
+            return replica['conn']
+        with _open_read_only() as primary:
+            head = _change_head(primary)
+            if replica is None or head != replica['head']:
+                # Build a fresh copy and swap it in; readers of the old copy finish undisturbed
+                conn = sqlite3.connect(":memory:", check_same_thread=False, factory=CONNECTION_FACTORY)
+                primary.backup(conn)
+                conn.row_factory = sqlite3.Row
+                replica = _replicas[path] = {'conn': conn, 'head': head}
+        replica['checked_at'] = now
+        return replica['conn']
+
+def _connect_read_only(path):
+    uri = f"file:{quote(os.path.abspath(path))}?mode=ro"
+    conn = sqlite3.connect(uri, uri=True, factory=CONNECTION_FACTORY)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+@contextmanager
+def _open_read_only():
+    path = current_db_path()
+    with _connections.checkout(("ro", path, CONNECTION_FACTORY), lambda: _connect_read_only(path)) as conn:
+        yield conn
+
+@contextmanager
+def get_read_connection():
+    """Context manager for connections used by read-only helpers (see READ_REPLICA)."""
+    if READ_REPLICA == "memory" and _replica_reads.get():
+        yield _memory_replica()
+    elif READ_REPLICA in ("ro", "memory"):
+        with _open_read_only() as conn:
+            yield conn
+    else:
+        with get_db_connection() as conn:
+            yield conn
+
+# create_tables(conn) callbacks for tables owned by other modules (app_state, jobs)
+_schema_hooks = []
+
+def register_schema(create_tables):
+    """Have init_db() also run create_tables(conn), so new workspaces get the table.
+
+    It is applied right away to the current database and every workspace.
+    """
+    if create_tables not in _schema_hooks:
+        _schema_hooks.append(create_tables)
+    workspaces = list_workspaces()
+    if current_workspace() not in workspaces:
+        workspaces.append(current_workspace())
+    for workspace in workspaces:
+        with use_workspace(workspace), get_db_connection() as conn:
+            create_tables(conn)
 
 def init_db():
     """Initialize the database with required tables."""
     with get_db_connection() as conn:
         cursor = conn.cursor()
+
+        # Lets utils.maintenance release free pages without a full VACUUM
+        # (only takes effect for new database files)
+        cursor.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        # WAL: readers (and online backups) do not block the Editor's writes
+        cursor.execute("PRAGMA journal_mode = WAL")
         
         # Modules table
         cursor.execute("""
@@ -48,6 +314,7 @@ def init_db():
                 content TEXT NOT NULL,
                 type TEXT NOT NULL,
                 bloom_level TEXT,
+                version INTEGER NOT NULL DEFAULT 1,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 FOREIGN KEY (module_id) REFERENCES modules(id) ON DELETE CASCADE,
@@ -77,58 +344,149 @@ def init_db():
                 section_id INTEGER NOT NULL,
                 original_content TEXT NOT NULL,
                 edited_content TEXT NOT NULL,
+                version INTEGER,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 FOREIGN KEY (section_id) REFERENCES sections(id) ON DELETE CASCADE
             )
         """)
 
+        # Columns added after the first release
+        _ensure_column(cursor, "sections", "version", "INTEGER NOT NULL DEFAULT 1")
+        _ensure_column(cursor, "versions", "version", "INTEGER")
+        # Content quality scores (utils.quality), kept current on every write
+        for column in ("quality_score", "readability_score", "length_score", "coverage_score"):
+            _ensure_column(cursor, "sections", column, "REAL")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_sections_quality ON sections(quality_score)")
+        
+        # Change log (append-only, filled by triggers) for live updates
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS changes (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                table_name TEXT NOT NULL,
+                row_id INTEGER NOT NULL,
+                module_id INTEGER,
+                op TEXT NOT NULL,
+                changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_changes_module ON changes(module_id, id)")
+        for op in ("INSERT", "UPDATE", "DELETE"):
+            row = "OLD" if op == "DELETE" else "NEW"
+            cursor.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_modules_{op.lower()} AFTER {op} ON modules
+                BEGIN
+                    INSERT INTO changes (table_name, row_id, module_id, op)
+                    VALUES ('modules', {row}.id, {row}.id, '{op.lower()}');
+                END
+            """)
+            cursor.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_sections_{op.lower()} AFTER {op} ON sections
+                BEGIN
+                    INSERT INTO changes (table_name, row_id, module_id, op)
+                    VALUES ('sections', {row}.id, {row}.module_id, '{op.lower()}');
+                END
+            """)
+            cursor.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_approvals_{op.lower()} AFTER {op} ON approvals
+                BEGIN
+                    INSERT INTO changes (table_name, row_id, module_id, op)
+                    VALUES ('approvals', {row}.section_id,
+                            (SELECT module_id FROM sections WHERE id = {row}.section_id), '{op.lower()}');
+                END
+            """)
+
+        for create_tables in _schema_hooks:
+            create_tables(conn)
+
+def _ensure_column(cursor, table, column, definition):
+    """Add a column to an existing table if it is missing."""
+    cursor.execute(f"PRAGMA table_info({table})")
+    if column not in [row[1] for row in cursor.fetchall()]:
+        cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
 def reset_db():
-    """Clear all data from the database (for testing/reset purposes)."""
+    """Clear all data from the database (for testing/reset purposes).
+
+    Every table is emptied, including the change log and the tables added
+    through register_schema() (jobs, app_state, review log), and content
+    packs are deleted, so no orphaned rows or files are left behind.
+    """
+    from utils.content_pack import pack_dir
+
     with get_db_connection() as conn:
         cursor = conn.cursor()
-        cursor.execute("DELETE FROM versions")
-        cursor.execute("DELETE FROM approvals")
-        cursor.execute("DELETE FROM sections")
-        cursor.execute("DELETE FROM modules")
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'")
+        others = [row[0] for row in cursor.fetchall()]
+        # Children first; the change log last, after the delete triggers have fired
+        ordered = ["versions", "approvals", "sections", "modules"]
+        ordered += [t for t in others if t not in ordered and t != "changes"] + ["changes"]
+        for table in ordered:
+            cursor.execute(f"DELETE FROM {table}")
+    directory = pack_dir()
+    if os.path.isdir(directory):
+        for name in os.listdir(directory):
+            if name.endswith(".pack"):
+                os.remove(os.path.join(directory, name))
 
 def save_module_to_db(module_title, sections):
     """Save a complete module with all sections to the database."""
     with get_db_connection() as conn:
-        cursor = conn.cursor()
-        
-        # Insert module
-        cursor.execute("""
-            INSERT INTO modules (module_title, status)
-            VALUES (?, ?)
-        """, (module_title, 'draft'))
-        module_id = cursor.lastrowid
-        
-        # Insert sections
-        for section in sections:
-            cursor.execute("""
-                INSERT INTO sections (module_id, section_id, title, content, type, bloom_level)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, (
-                module_id,
-                section['id'],
-                section['title'],
-                section['content'],
-                section['type'],
-                section.get('bloom_level')
-            ))
-            section_db_id = cursor.lastrowid
-            
-            # Initialize approval record
-            cursor.execute("""
-                INSERT INTO approvals (section_id, is_approved, is_rejected)
-                VALUES (?, ?, ?)
-            """, (section_db_id, 0, 0))
-        
-        return module_id
+        return insert_module(conn.cursor(), module_title, sections)
 
-def get_module_by_id(module_id):
-    """Retrieve a complete module from the database."""
-    with get_db_connection() as conn:
+def insert_module(cursor, module_title, sections, status='draft', approved=False):
+    """Insert a module, its sections and approval records using an open cursor.
+
+    Lets callers batch several modules into one transaction. Returns the new module id.
+    """
+    cursor.execute("""
+        INSERT INTO modules (module_title, status)
+        VALUES (?, ?)
+    """, (module_title, status))
+    module_id = cursor.lastrowid
+    
+    # Insert sections, scored in one batch
+    from utils.quality import score_sections
+    scores = score_sections([s['content'] for s in sections], [s['type'] for s in sections])
+    cursor.executemany("""
+        INSERT INTO sections (module_id, section_id, title, content, type, bloom_level,
+                              quality_score, readability_score, length_score, coverage_score)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, [
+        (
+            module_id,
+            section['id'],
+            section['title'],
+            section['content'],
+            section['type'],
+            section.get('bloom_level')
+        ) + score
+        for section, score in zip(sections, scores)
+    ])
+    
+    # Initialize approval records
+    cursor.execute("""
+        INSERT INTO approvals (section_id, is_approved, is_rejected, approved_at)
+        SELECT id, ?, 0, CASE WHEN ? THEN CURRENT_TIMESTAMP END
+        FROM sections
+        WHERE module_id = ?
+    """, (1 if approved else 0, 1 if approved else 0, module_id))
+    
+    return module_id
+
+# Section columns without the content body (see utils.models for lazy loading)
+SECTION_OUTLINE_COLUMNS = (
+    "s.id, s.module_id, s.section_id, s.title, s.type, s.bloom_level, "
+    "s.version, s.created_at, s.updated_at, "
+    "s.quality_score, s.readability_score, s.length_score, s.coverage_score"
+)
+
+def get_module_by_id(module_id, include_content=True):
+    """Retrieve a complete module from the database.
+
+    With include_content=False the sections carry no 'content' key.
+    """
+    section_columns = "s.*" if include_content else SECTION_OUTLINE_COLUMNS
+    with get_read_connection() as conn:
         cursor = conn.cursor()
         
         # Get module
@@ -139,8 +497,8 @@ def get_module_by_id(module_id):
             return None
         
         # Get sections
-        cursor.execute("""
-            SELECT s.*, a.is_approved, a.is_rejected, a.rejection_comments
+        cursor.execute(f"""
+            SELECT {section_columns}, a.is_approved, a.is_rejected, a.rejection_comments
             FROM sections s
             LEFT JOIN approvals a ON s.id = a.section_id
             WHERE s.module_id = ?
@@ -157,9 +515,81 @@ def get_module_by_id(module_id):
             'sections': [dict(s) for s in sections]
         }
 
+def get_modules_by_ids(module_ids):
+    """Get the module rows (without sections) for the given ids."""
+    if not module_ids:
+        return []
+    with get_read_connection() as conn:
+        cursor = conn.cursor()
+        placeholders = ",".join("?" * len(module_ids))
+        cursor.execute(f"""
+            SELECT id, module_title, created_at, updated_at, status
+            FROM modules
+            WHERE id IN ({placeholders})
+        """, list(module_ids))
+        return [dict(m) for m in cursor.fetchall()]
+
+def get_sections_by_ids(section_ids, include_content=True):
+    """Get sections (with approval status) by database id, in the same shape as get_module_by_id."""
+    if not section_ids:
+        return []
+    section_columns = "s.*" if include_content else SECTION_OUTLINE_COLUMNS
+    with get_read_connection() as conn:
+        cursor = conn.cursor()
+        placeholders = ",".join("?" * len(section_ids))
+        cursor.execute(f"""
+            SELECT {section_columns}, a.is_approved, a.is_rejected, a.rejection_comments
+            FROM sections s
+            LEFT JOIN approvals a ON s.id = a.section_id
+            WHERE s.id IN ({placeholders})
+            ORDER BY s.id
+        """, list(section_ids))
+        return [dict(s) for s in cursor.fetchall()]
+
+def get_section_contents(section_ids):
+    """Return {section id: (version, content)} for the given sections."""
+    if not section_ids:
+        return {}
+    with get_read_connection() as conn:
+        cursor = conn.cursor()
+        placeholders = ",".join("?" * len(section_ids))
+        cursor.execute(f"""
+            SELECT id, version, content FROM sections WHERE id IN ({placeholders})
+        """, list(section_ids))
+        return {row[0]: (row[1], row[2]) for row in cursor.fetchall()}
+
+def get_change_cursor():
+    """Return the id of the latest change log entry (0 if empty)."""
+    with get_read_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT COALESCE(MAX(id), 0) FROM changes")
+        return cursor.fetchone()[0]
+
+def changes_since(change_cursor, module_id=None, limit=1000):
+    """Get change log entries after a cursor, optionally for a single module.
+
+    Returns (changes, new_cursor); pass new_cursor to the next call.
+    """
+    with get_read_connection() as conn:
+        cursor = conn.cursor()
+        # Read the head first so entries committed meanwhile are not skipped
+        cursor.execute("SELECT COALESCE(MAX(id), 0) FROM changes")
+        head = cursor.fetchone()[0]
+        cursor.execute("""
+            SELECT id, table_name, row_id, module_id, op, changed_at
+            FROM changes
+            WHERE id > ? AND id <= ? AND (? IS NULL OR module_id = ?)
+            ORDER BY id
+            LIMIT ?
+        """, (change_cursor, head, module_id, module_id, limit))
+        changes = [dict(c) for c in cursor.fetchall()]
+        if len(changes) == limit:
+            return changes, changes[-1]['id']
+        return changes, max(head, change_cursor)
+
 def get_all_modules():
     """Get all modules with their status."""
-    with get_db_connection() as conn:
+    with get_read_connection() as conn:
         cursor = conn.cursor()
         cursor.execute("""
             SELECT id, module_title, created_at, updated_at, status
@@ -169,63 +599,277 @@ def get_all_modules():
         modules = cursor.fetchall()
         return [dict(m) for m in modules]
 
-def update_section_content(section_id, new_content):
-    """Update section content and create a version record."""
+def get_all_modules_all_workspaces():
+    """get_all_modules() across every workspace, tagged with 'workspace', newest first."""
+    modules = [
+        dict(module, workspace=workspace)
+        for workspace, rows in fan_out(get_all_modules).items() for module in rows
+    ]
+    return sorted(modules, key=lambda m: m['created_at'] or "", reverse=True)
+
+def get_library_stats():
+    """Module and section counts of the current workspace."""
+    with get_read_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT
+                (SELECT COUNT(*) FROM modules) as modules,
+                (SELECT COUNT(*) FROM modules WHERE status = 'published') as published,
+                (SELECT COUNT(*) FROM sections) as sections,
+                (SELECT COUNT(*) FROM approvals WHERE is_approved = 1) as approved,
+                (SELECT COUNT(*) FROM approvals WHERE is_rejected = 1) as rejected
+        """)
+        return dict(cursor.fetchone())
+
+def get_workspace_stats():
+    """{workspace: get_library_stats()} for every workspace, queried in parallel."""
+    return fan_out(get_library_stats)
+
+def get_labelled_sections(limit=1000):
+    """Newest approved sections with a Bloom level (training data for utils.bloom)."""
+    with get_read_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT s.title, s.content, s.bloom_level
+            FROM sections s
+            JOIN approvals a ON a.section_id = s.id
+            WHERE a.is_approved = 1 AND s.bloom_level IS NOT NULL AND s.bloom_level != ''
+            ORDER BY s.updated_at DESC, s.id DESC
+            LIMIT ?
+        """, (limit,))
+        return [dict(row) for row in cursor.fetchall()]
+
+class StaleSectionError(Exception):
+    """Raised when a section was changed by someone else since it was read."""
+
+    def __init__(self, section_id, expected_version, current_version, current_content):
+        super().__init__(
+            f"Section {section_id} is at version {current_version}, expected {expected_version}"
+        )
+        self.section_id = section_id
+        self.expected_version = expected_version
+        self.current_version = current_version
+        self.current_content = current_content
+
+class SectionMergeConflict(StaleSectionError):
+    """Raised when concurrent edits to a section cannot be merged automatically."""
+
+    def __init__(self, section_id, expected_version, current_version, current_content, merged_content):
+        super().__init__(section_id, expected_version, current_version, current_content)
+        self.merged_content = merged_content
+
+def update_section_content(section_id, new_content, expected_version=None):
+    """Update section content and create a version record.
+
+    When expected_version is given the update only succeeds if the section is
+    still at that version; otherwise StaleSectionError is raised. Returns the
+    new version number, or None if the section does not exist.
+    """
     with get_db_connection() as conn:
         cursor = conn.cursor()
         
         # Get original content
-        cursor.execute("SELECT content FROM sections WHERE id = ?", (section_id,))
+        cursor.execute("SELECT content, version, type FROM sections WHERE id = ?", (section_id,))
         result = cursor.fetchone()
-        if result:
-            original_content = result[0]
-            
-            # Create version record
-            cursor.execute("""
-                INSERT INTO versions (section_id, original_content, edited_content)
-                VALUES (?, ?, ?)
-            """, (section_id, original_content, new_content))
-            
-            # Update section
-            cursor.execute("""
-                UPDATE sections
-                SET content = ?, updated_at = CURRENT_TIMESTAMP
-                WHERE id = ?
-            """, (new_content, section_id))
+        if not result:
+            return None
+        original_content, current_version = result[0], result[1]
+        if expected_version is not None and expected_version != current_version:
+            raise StaleSectionError(section_id, expected_version, current_version, original_content)
+        
+        # Conditional update guards against a writer slipping in after the read
+        from utils.quality import score_sections
+        scores = score_sections([new_content], [result[2]])[0]
+        cursor.execute("""
+            UPDATE sections
+            SET content = ?, version = version + 1, updated_at = CURRENT_TIMESTAMP,
+                quality_score = ?, readability_score = ?, length_score = ?, coverage_score = ?
+            WHERE id = ? AND version = ?
+        """, (new_content, *scores, section_id, current_version))
+        if cursor.rowcount == 0:
+            cursor.execute("SELECT content, version FROM sections WHERE id = ?", (section_id,))
+            latest = cursor.fetchone()
+            raise StaleSectionError(section_id, current_version, latest[1], latest[0])
+        
+        # Create version record
+        cursor.execute("""
+            INSERT INTO versions (section_id, original_content, edited_content, version)
+            VALUES (?, ?, ?, ?)
+        """, (section_id, original_content, new_content, current_version + 1))
+        return current_version + 1
 
-def approve_section(section_id):
-    """Mark a section as approved."""
+def get_section_content_at_version(section_id, version):
+    """Return the content a section had at a given version, or None if unknown."""
     with get_db_connection() as conn:
         cursor = conn.cursor()
+        cursor.execute("SELECT content, version FROM sections WHERE id = ?", (section_id,))
+        current = cursor.fetchone()
+        if not current:
+            return None
+        if current['version'] == version:
+            return current['content']
+        
+        # The edit that produced this version, or the one that replaced it
+        cursor.execute("""
+            SELECT edited_content FROM versions WHERE section_id = ? AND version = ?
+        """, (section_id, version))
+        row = cursor.fetchone()
+        if row:
+            return row[0]
         cursor.execute("""
+            SELECT original_content FROM versions WHERE section_id = ? AND version = ?
+        """, (section_id, version + 1))
+        row = cursor.fetchone()
+        return row[0] if row else None
+
+def save_section_edit(section_id, new_content, base_version, max_attempts=3):
+    """Save an edit made against base_version, merging concurrent changes.
+
+    On a stale read the edit is three-way merged with the latest content using
+    the base version from the versions history. Returns (new_version, content).
+    Raises SectionMergeConflict if the edits overlap.
+    """
+    return merge_section_edit(
+        update_section_content, get_section_content_at_version,
+        section_id, new_content, base_version, max_attempts
+    )
+
+def merge_section_edit(update, content_at_version, section_id, new_content, base_version, max_attempts=3):
+    """save_section_edit's retry/merge loop over any update/history functions (see utils.repository)."""
+    expected_version = base_version
+    content = new_content
+    for attempt in range(max_attempts):
+        try:
+            return update(section_id, content, expected_version), content
+        except StaleSectionError as e:
+            if attempt == max_attempts - 1:
+                raise
+            base = content_at_version(section_id, base_version)
+            if base is None:
+                raise
+            merged, has_conflicts = three_way_merge(base, new_content, e.current_content)
+            if has_conflicts:
+                raise SectionMergeConflict(
+                    section_id, base_version, e.current_version, e.current_content, merged
+                )
+            content = merged
+            expected_version = e.current_version
+
+def apply_edits(edits, expected_versions=None):
+    """Save several section edits, with their version records, in one transaction.
+
+    `edits` maps section id to new content. If expected_versions
+    ({section id: version}) is given and any of those sections has moved
+    on, nothing is saved and StaleSectionError is raised; LookupError if
+    a section is deleted while saving. Returns {section id: new version};
+    ids that are unknown from the start are skipped.
+    """
+    if not edits:
+        return {}
+    expected_versions = expected_versions or {}
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        placeholders = ", ".join("?" * len(edits))
+        cursor.execute(
+            f"SELECT id, content, version, type FROM sections WHERE id IN ({placeholders})",
+            list(edits)
+        )
+        current = {row['id']: row for row in cursor.fetchall()}
+        for section_id, row in current.items():
+            expected = expected_versions.get(section_id)
+            if expected is not None and expected != row['version']:
+                raise StaleSectionError(section_id, expected, row['version'], row['content'])
+        ids = [section_id for section_id in edits if section_id in current]
+        
+        from utils.quality import score_sections
+        scores = score_sections([edits[i] for i in ids], [current[i]['type'] for i in ids])
+        # Conditional updates guard against a writer slipping in after the read
+        cursor.executemany("""
+            UPDATE sections
+            SET content = ?, version = version + 1, updated_at = CURRENT_TIMESTAMP,
+                quality_score = ?, readability_score = ?, length_score = ?, coverage_score = ?
+            WHERE id = ? AND version = ?
+        """, [(edits[i], *score, i, current[i]['version']) for i, score in zip(ids, scores)])
+        if cursor.rowcount != len(ids):
+            cursor.execute(
+                f"SELECT id, content, version FROM sections WHERE id IN ({placeholders})", list(edits)
+            )
+            latest = {row['id']: row for row in cursor.fetchall()}
+            for section_id in ids:
+                row = latest.get(section_id)
+                if row is not None and row['version'] != current[section_id]['version'] + 1:
+                    raise StaleSectionError(section_id, current[section_id]['version'],
+                                            row['version'], row['content'])
+            # Rolled back by get_db_connection, like a stale edit
+            missing = [section_id for section_id in ids if section_id not in latest]
+            raise LookupError(f"Section(s) {missing} were deleted while saving; nothing was saved")
+        
+        cursor.executemany("""
+            INSERT INTO versions (section_id, original_content, edited_content, version)
+            VALUES (?, ?, ?, ?)
+        """, [(i, current[i]['content'], edits[i], current[i]['version'] + 1) for i in ids])
+        return {i: current[i]['version'] + 1 for i in ids}
+
+def approve_sections(section_ids):
+    """Mark several sections as approved in one transaction; returns the number updated."""
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.executemany("""
             UPDATE approvals
             SET is_approved = 1, is_rejected = 0, approved_at = CURRENT_TIMESTAMP
             WHERE section_id = ?
-        """, (section_id,))
+        """, [(section_id,) for section_id in section_ids])
+        return max(cursor.rowcount, 0)
 
-def reject_section(section_id, comments=""):
-    """Mark a section as rejected with optional comments."""
+def reject_sections(section_ids, comments=""):
+    """Mark several sections as rejected with the same comments; returns the number updated."""
     with get_db_connection() as conn:
         cursor = conn.cursor()
-        cursor.execute("""
+        cursor.executemany("""
             UPDATE approvals
             SET is_rejected = 1, is_approved = 0, rejection_comments = ?, rejected_at = CURRENT_TIMESTAMP
             WHERE section_id = ?
-        """, (comments, section_id))
+        """, [(comments, section_id) for section_id in section_ids])
+        return max(cursor.rowcount, 0)
+
+def approve_section(section_id):
+    """Mark a section as approved."""
+    approve_sections([section_id])
+
+def reject_section(section_id, comments=""):
+    """Mark a section as rejected with optional comments."""
+    reject_sections([section_id], comments)
 
 def publish_module(module_id):
-    """Mark a module as published."""
-    with get_db_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute("""
-            UPDATE modules
-            SET status = 'published', updated_at = CURRENT_TIMESTAMP
-            WHERE id = ?
-        """, (module_id,))
+    """Compile a module's content pack (see utils.content_pack), then mark it published.
+
+    The pack is built first, so a failed build leaves the status unchanged; a
+    failed status update removes the new pack unless the module was already
+    published.
+    """
+    module = get_module_by_id(module_id)
+    if not module:
+        return
+    from utils.content_pack import build_pack
+    path = build_pack(module)
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                UPDATE modules
+                SET status = 'published', updated_at = CURRENT_TIMESTAMP
+                WHERE id = ?
+            """, (module_id,))
+            if cursor.rowcount == 0:
+                raise LookupError(f"Module {module_id} was deleted while publishing")
+    except Exception:
+        if module['status'] != 'published':
+            os.remove(path)
+        raise
 
 def get_module_stats(module_id):
     """Get approval statistics for a module."""
-    with get_db_connection() as conn:
+    with get_read_connection() as conn:
         cursor = conn.cursor()
         
         cursor.execute("""
@@ -270,7 +914,7 @@ def export_module_to_json(module_id):
 
 def get_section_versions(section_id):
     """Get all versions of a section."""
-    with get_db_connection() as conn:
+    with get_read_connection() as conn:
         cursor = conn.cursor()
         cursor.execute("""
             SELECT id, original_content, edited_content, created_at
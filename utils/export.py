@@ -0,0 +1,252 @@
+import argparse
+import html
+import json
+import os
+import sys
+import time
+import zipfile
+
+# Allow running as `python utils/export.py` as well as `python -m utils.export`
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from utils.database import get_read_connection
+
+EXPORT_FORMATS = ("jsonl", "parquet", "zip")
+
+# Flat per-section layout used for Parquet exports
+PARQUET_COLUMNS = [
+    "module_id", "module_title", "module_status", "section_id", "title",
+    "content", "type", "bloom_level", "is_approved", "rejection_comments",
+]
+
+
+def iter_module_exports(module_ids=None, status=None, batch_size=500):
+    """Stream modules one at a time in the export_module_to_json layout.
+
+    A single ordered query is stepped through with fetchmany, so only one
+    module's sections are held in memory regardless of library size. It runs
+    on the read connection, so a long export does not tie up the writer's.
+    """
+    conditions = []
+    params = []
+    if module_ids:
+        conditions.append(f"m.id IN ({','.join('?' * len(module_ids))})")
+        params.extend(module_ids)
+    if status:
+        conditions.append("m.status = ?")
+        params.append(status)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+    with get_read_connection() as conn:
+        cursor = conn.cursor()
+        cursor.arraysize = batch_size
+        cursor.execute(f"""
+            SELECT m.id AS module_id, m.module_title, m.status, m.created_at, m.updated_at,
+                   s.id AS section_db_id, s.section_id, s.title, s.content, s.type,
+                   s.bloom_level, a.is_approved, a.rejection_comments
+            FROM modules m
+            LEFT JOIN sections s ON s.module_id = m.id
+            LEFT JOIN approvals a ON a.section_id = s.id
+            {where}
+            ORDER BY m.id, s.id
+        """, params)
+
+        module = None
+        while True:
+            rows = cursor.fetchmany()
+            if not rows:
+                break
+            for row in rows:
+                if module is None or module['id'] != row['module_id']:
+                    if module is not None:
+                        yield module
+                    module = {
+                        'id': row['module_id'],
+                        'module_title': row['module_title'],
+                        'status': row['status'],
+                        'created_at': row['created_at'],
+                        'updated_at': row['updated_at'],
+                        'sections': []
+                    }
+                if row['section_db_id'] is not None:
+                    module['sections'].append({
+                        'id': row['section_id'],
+                        'title': row['title'],
+                        'content': row['content'],
+                        'type': row['type'],
+                        'bloom_level': row['bloom_level'],
+                        'is_approved': row['is_approved'],
+                        'rejection_comments': row['rejection_comments']
+                    })
+        if module is not None:
+            yield module
+
+
+def export_jsonl(output_path, module_ids=None, status=None):
+    """Write one JSON module per line. Returns export statistics."""
+    stats = _new_stats()
+    with open(output_path, 'w', encoding='utf-8') as f:
+        for module in iter_module_exports(module_ids, status):
+            f.write(json.dumps(module, ensure_ascii=False))
+            f.write("\n")
+            _count(stats, module)
+    return _finish_stats(stats, output_path)
+
+
+def export_parquet(output_path, module_ids=None, status=None, batch_rows=5000):
+    """Write one row per section to a Parquet file in fixed-size record batches."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([
+        ("module_id", pa.int64()),
+        ("module_title", pa.string()),
+        ("module_status", pa.string()),
+        ("section_id", pa.string()),
+        ("title", pa.string()),
+        ("content", pa.string()),
+        ("type", pa.string()),
+        ("bloom_level", pa.string()),
+        ("is_approved", pa.bool_()),
+        ("rejection_comments", pa.string()),
+    ])
+    stats = _new_stats()
+    columns = {name: [] for name in PARQUET_COLUMNS}
+
+    def flush(writer):
+        if columns['module_id']:
+            writer.write_batch(pa.record_batch([columns[name] for name in PARQUET_COLUMNS], schema=schema))
+            for values in columns.values():
+                values.clear()
+
+    with pq.ParquetWriter(output_path, schema, compression='zstd') as writer:
+        for module in iter_module_exports(module_ids, status):
+            for section in module['sections']:
+                columns['module_id'].append(module['id'])
+                columns['module_title'].append(module['module_title'])
+                columns['module_status'].append(module['status'])
+                columns['section_id'].append(section['id'])
+                columns['title'].append(section['title'])
+                columns['content'].append(section['content'])
+                columns['type'].append(section['type'])
+                columns['bloom_level'].append(section['bloom_level'])
+                columns['is_approved'].append(bool(section['is_approved']))
+                columns['rejection_comments'].append(section['rejection_comments'])
+                if len(columns['module_id']) >= batch_rows:
+                    flush(writer)
+            _count(stats, module)
+        flush(writer)
+    return _finish_stats(stats, output_path)
+
+
+def export_course_zip(output_path, module_ids=None, status=None):
+    """Write a zip with a SCORM-style package folder per module."""
+    stats = _new_stats()
+    with zipfile.ZipFile(output_path, 'w', compression=zipfile.ZIP_DEFLATED) as zf:
+        for module in iter_module_exports(module_ids, status):
+            folder = f"module_{module['id']}"
+            zf.writestr(f"{folder}/imsmanifest.xml", _scorm_manifest(module))
+            zf.writestr(f"{folder}/index.html", _module_html(module))
+            zf.writestr(f"{folder}/module.json", json.dumps(module, ensure_ascii=False, indent=2))
+            _count(stats, module)
+    return _finish_stats(stats, output_path)
+
+
+def export_modules(output_path, export_format, module_ids=None, status=None):
+    """Export modules to output_path in one of EXPORT_FORMATS."""
+    if export_format == "jsonl":
+        return export_jsonl(output_path, module_ids, status)
+    if export_format == "parquet":
+        return export_parquet(output_path, module_ids, status)
+    if export_format == "zip":
+        return export_course_zip(output_path, module_ids, status)
+    raise ValueError(f"Unknown export format: {export_format}")
+
+
+def _scorm_manifest(module):
+    """Build a minimal SCORM 1.2 manifest for one module."""
+    title = html.escape(module['module_title'])
+    identifier = f"module_{module['id']}"
+    return f"""<?xml version="1.0" encoding="UTF-8"?>
+<manifest identifier="{identifier}" version="1.0"
+          xmlns="http://www.imsproject.org/xsd/imscp_rootv1p1p2"
+          xmlns:adlcp="http://www.adlnet.org/xsd/adlcp_rootv1p2">
+  <metadata>
+    <schema>ADL SCORM</schema>
+    <schemaversion>1.2</schemaversion>
+  </metadata>
+  <organizations default="{identifier}_org">
+    <organization identifier="{identifier}_org">
+      <title>{title}</title>
+      <item identifier="{identifier}_item" identifierref="{identifier}_res">
+        <title>{title}</title>
+      </item>
+    </organization>
+  </organizations>
+  <resources>
+    <resource identifier="{identifier}_res" type="webcontent" adlcp:scormtype="sco" href="index.html">
+      <file href="index.html"/>
+      <file href="module.json"/>
+    </resource>
+  </resources>
+</manifest>
+"""
+
+
+def _module_html(module):
+    """Render a module as a standalone HTML lesson page."""
+    parts = [
+        "<!DOCTYPE html>",
+        "<html><head><meta charset=\"utf-8\">",
+        f"<title>{html.escape(module['module_title'])}</title></head><body>",
+        f"<h1>{html.escape(module['module_title'])}</h1>",
+    ]
+    for section in module['sections']:
+        parts.append(f"<section id=\"{html.escape(section['id'])}\" data-type=\"{html.escape(section['type'])}\">")
+        parts.append(f"<h2>{html.escape(section['title'])}</h2>")
+        if section['bloom_level']:
+            parts.append(f"<p><em>Bloom level: {html.escape(section['bloom_level'])}</em></p>")
+        for paragraph in section['content'].split("\n\n"):
+            parts.append(f"<p>{html.escape(paragraph)}</p>")
+        parts.append("</section>")
+    parts.append("</body></html>")
+    return "\n".join(parts)
+
+
+def _new_stats():
+    return {'modules': 0, 'sections': 0, 'started': time.perf_counter()}
+
+
+def _count(stats, module):
+    stats['modules'] += 1
+    stats['sections'] += len(module['sections'])
+
+
+def _finish_stats(stats, output_path):
+    elapsed = time.perf_counter() - stats.pop('started')
+    stats['seconds'] = elapsed
+    stats['bytes'] = os.path.getsize(output_path)
+    stats['sections_per_second'] = stats['sections'] / elapsed if elapsed > 0 else 0.0
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stream modules out of modules.db")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default="jsonl")
+    parser.add_argument("--output", required=True, help="Destination file")
+    parser.add_argument("--status", choices=["draft", "published"], help="Only export modules with this status")
+    parser.add_argument("--module-ids", type=int, nargs="+", help="Only export these module ids")
+    args = parser.parse_args(argv)
+
+    stats = export_modules(args.output, args.format, args.module_ids, args.status)
+    print(
+        f"Exported {stats['modules']} modules / {stats['sections']} sections "
+        f"to {args.output} ({stats['bytes'] / 1024:.1f} KiB) in {stats['seconds']:.2f}s "
+        f"({stats['sections_per_second']:.0f} sections/s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
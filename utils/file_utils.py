@@ -1,19 +1,33 @@
+import hashlib
 import json
 import os
+import stat
+import tempfile
+import threading
 import time
 from datetime import datetime
 from dotenv import load_dotenv
-from groq import Groq
 
 # Load environment variables
 load_dotenv()
 
-# Initialize Groq client only if API key is available
+# The Groq SDK (httpx, pydantic, ...) is slow to import, so the client is
+# created on first use rather than at import time.
 groq_key = os.getenv("GROQ_API_KEY")
-if not groq_key or groq_key.strip() == "":
-    client = None
-else:
-    client = Groq(api_key=groq_key)
+_client = None
+_client_lock = threading.Lock()
+
+def get_client():
+    """Return the shared Groq client, or None if no API key is configured."""
+    global _client
+    if not groq_key or groq_key.strip() == "":
+        return None
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                from groq import Groq
+                _client = Groq(api_key=groq_key)
+    return _client
 
 # Allow model selection via environment variable
 # Default to llama-3.1-8b-instant (safe, stable, working model on Groq)
@@ -39,7 +53,7 @@ def _groq_api_call_with_retry(messages, max_tokens, max_retries=3):
     """Make a Groq API call with retry logic for transient failures."""
     for attempt in range(max_retries):
         try:
-            response = client.chat.completions.create(
+            response = get_client().chat.completions.create(
                 model=MODEL_NAME,
                 messages=messages,
                 temperature=0.3,
@@ -54,15 +68,151 @@ def _groq_api_call_with_retry(messages, max_tokens, max_retries=3):
             else:
                 raise e
 
+# Identical LLM requests still in flight, keyed by a hash of model, messages and
+# limits: later callers wait for the first call instead of sending their own.
+_inflight = {}
+_inflight_lock = threading.Lock()
+# calls: requests sent to the API; merged: callers that shared an in-flight call
+LLM_CALL_STATS = {"calls": 0, "merged": 0, "max_waiters": 0}
+
+
+class _InFlightCall:
+    __slots__ = ("done", "response", "error", "waiters")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.response = None
+        self.error = None
+        self.waiters = 0
+
+
+def _request_key(messages, max_tokens, temperature):
+    payload = json.dumps([MODEL_NAME, messages, max_tokens, temperature], sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _single_flight(key, call):
+    """Run call() once for concurrent callers with the same key and share the outcome.
+
+    Only requests that are still running are merged; nothing is cached once
+    the call returns. Errors are re-raised in every waiting caller.
+    """
+    with _inflight_lock:
+        flight = _inflight.get(key)
+        leader = flight is None
+        if leader:
+            flight = _inflight[key] = _InFlightCall()
+            LLM_CALL_STATS["calls"] += 1
+        else:
+            flight.waiters += 1
+            LLM_CALL_STATS["merged"] += 1
+            LLM_CALL_STATS["max_waiters"] = max(LLM_CALL_STATS["max_waiters"], flight.waiters)
+
+    if not leader:
+        flight.done.wait()
+        if flight.error is not None:
+            raise flight.error
+        return flight.response
+
+    try:
+        flight.response = call()
+    except BaseException as e:
+        flight.error = e
+        raise
+    finally:
+        with _inflight_lock:
+            del _inflight[key]
+        flight.done.set()
+    return flight.response
+
+
+def _chat_completion(messages, max_tokens, temperature=0.3, retries=1):
+    """Chat completion through the shared client, merged with identical in-flight requests."""
+    client = get_client()
+
+    def call():
+        if retries > 1:
+            return _groq_api_call_with_retry(messages, max_tokens, retries)
+        return client.chat.completions.create(
+            model=MODEL_NAME,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens
+        )
+
+    return _single_flight(_request_key(messages, max_tokens, temperature), call)
+
+
+def llm_call_stats():
+    """Counters for LLM requests sent and merged since start (or the last reset)."""
+    with _inflight_lock:
+        return dict(LLM_CALL_STATS, in_flight=len(_inflight))
+
+
+def reset_llm_call_stats():
+    with _inflight_lock:
+        for name in LLM_CALL_STATS:
+            LLM_CALL_STATS[name] = 0
+
 def load_json(file_path):
     """Load data from a JSON file."""
     with open(file_path, 'r') as f:
         return json.load(f)
 
+# Parsed JSON documents keyed by absolute path:
+# path -> ((inode, mtime_ns, size), sha256 of bytes, data)
+_json_cache = {}
+_json_cache_lock = threading.Lock()
+
+def load_json_cached(file_path):
+    """Load a JSON file, re-parsing it only when it changed on disk.
+
+    The file is re-read when its inode, mtime or size changes, and re-parsed
+    only when the content hash differs. The returned object is shared between
+    callers and sessions, so treat it as read-only.
+    """
+    key = os.path.abspath(file_path)
+    file_stat = os.stat(key)
+    signature = (file_stat.st_ino, file_stat.st_mtime_ns, file_stat.st_size)
+    with _json_cache_lock:
+        entry = _json_cache.get(key)
+    if entry and entry[0] == signature:
+        return entry[2]
+
+    with open(key, 'rb') as f:
+        raw = f.read()
+    digest = hashlib.sha256(raw).hexdigest()
+    if entry and entry[1] == digest:
+        data = entry[2]
+    else:
+        data = json.loads(raw)
+    with _json_cache_lock:
+        _json_cache[key] = (signature, digest, data)
+    return data
+
 def save_json(file_path, data):
-    """Save data to a JSON file."""
-    with open(file_path, 'w') as f:
-        json.dump(data, f, indent=4)
+    """Save data to a JSON file atomically.
+
+    The document is written to a temporary file in the same directory and
+    renamed over the target, so readers never see a half-written file.
+    """
+    directory = os.path.dirname(os.path.abspath(file_path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=".json")
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f, indent=4)
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp creates the file as 0600; keep the target's permissions
+        mode = stat.S_IMODE(os.stat(file_path).st_mode) if os.path.exists(file_path) else 0o644
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    with _json_cache_lock:
+        _json_cache.pop(os.path.abspath(file_path), None)
 
 def save_version(section_id, content, versions_dir):
     """Save a version of the edited content with timestamp."""
@@ -77,6 +227,7 @@ def save_version(section_id, content, versions_dir):
     save_json(filepath, data)
 
 def regenerate_content(original_text):
+    client = get_client()
     if client is None:
         return "GROQ_API_KEY is missing or invalid."
 
@@ -89,12 +240,7 @@ Content:
 """
 
     try:
-        response = client.chat.completions.create(
-            model=MODEL_NAME,
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.3,
-            max_tokens=500
-        )
+        response = _chat_completion([{"role": "user", "content": prompt}], max_tokens=500)
         result = response.choices[0].message.content.strip()
         if not result:
             return "Groq returned an empty response. Check your API key or model."
@@ -105,6 +251,7 @@ Content:
         return _format_api_error(e)
 
 def summarize_changes(version_a, version_b):
+    client = get_client()
     if client is None:
         return "GROQ_API_KEY is missing or invalid."
 
@@ -121,12 +268,7 @@ Version B:
 """
 
     try:
-        response = client.chat.completions.create(
-            model=MODEL_NAME,
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.3,
-            max_tokens=300
-        )
+        response = _chat_completion([{"role": "user", "content": prompt}], max_tokens=300)
         result = response.choices[0].message.content.strip()
         if not result:
             return "Groq returned an empty response. Check your API key or model."
@@ -137,7 +279,7 @@ Version B:
         return _format_api_error(e)
 
 def generate_module(curriculum_text, pedagogy_text, user_prompt):
-    if client is None:
+    if get_client() is None:
         return None, "GROQ_API_KEY is missing or invalid."
 
     prompt = f"""
@@ -169,9 +311,10 @@ Output ONLY the JSON, nothing else. No markdown, no code blocks, just pure JSON.
 """
 
     try:
-        response = _groq_api_call_with_retry(
+        response = _chat_completion(
             [{"role": "user", "content": prompt}],
-            max_tokens=2000
+            max_tokens=2000,
+            retries=3
         )
         
         # Check if response has choices
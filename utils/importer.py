@@ -0,0 +1,258 @@
+import argparse
+import glob
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+# Allow running as `python utils/importer.py` as well as `python -m utils.importer`
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from utils.database import get_db_connection, insert_module
+from utils.state_store import create_app_state_table, module_namespace
+
+DEFAULT_MODULE_SOURCES = [
+    os.path.join(ROOT, "sample_ai_output.json"),
+    os.path.join(ROOT, "approved_lessons.json"),
+]
+DEFAULT_VERSIONS_DIR = os.path.join(ROOT, "ai_copilot_hil_edit", "versions")
+REQUIRED_SECTION_FIELDS = ("id", "title", "content", "type")
+# Timestamp format of save_version() snapshots (local time)
+SNAPSHOT_TIMESTAMP_FORMAT = "%Y%m%d_%H%M%S"
+
+
+def content_hash(payload):
+    """Stable SHA-256 of a JSON-serializable payload."""
+    canonical = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def load_source(path):
+    """Parse and validate one source file (runs in a worker process).
+
+    Returns a record dict with kind 'module', 'version' or 'invalid'.
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        return {'kind': 'invalid', 'source': path, 'error': f"unreadable JSON: {e}"}
+
+    if not isinstance(data, dict):
+        return {'kind': 'invalid', 'source': path, 'error': "top-level value is not an object"}
+
+    # Version snapshots written by save_version()
+    if 'section_id' in data and 'content' in data:
+        payload = {'section_id': str(data['section_id']), 'content': data['content']}
+        return {
+            'kind': 'version',
+            'source': path,
+            'hash': content_hash(payload),
+            'data': dict(payload, timestamp=data.get('timestamp')),
+        }
+
+    sections = data.get('sections')
+    if not isinstance(sections, list) or not sections:
+        return {'kind': 'invalid', 'source': path, 'error': "'sections' must be a non-empty list"}
+    for idx, section in enumerate(sections):
+        missing = [field for field in REQUIRED_SECTION_FIELDS if not section.get(field)]
+        if missing:
+            return {'kind': 'invalid', 'source': path, 'error': f"section {idx} missing {', '.join(missing)}"}
+
+    title = data.get('module_title') or os.path.splitext(os.path.basename(path))[0].replace('_', ' ').title()
+    clean_sections = [
+        {
+            'id': str(s['id']),
+            'title': s['title'],
+            'content': s['content'],
+            'type': s['type'],
+            'bloom_level': s.get('bloom_level'),
+        }
+        for s in sections
+    ]
+    approved = os.path.basename(path).startswith("approved")
+    return {
+        'kind': 'module',
+        'source': path,
+        'hash': content_hash({'module_title': title, 'sections': clean_sections}),
+        'data': {'module_title': title, 'sections': clean_sections, 'approved': approved},
+    }
+
+
+def discover_sources(module_sources=None, versions_dir=None):
+    """List the module files and version snapshot files to import."""
+    paths = [p for p in (module_sources or DEFAULT_MODULE_SOURCES) if os.path.exists(p)]
+    versions_dir = versions_dir or DEFAULT_VERSIONS_DIR
+    if os.path.isdir(versions_dir):
+        paths.extend(sorted(glob.glob(os.path.join(versions_dir, "*.json"))))
+    return paths
+
+
+def _ensure_import_log(cursor):
+    create_app_state_table(cursor.connection)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS import_log (
+            content_hash TEXT PRIMARY KEY,
+            kind TEXT NOT NULL,
+            source TEXT NOT NULL,
+            target_id INTEGER,
+            imported_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+
+def _already_imported(cursor, hashes):
+    found = set()
+    hashes = list(hashes)
+    for i in range(0, len(hashes), 500):
+        chunk = hashes[i:i + 500]
+        cursor.execute(
+            f"SELECT content_hash FROM import_log WHERE content_hash IN ({','.join('?' * len(chunk))})",
+            chunk
+        )
+        found.update(row[0] for row in cursor.fetchall())
+    return found
+
+
+def _import_module(cursor, record):
+    data = record['data']
+    return insert_module(cursor, data['module_title'], data['sections'], approved=data['approved'])
+
+
+def _snapshot_time(timestamp):
+    """UTC 'YYYY-MM-DD HH:MM:SS' for a save_version() timestamp, or None if it is not one."""
+    try:
+        local = datetime.strptime(str(timestamp), SNAPSHOT_TIMESTAMP_FORMAT)
+    except ValueError:
+        return None
+    return local.astimezone(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _import_version(cursor, record):
+    """Attach a snapshot to the one section with its external id; returns the section's row id.
+
+    Generated modules reuse external ids (lo1, c1, ...), so a snapshot whose
+    id matches sections in several modules is not attached (returns None).
+    A snapshot is an unsaved edit, not a saved version, so it becomes the
+    module's shared draft suggestion for that section (see module_namespace),
+    dated with the snapshot's own timestamp.
+    """
+    data = record['data']
+    cursor.execute("""
+        SELECT id, module_id FROM sections
+        WHERE section_id = ?
+        LIMIT 2
+    """, (data['section_id'],))
+    matches = cursor.fetchall()
+    if len(matches) != 1:
+        return None
+    section_id, module_id = matches[0]
+    cursor.execute("""
+        INSERT INTO app_state (namespace, key, value, updated_at)
+        VALUES (?, ?, ?, COALESCE(?, CURRENT_TIMESTAMP))
+        ON CONFLICT(namespace, key)
+        DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at
+    """, (module_namespace(module_id, "edits"), data['section_id'], json.dumps(data['content']),
+          _snapshot_time(data['timestamp'])))
+    return section_id
+
+
+def run_import(module_sources=None, versions_dir=None, batch_size=200, workers=None, dry_run=False):
+    """Import JSON lessons and version snapshots into modules.db.
+
+    Files are parsed in a process pool, deduplicated by content hash against
+    the import_log table and loaded in batched transactions, so re-running
+    skips finished work and resumes after an interruption. Returns a report dict.
+    """
+    started = time.perf_counter()
+    paths = discover_sources(module_sources, versions_dir)
+    report = {
+        'files': len(paths), 'imported': 0, 'duplicates': 0,
+        'invalid': [], 'unmatched_versions': 0, 'rows': 0,
+    }
+
+    if workers == 0 or len(paths) < 2:
+        records = [load_source(p) for p in paths]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            records = list(pool.map(load_source, paths, chunksize=max(1, len(paths) // 32)))
+
+    report['invalid'] = [(r['source'], r['error']) for r in records if r['kind'] == 'invalid']
+    valid = [r for r in records if r['kind'] != 'invalid']
+
+    # Deduplicate within this run, keeping the first occurrence
+    unique = {}
+    for record in valid:
+        unique.setdefault(record['hash'], record)
+    report['duplicates'] += len(valid) - len(unique)
+
+    # Modules first so version snapshots can find their sections
+    ordered = sorted(unique.values(), key=lambda r: 0 if r['kind'] == 'module' else 1)
+
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        _ensure_import_log(cursor)
+
+    for i in range(0, len(ordered), batch_size):
+        batch = ordered[i:i + batch_size]
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            done = _already_imported(cursor, [r['hash'] for r in batch])
+            log_rows = []
+            batch_rows = 0
+            for record in batch:
+                if record['hash'] in done:
+                    report['duplicates'] += 1
+                    continue
+                if record['kind'] == 'module':
+                    target_id = _import_module(cursor, record)
+                    rows = 1 + len(record['data']['sections'])
+                else:
+                    target_id = _import_version(cursor, record)
+                    if target_id is None:
+                        report['unmatched_versions'] += 1
+                        continue
+                    rows = 1
+                batch_rows += rows
+                log_rows.append((record['hash'], record['kind'], record['source'], target_id))
+            cursor.executemany("""
+                INSERT INTO import_log (content_hash, kind, source, target_id)
+                VALUES (?, ?, ?, ?)
+            """, log_rows)
+            report['imported'] += len(log_rows)
+            report['rows'] += batch_rows
+            if dry_run:
+                conn.rollback()
+
+    report['seconds'] = time.perf_counter() - started
+    # Module, section and draft rows inserted (not files parsed)
+    report['rows_per_second'] = report['rows'] / report['seconds'] if report['seconds'] > 0 else 0.0
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import JSON lessons and version snapshots into modules.db")
+    parser.add_argument("--sources", nargs="+", help="Module JSON files (default: sample_ai_output.json, approved_lessons.json)")
+    parser.add_argument("--versions-dir", help="Directory of save_version() snapshots")
+    parser.add_argument("--batch-size", type=int, default=200, help="Records per transaction")
+    parser.add_argument("--workers", type=int, help="Parser processes (0 parses in-process)")
+    parser.add_argument("--dry-run", action="store_true", help="Validate and roll back instead of committing")
+    args = parser.parse_args(argv)
+
+    report = run_import(args.sources, args.versions_dir, args.batch_size, args.workers, args.dry_run)
+    print(f"Scanned {report['files']} files in {report['seconds']:.2f}s, "
+          f"inserted {report['rows']} rows ({report['rows_per_second']:.0f} rows/s)")
+    print(f"  imported: {report['imported']}")
+    print(f"  duplicates skipped: {report['duplicates']}")
+    print(f"  versions without exactly one matching section: {report['unmatched_versions']}")
+    for source, error in report['invalid']:
+        print(f"  invalid: {source}: {error}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,611 @@
+import json
+import logging
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+
+from utils.database import _ensure_column, get_db_connection, list_workspaces, register_schema, use_workspace
+from utils import file_utils
+
+logger = logging.getLogger(__name__)
+
+# Worker threads per process (0 runs no workers; jobs wait for another process)
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+# Seconds an idle worker waits before checking the table for jobs from other processes
+JOB_POLL_SECONDS = float(os.getenv("JOB_POLL_SECONDS", "1"))
+# A running job not finished after this long is assumed lost with its process
+JOB_TIMEOUT_SECONDS = float(os.getenv("JOB_TIMEOUT_SECONDS", "600"))
+# Attempts before a lost job is marked failed instead of requeued
+JOB_MAX_ATTEMPTS = 3
+
+ACTIVE_STATUSES = ('queued', 'running')
+
+# Priority classes, most urgent first. A reviewer waiting on Regenerate or
+# AI Explain Changes is served before module generation, which is served
+# before work nobody is waiting for (e.g. quality-driven rewrites).
+PRIORITIES = {'interactive': 0, 'batch': 1, 'background': 2}
+KIND_PRIORITIES = {
+    'generate_module': 'batch',
+    'regenerate_section': 'interactive',
+    'summarize_changes': 'interactive',
+}
+# Batch and background jobs allowed to run at once across all workers of a
+# database; the other workers are kept free for interactive jobs
+JOB_BACKGROUND_SLOTS = int(os.getenv("JOB_BACKGROUND_SLOTS", str(max(1, JOB_WORKERS - 1))))
+# Fair share between owners counts the jobs each started this recently
+JOB_FAIR_SHARE_SECONDS = int(os.getenv("JOB_FAIR_SHARE_SECONDS", "300"))
+# Queued jobs of a class beyond which new ones are refused (0: no limit)
+JOB_QUEUE_LIMITS = {
+    'interactive': 0,
+    'batch': int(os.getenv("JOB_MAX_QUEUED_BATCH", "100")),
+    'background': int(os.getenv("JOB_MAX_QUEUED_BACKGROUND", "50")),
+}
+# Window for the wait-time percentiles in JobQueue.stats()
+JOB_STATS_WINDOW_SECONDS = 3600
+
+
+class JobStore(ABC):
+    """Interface for the persisted job table.
+
+    A job moves queued -> running -> done | failed. Payloads and results
+    must be JSON-serializable.
+    """
+
+    @abstractmethod
+    def submit(self, kind, payload, module_id=None, priority=PRIORITIES['interactive'], owner=None):
+        """Queue a job and return its id."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_jobs(self, job_ids):
+        """Return {id: job dict} for the given ids."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def list_jobs(self, kind=None, module_id=None, statuses=None, limit=50):
+        """Newest jobs first, optionally filtered."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def claim(self, worker, background_slots=JOB_BACKGROUND_SLOTS):
+        """Atomically mark the next queued job as running and return it (or None).
+
+        Jobs are taken by priority class, then round-robin between owners
+        (counting the jobs each owner has running or started in the last
+        JOB_FAIR_SHARE_SECONDS), then oldest first. Batch and background jobs are only taken while fewer than
+        background_slots of them are running.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def finish(self, job_id, result=None, error=None):
+        """Record a job's result, or its error, and mark it done or failed."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def requeue_stale(self, timeout=JOB_TIMEOUT_SECONDS, max_attempts=JOB_MAX_ATTEMPTS):
+        """Requeue (or fail) running jobs older than timeout. Returns the number touched."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def queue_counts(self):
+        """[(priority, status, jobs, age of the oldest in seconds)] for queued and running jobs."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def recent_waits(self, window=JOB_STATS_WINDOW_SECONDS):
+        """[(priority, seconds from submit to start)] for jobs started within the window."""
+        raise NotImplementedError
+
+    def get_job(self, job_id):
+        return self.get_jobs([job_id]).get(job_id)
+
+
+def _job(row):
+    job = dict(row)
+    job['payload'] = json.loads(job['payload'])
+    job['result'] = json.loads(job['result']) if job['result'] is not None else None
+    return job
+
+
+# Submit and start times with milliseconds, for the wait-time metrics
+_NOW_MS = "strftime('%Y-%m-%d %H:%M:%f', 'now')"
+
+
+def create_jobs_table(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            kind TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'queued',
+            module_id INTEGER,
+            payload TEXT NOT NULL,
+            result TEXT,
+            error TEXT,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            worker TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            started_at TIMESTAMP,
+            finished_at TIMESTAMP,
+            priority INTEGER NOT NULL DEFAULT 0,
+            owner TEXT
+        )
+    """)
+    cursor = conn.cursor()
+    _ensure_column(cursor, "jobs", "priority", "INTEGER NOT NULL DEFAULT 0")
+    _ensure_column(cursor, "jobs", "owner", "TEXT")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status, id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_queue ON jobs(status, priority, id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_owner ON jobs(owner, started_at)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_module ON jobs(module_id, id)")
+
+
+class SQLiteJobStore(JobStore):
+    """Job table in modules.db, shared by every process using the same file."""
+
+    # Each workspace shard has its own jobs table (see JobQueue.run_next)
+    sharded = True
+
+    def __init__(self):
+        register_schema(create_jobs_table)
+
+    def submit(self, kind, payload, module_id=None, priority=PRIORITIES['interactive'], owner=None):
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "INSERT INTO jobs (kind, module_id, payload, priority, owner, created_at)"
+                f" VALUES (?, ?, ?, ?, ?, {_NOW_MS})",
+                (kind, module_id, json.dumps(payload), priority, owner)
+            )
+            return cursor.lastrowid
+
+    def get_jobs(self, job_ids):
+        if not job_ids:
+            return {}
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            placeholders = ",".join("?" * len(job_ids))
+            cursor.execute(f"SELECT * FROM jobs WHERE id IN ({placeholders})", list(job_ids))
+            return {row['id']: _job(row) for row in cursor.fetchall()}
+
+    def list_jobs(self, kind=None, module_id=None, statuses=None, limit=50):
+        clauses, params = [], []
+        if kind is not None:
+            clauses.append("kind = ?")
+            params.append(kind)
+        if module_id is not None:
+            clauses.append("module_id = ?")
+            params.append(module_id)
+        if statuses:
+            clauses.append(f"status IN ({','.join('?' * len(statuses))})")
+            params.extend(statuses)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"SELECT * FROM jobs {where} ORDER BY id DESC LIMIT ?", params + [limit])
+            return [_job(row) for row in cursor.fetchall()]
+
+    def claim(self, worker, background_slots=JOB_BACKGROUND_SLOTS):
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            # A single UPDATE ... RETURNING, so two workers never claim the same job
+            cursor.execute(f"""
+                UPDATE jobs
+                SET status = 'running', worker = ?, attempts = attempts + 1,
+                    started_at = {_NOW_MS}
+                WHERE id = (
+                    SELECT q.id FROM (
+                        SELECT id, priority, owner,
+                               ROW_NUMBER() OVER (PARTITION BY priority, owner ORDER BY id) AS turn
+                        FROM jobs WHERE status = 'queued'
+                    ) q
+                    WHERE q.priority = 0
+                       OR (SELECT COUNT(*) FROM jobs r WHERE r.status = 'running' AND r.priority > 0) < ?
+                    ORDER BY q.priority,
+                             q.turn + (SELECT COUNT(*) FROM jobs r
+                                       WHERE r.owner IS q.owner
+                                         AND (r.status = 'running' OR r.started_at >= datetime('now', ?))),
+                             q.id
+                    LIMIT 1
+                )
+                RETURNING *
+            """, (worker, background_slots, f"-{JOB_FAIR_SHARE_SECONDS} seconds"))
+            row = cursor.fetchone()
+            return _job(row) if row else None
+
+    def finish(self, job_id, result=None, error=None):
+        with get_db_connection() as conn:
+            conn.execute("""
+                UPDATE jobs
+                SET status = ?, result = ?, error = ?, finished_at = CURRENT_TIMESTAMP
+                WHERE id = ?
+            """, ('failed' if error else 'done', json.dumps(result), error, job_id))
+
+    def requeue_stale(self, timeout=JOB_TIMEOUT_SECONDS, max_attempts=JOB_MAX_ATTEMPTS):
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                UPDATE jobs
+                SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'queued' END,
+                    error = CASE WHEN attempts >= ? THEN 'Worker lost' END,
+                    finished_at = CASE WHEN attempts >= ? THEN CURRENT_TIMESTAMP END
+                WHERE status = 'running' AND started_at < datetime('now', ?)
+            """, (max_attempts, max_attempts, max_attempts, f"-{int(timeout)} seconds"))
+            return cursor.rowcount
+
+    def queue_counts(self):
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT priority, status, COUNT(*),
+                       (julianday('now') - julianday(MIN(CASE WHEN status = 'running' THEN started_at ELSE created_at END))) * 86400
+                FROM jobs WHERE status IN ('queued', 'running')
+                GROUP BY priority, status
+            """)
+            return [tuple(row) for row in cursor.fetchall()]
+
+    def recent_waits(self, window=JOB_STATS_WINDOW_SECONDS):
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT priority, (julianday(started_at) - julianday(created_at)) * 86400
+                FROM jobs WHERE started_at >= datetime('now', ?)
+            """, (f"-{int(window)} seconds",))
+            return [tuple(row) for row in cursor.fetchall()]
+
+
+class PostgresJobStore(JobStore):
+    """Job table in a PostgresRepository's database."""
+
+    def __init__(self, repository):
+        self.repository = repository
+        with repository.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id BIGINT GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'queued',
+                    module_id BIGINT,
+                    payload TEXT NOT NULL,
+                    result TEXT,
+                    error TEXT,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    worker TEXT,
+                    created_at TIMESTAMP DEFAULT (now() AT TIME ZONE 'utc'),
+                    started_at TIMESTAMP,
+                    finished_at TIMESTAMP,
+                    priority INTEGER NOT NULL DEFAULT 0,
+                    owner TEXT
+                )
+            """)
+            cursor.execute("ALTER TABLE jobs ADD COLUMN IF NOT EXISTS priority INTEGER NOT NULL DEFAULT 0")
+            cursor.execute("ALTER TABLE jobs ADD COLUMN IF NOT EXISTS owner TEXT")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_jobs_queue ON jobs(status, priority, id)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_jobs_owner ON jobs(owner, started_at)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_jobs_module ON jobs(module_id, id)")
+
+    def _rows(self, sql, params):
+        from utils.repository import _plain
+        with self.repository._cursor() as cursor:
+            cursor.execute(sql, params)
+            return [_job(_plain(row)) for row in cursor.fetchall()]
+
+    def submit(self, kind, payload, module_id=None, priority=PRIORITIES['interactive'], owner=None):
+        with self.repository.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "INSERT INTO jobs (kind, module_id, payload, priority, owner)"
+                " VALUES (%s, %s, %s, %s, %s) RETURNING id",
+                (kind, module_id, json.dumps(payload), priority, owner)
+            )
+            return cursor.fetchone()[0]
+
+    def get_jobs(self, job_ids):
+        if not job_ids:
+            return {}
+        rows = self._rows("SELECT * FROM jobs WHERE id = ANY(%s)", (list(job_ids),))
+        return {job['id']: job for job in rows}
+
+    def list_jobs(self, kind=None, module_id=None, statuses=None, limit=50):
+        clauses, params = [], []
+        if kind is not None:
+            clauses.append("kind = %s")
+            params.append(kind)
+        if module_id is not None:
+            clauses.append("module_id = %s")
+            params.append(module_id)
+        if statuses:
+            clauses.append("status = ANY(%s)")
+            params.append(list(statuses))
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        return self._rows(f"SELECT * FROM jobs {where} ORDER BY id DESC LIMIT %s", params + [limit])
+
+    def claim(self, worker, background_slots=JOB_BACKGROUND_SLOTS):
+        from utils.repository import _plain
+        with self.repository._cursor() as cursor:
+            # Claims are serialized (they are short), so the running counts
+            # below cannot change between choosing a job and taking it
+            cursor.execute("SELECT pg_advisory_xact_lock(hashtext('jobs_claim'))")
+            cursor.execute("""
+                UPDATE jobs
+                SET status = 'running', worker = %s, attempts = attempts + 1,
+                    started_at = now() AT TIME ZONE 'utc'
+                WHERE id = (
+                    SELECT q.id FROM (
+                        SELECT id, priority, owner,
+                               ROW_NUMBER() OVER (PARTITION BY priority, owner ORDER BY id) AS turn
+                        FROM jobs WHERE status = 'queued'
+                    ) q
+                    WHERE q.priority = 0
+                       OR (SELECT COUNT(*) FROM jobs r WHERE r.status = 'running' AND r.priority > 0) < %s
+                    ORDER BY q.priority,
+                             q.turn + (SELECT COUNT(*) FROM jobs r
+                                       WHERE r.owner IS NOT DISTINCT FROM q.owner
+                                         AND (r.status = 'running' OR r.started_at >=
+                                              now() AT TIME ZONE 'utc' - make_interval(secs => %s))),
+                             q.id
+                    LIMIT 1
+                )
+                RETURNING *
+            """, (worker, background_slots, JOB_FAIR_SHARE_SECONDS))
+            row = cursor.fetchone()
+        return _job(_plain(row)) if row else None
+
+    def finish(self, job_id, result=None, error=None):
+        with self.repository.connection() as conn:
+            conn.cursor().execute("""
+                UPDATE jobs
+                SET status = %s, result = %s, error = %s, finished_at = now() AT TIME ZONE 'utc'
+                WHERE id = %s
+            """, ('failed' if error else 'done', json.dumps(result), error, job_id))
+
+    def requeue_stale(self, timeout=JOB_TIMEOUT_SECONDS, max_attempts=JOB_MAX_ATTEMPTS):
+        with self.repository.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                UPDATE jobs
+                SET status = CASE WHEN attempts >= %s THEN 'failed' ELSE 'queued' END,
+                    error = CASE WHEN attempts >= %s THEN 'Worker lost' END,
+                    finished_at = CASE WHEN attempts >= %s THEN now() AT TIME ZONE 'utc' END
+                WHERE status = 'running'
+                  AND started_at < now() AT TIME ZONE 'utc' - make_interval(secs => %s)
+            """, (max_attempts, max_attempts, max_attempts, timeout))
+            return cursor.rowcount
+
+    def queue_counts(self):
+        with self.repository.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT priority, status, COUNT(*),
+                       EXTRACT(EPOCH FROM now() AT TIME ZONE 'utc' - MIN(CASE WHEN status = 'running' THEN started_at ELSE created_at END))
+                FROM jobs WHERE status IN ('queued', 'running')
+                GROUP BY priority, status
+            """)
+            return [(priority, status, count, float(age)) for priority, status, count, age in cursor.fetchall()]
+
+    def recent_waits(self, window=JOB_STATS_WINDOW_SECONDS):
+        with self.repository.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT priority, EXTRACT(EPOCH FROM started_at - created_at)
+                FROM jobs WHERE started_at >= now() AT TIME ZONE 'utc' - make_interval(secs => %s)
+            """, (window,))
+            return [(priority, float(wait)) for priority, wait in cursor.fetchall()]
+
+
+def create_job_store(repository=None):
+    """Job store living in the same database as the repository."""
+    if repository is not None and hasattr(repository, "connection"):
+        return PostgresJobStore(repository)
+    return SQLiteJobStore()
+
+
+class JobError(Exception):
+    """A job handler failed in an expected way; the message is shown to the user."""
+
+
+class QueueFullError(Exception):
+    """A job was refused because too many jobs of its priority class are queued."""
+
+
+# Handlers: handler(payload, repository, state_store) -> JSON-serializable result
+
+def run_generate_module(payload, repository, state_store):
+    """Generate a module from a prompt; the module JSON is the job result."""
+    generated, error = file_utils.generate_module(
+        payload.get('curriculum', ""), payload.get('pedagogy', ""), payload['prompt']
+    )
+    if error:
+        raise JobError(error)
+    return generated
+
+
+def run_regenerate_section(payload, repository, state_store):
+    """Rewrite a section and store it as the reviewer's pending edit."""
+    content = file_utils.regenerate_content(payload['text'])
+    state_store.set(payload['namespace'], payload['key'], content)
+    return {'content': content}
+
+
+def run_summarize_changes(payload, repository, state_store):
+    """Summarize an edit and store the summary alongside the reviewer's edits."""
+    summary = file_utils.summarize_changes(payload['before'], payload['after'])
+    state_store.set(payload['namespace'], payload['key'], summary)
+    return {'summary': summary}
+
+
+HANDLERS = {
+    'generate_module': run_generate_module,
+    'regenerate_section': run_regenerate_section,
+    'summarize_changes': run_summarize_changes,
+}
+
+
+class JobQueue:
+    """Submit/poll API over a JobStore plus a pool of worker threads.
+
+    Workers in this process are woken as soon as a job is submitted here and
+    poll the table every JOB_POLL_SECONDS for jobs submitted elsewhere. With
+    a sharded store, jobs are submitted to the current workspace's shard and
+    workers serve every workspace, running each job inside its workspace.
+
+    Jobs are scheduled by priority class (see PRIORITIES and JobStore.claim):
+    at most background_slots batch/background jobs run at once, and
+    submissions beyond queue_limits are refused with QueueFullError.
+    """
+
+    def __init__(self, store, repository=None, state_store=None, handlers=None,
+                 workers=JOB_WORKERS, poll_interval=JOB_POLL_SECONDS,
+                 background_slots=JOB_BACKGROUND_SLOTS, queue_limits=None):
+        self.store = store
+        self.repository = repository
+        self.state_store = state_store
+        self.handlers = dict(HANDLERS if handlers is None else handlers)
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.background_slots = background_slots
+        self.queue_limits = dict(JOB_QUEUE_LIMITS if queue_limits is None else queue_limits)
+        self.refused = {name: 0 for name in PRIORITIES}
+        self._signal = threading.Semaphore(0)
+        self._stop = threading.Event()
+        self._threads = []
+        self._last_requeue = 0.0
+        self._next_shard = 0
+
+    def submit(self, kind, payload, module_id=None, priority=None, owner=None):
+        """Queue a job; priority is a PRIORITIES name (default from KIND_PRIORITIES)
+        and owner identifies the reviewer, for fair scheduling between reviewers."""
+        if kind not in self.handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+        priority = priority or KIND_PRIORITIES.get(kind, 'interactive')
+        limit = self.queue_limits.get(priority, 0)
+        if limit:
+            queued = sum(count for p, status, count, _ in self.store.queue_counts()
+                         if p == PRIORITIES[priority] and status == 'queued')
+            if queued >= limit:
+                self.refused[priority] += 1
+                raise QueueFullError(f"{queued} {priority} jobs are already queued; try again later")
+        job_id = self.store.submit(kind, payload, module_id, PRIORITIES[priority], owner)
+        self._signal.release()
+        return job_id
+
+    def get(self, job_id):
+        return self.store.get_job(job_id)
+
+    def get_many(self, job_ids):
+        return self.store.get_jobs(job_ids)
+
+    def list_jobs(self, **filters):
+        return self.store.list_jobs(**filters)
+
+    def stats(self, window=JOB_STATS_WINDOW_SECONDS):
+        """Queue depth and wait times per priority class, for dashboards and alerts.
+
+        {class: {queued, running, oldest_queued_s, started, wait_p50_s,
+        wait_p95_s, refused}}; waits (submit to start) cover jobs started in
+        the last `window` seconds, refused counts this process's submissions.
+        """
+        names = {value: name for name, value in PRIORITIES.items()}
+        stats = {
+            name: {'queued': 0, 'running': 0, 'oldest_queued_s': 0.0, 'started': 0,
+                   'wait_p50_s': None, 'wait_p95_s': None, 'refused': self.refused[name]}
+            for name in PRIORITIES
+        }
+        for priority, status, count, age in self.store.queue_counts():
+            entry = stats[names.get(priority, 'interactive')]
+            entry[status] += count
+            if status == 'queued':
+                entry['oldest_queued_s'] = max(entry['oldest_queued_s'], round(age, 1))
+        waits = {}
+        for priority, wait in self.store.recent_waits(window):
+            waits.setdefault(names.get(priority, 'interactive'), []).append(wait)
+        for name, values in waits.items():
+            values.sort()
+            stats[name].update(
+                started=len(values),
+                wait_p50_s=round(values[len(values) // 2], 2),
+                wait_p95_s=round(values[min(len(values) - 1, int(len(values) * 0.95))], 2),
+            )
+        return stats
+
+    def wait(self, job_id, timeout=None, interval=0.05):
+        """Block until a job is done or failed (for scripts and tests); returns it."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            job = self.get(job_id)
+            if job is None or job['status'] not in ACTIVE_STATUSES:
+                return job
+            if deadline is not None and time.monotonic() > deadline:
+                raise TimeoutError(f"Job {job_id} still {job['status']}")
+            time.sleep(interval)
+
+    def _workspaces(self):
+        return list_workspaces() if getattr(self.store, "sharded", False) else [None]
+
+    def _requeue_stale(self):
+        for workspace in self._workspaces():
+            with use_workspace(workspace):
+                self.store.requeue_stale()
+
+    def start(self):
+        self._requeue_stale()
+        for n in range(self.workers):
+            thread = threading.Thread(
+                target=self._work, name=f"job-worker-{n + 1}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        for _ in self._threads:
+            self._signal.release()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def run_next(self, worker="inline"):
+        """Claim and run one job on the calling thread; returns False if none was queued.
+
+        Shards are tried round-robin so a busy workspace cannot starve the others.
+        """
+        workspaces = self._workspaces()
+        start = self._next_shard
+        self._next_shard += 1
+        for n in range(len(workspaces)):
+            with use_workspace(workspaces[(start + n) % len(workspaces)]):
+                job = self.store.claim(worker, self.background_slots)
+                if job is not None:
+                    self._run(job)
+                    return True
+        return False
+
+    def _run(self, job):
+        handler = self.handlers.get(job['kind'])
+        try:
+            if handler is None:
+                raise JobError(f"No handler for job kind {job['kind']}")
+            result = handler(job['payload'], self.repository, self.state_store)
+        except JobError as e:
+            self.store.finish(job['id'], error=str(e))
+        except Exception as e:
+            logger.exception("Job %s (%s) failed", job['id'], job['kind'])
+            self.store.finish(job['id'], error=f"{type(e).__name__}: {e}")
+        else:
+            self.store.finish(job['id'], result=result)
+
+    def _work(self):
+        worker = f"{os.getpid()}:{threading.current_thread().name}"
+        while not self._stop.is_set():
+            try:
+                if self.run_next(worker):
+                    continue
+                if time.monotonic() - self._last_requeue > JOB_TIMEOUT_SECONDS / 2:
+                    self._last_requeue = time.monotonic()
+                    self._requeue_stale()
+            except Exception:
+                logger.exception("Job worker error")
+            self._signal.acquire(timeout=self.poll_interval)
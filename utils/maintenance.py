@@ -0,0 +1,405 @@
+import argparse
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+# Allow running as `python utils/maintenance.py` as well as `python -m utils.maintenance`
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from utils import database
+from utils.database import get_attached_connection, init_db
+from utils.quality import QUALITY_COLUMNS, score_sections
+
+logger = logging.getLogger(__name__)
+
+# Retention policy defaults (days)
+VERSION_RETENTION_DAYS = 90       # versions older than this move to the archive...
+KEEP_LATEST_VERSIONS = 5          # ...except the newest few of every section
+PUBLISHED_RETENTION_DAYS = 30     # published modules untouched for this long are archived
+DRAFT_RETENTION_DAYS = 180        # abandoned drafts are archived after this long
+CHANGE_LOG_RETENTION_DAYS = 7     # live-update change log entries are deleted
+ARCHIVE_RETENTION_DAYS = None     # archived rows are kept forever unless set
+JOB_RETENTION_DAYS = 14           # finished background jobs are deleted
+
+# Rows moved per transaction; small batches keep write locks short
+BATCH_SIZE = 500
+# Free pages released per incremental_vacuum step
+VACUUM_STEP_PAGES = 1000
+
+# Archive tables mirror the hot tables (without constraints) plus archived_at
+ARCHIVE_COLUMNS = {
+    "modules": ["id", "module_title", "created_at", "updated_at", "status"],
+    "sections": ["id", "module_id", "section_id", "title", "content", "type", "bloom_level",
+                 "version", "created_at", "updated_at",
+                 "quality_score", "readability_score", "length_score", "coverage_score"],
+    "approvals": ["id", "section_id", "is_approved", "is_rejected", "rejection_comments",
+                  "approved_at", "rejected_at"],
+    "versions": ["id", "section_id", "original_content", "edited_content", "version", "created_at"],
+}
+
+
+def archive_path(db_path=None):
+    """Archive database that sits next to the main database file."""
+    base, _ = os.path.splitext(db_path or database.current_db_path())
+    return f"{base}_archive.db"
+
+
+@contextmanager
+def archive_connection(path=None):
+    """get_db_connection() with the archive database attached as `archive`."""
+    with get_attached_connection(path or archive_path(), "archive") as conn:
+        create_archive_tables(conn)
+        yield conn
+
+
+def create_archive_tables(conn):
+    """Create the attached archive's tables if needed."""
+    for table, columns in ARCHIVE_COLUMNS.items():
+        conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS archive.{table} (
+                {columns[0]} INTEGER PRIMARY KEY,
+                {', '.join(columns[1:])},
+                archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        # Archives created before a column was mirrored
+        existing = {row[1] for row in conn.execute(f"PRAGMA archive.table_info({table})").fetchall()}
+        for column in columns:
+            if column not in existing:
+                conn.execute(f"ALTER TABLE archive.{table} ADD COLUMN {column}")
+    conn.execute("CREATE INDEX IF NOT EXISTS archive.idx_archive_sections_module ON sections(module_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS archive.idx_archive_versions_section ON versions(section_id)")
+    conn.commit()
+
+
+def _copy_rows(cursor, table, where, params, source="main", target="archive"):
+    """Copy matching rows between the main and archive databases; returns the row count."""
+    columns = ", ".join(ARCHIVE_COLUMNS[table])
+    cursor.execute(f"""
+        INSERT OR REPLACE INTO {target}.{table} ({columns})
+        SELECT {columns} FROM {source}.{table} WHERE {where}
+    """, params)
+    return cursor.rowcount
+
+
+def _id_list(ids):
+    return ",".join("?" * len(ids))
+
+
+def archive_versions(conn, older_than_days=VERSION_RETENTION_DAYS, keep_latest=KEEP_LATEST_VERSIONS,
+                     batch_size=BATCH_SIZE, dry_run=False, pause=0.0):
+    """Move old version rows to the archive, keeping the newest `keep_latest` per section."""
+    cursor = conn.cursor()
+    candidates = """
+        SELECT id FROM (
+            SELECT id, created_at,
+                   ROW_NUMBER() OVER (PARTITION BY section_id ORDER BY id DESC) AS newest
+            FROM main.versions
+        )
+        WHERE newest > ? AND created_at < datetime('now', ?)
+    """
+    params = (keep_latest, f"-{older_than_days} days")
+    if dry_run:
+        cursor.execute(f"SELECT COUNT(*) FROM ({candidates})", params)
+        return cursor.fetchone()[0]
+    moved = 0
+    while True:
+        cursor.execute(f"{candidates} LIMIT ?", params + (batch_size,))
+        ids = [row[0] for row in cursor.fetchall()]
+        if not ids:
+            return moved
+        where = f"id IN ({_id_list(ids)})"
+        _copy_rows(cursor, "versions", where, ids)
+        cursor.execute(f"DELETE FROM main.versions WHERE {where}", ids)
+        conn.commit()
+        moved += len(ids)
+        time.sleep(pause)
+
+
+def find_archivable_modules(conn, status, older_than_days):
+    """Module ids with the given status whose last activity is older than the cutoff."""
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT m.id
+        FROM main.modules m
+        LEFT JOIN main.sections s ON s.module_id = m.id
+        WHERE m.status = ?
+        GROUP BY m.id
+        HAVING MAX(m.updated_at, COALESCE(MAX(s.updated_at), m.updated_at)) < datetime('now', ?)
+        ORDER BY m.id
+    """, (status, f"-{older_than_days} days"))
+    return [row[0] for row in cursor.fetchall()]
+
+
+def _move_module(cursor, module_id, source, target):
+    """Move one module with its sections, approvals and versions between databases."""
+    section_where = f"section_id IN (SELECT id FROM {source}.sections WHERE module_id = ?)"
+    rows = _copy_rows(cursor, "modules", "id = ?", (module_id,), source, target)
+    rows += _copy_rows(cursor, "sections", "module_id = ?", (module_id,), source, target)
+    rows += _copy_rows(cursor, "approvals", section_where, (module_id,), source, target)
+    rows += _copy_rows(cursor, "versions", section_where, (module_id,), source, target)
+    # Children first: foreign keys are not enforced, so nothing cascades
+    cursor.execute(f"DELETE FROM {source}.versions WHERE {section_where}", (module_id,))
+    cursor.execute(f"DELETE FROM {source}.approvals WHERE {section_where}", (module_id,))
+    cursor.execute(f"DELETE FROM {source}.sections WHERE module_id = ?", (module_id,))
+    cursor.execute(f"DELETE FROM {source}.modules WHERE id = ?", (module_id,))
+    return rows
+
+
+def archive_modules(conn, module_ids, dry_run=False, pause=0.0):
+    """Move whole modules to the archive, one short transaction per module."""
+    if dry_run:
+        return 0
+    cursor = conn.cursor()
+    rows = 0
+    for module_id in module_ids:
+        rows += _move_module(cursor, module_id, "main", "archive")
+        conn.commit()
+        time.sleep(pause)
+    return rows
+
+
+def restore_module(module_id, path=None):
+    """Move an archived module back into the live database. Returns False if it is not archived."""
+    with archive_connection(path) as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT 1 FROM archive.modules WHERE id = ?", (module_id,))
+        if cursor.fetchone() is None:
+            return False
+        _move_module(cursor, module_id, "archive", "main")
+        # Sections archived before their scores were kept come back unscored
+        cursor.execute("""
+            SELECT id, content, type FROM sections WHERE module_id = ? AND quality_score IS NULL
+        """, (module_id,))
+        rows = cursor.fetchall()
+        if rows:
+            scores = score_sections([r['content'] for r in rows], [r['type'] for r in rows])
+            cursor.executemany(
+                f"UPDATE sections SET {', '.join(f'{c} = ?' for c in QUALITY_COLUMNS)} WHERE id = ?",
+                [values + (row['id'],) for values, row in zip(scores, rows)]
+            )
+        return True
+
+
+def list_archived_modules(path=None):
+    """Archived module headers, most recently archived first."""
+    with archive_connection(path) as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT id, module_title, status, updated_at, archived_at
+            FROM archive.modules
+            ORDER BY archived_at DESC, id DESC
+        """)
+        return [dict(row) for row in cursor.fetchall()]
+
+
+def prune_change_log(conn, older_than_days=CHANGE_LOG_RETENTION_DAYS, batch_size=BATCH_SIZE, dry_run=False):
+    """Delete old change log entries (only needed for live updates of open sessions)."""
+    cursor = conn.cursor()
+    cutoff = f"-{older_than_days} days"
+    if dry_run:
+        cursor.execute("SELECT COUNT(*) FROM main.changes WHERE changed_at < datetime('now', ?)", (cutoff,))
+        return cursor.fetchone()[0]
+    deleted = 0
+    while True:
+        cursor.execute("""
+            DELETE FROM main.changes WHERE id IN (
+                SELECT id FROM main.changes WHERE changed_at < datetime('now', ?) LIMIT ?
+            )
+        """, (cutoff, batch_size))
+        conn.commit()
+        deleted += cursor.rowcount
+        if cursor.rowcount < batch_size:
+            return deleted
+
+
+def prune_jobs(conn, older_than_days=JOB_RETENTION_DAYS, dry_run=False):
+    """Delete finished background jobs (see utils.jobs) older than the retention period."""
+    cursor = conn.cursor()
+    cursor.execute("SELECT 1 FROM main.sqlite_master WHERE type = 'table' AND name = 'jobs'")
+    if cursor.fetchone() is None:
+        return 0
+    cutoff = f"-{older_than_days} days"
+    if dry_run:
+        cursor.execute("""
+            SELECT COUNT(*) FROM main.jobs
+            WHERE status IN ('done', 'failed') AND finished_at < datetime('now', ?)
+        """, (cutoff,))
+        return cursor.fetchone()[0]
+    cursor.execute("""
+        DELETE FROM main.jobs
+        WHERE status IN ('done', 'failed') AND finished_at < datetime('now', ?)
+    """, (cutoff,))
+    conn.commit()
+    return cursor.rowcount
+
+
+def prune_archive(conn, older_than_days=ARCHIVE_RETENTION_DAYS, dry_run=False):
+    """Permanently delete archived rows older than the retention period."""
+    if older_than_days is None:
+        return 0
+    cursor = conn.cursor()
+    cutoff = f"-{older_than_days} days"
+    deleted = 0
+    for table in ARCHIVE_COLUMNS:
+        if dry_run:
+            cursor.execute(f"SELECT COUNT(*) FROM archive.{table} WHERE archived_at < datetime('now', ?)", (cutoff,))
+            deleted += cursor.fetchone()[0]
+        else:
+            cursor.execute(f"DELETE FROM archive.{table} WHERE archived_at < datetime('now', ?)", (cutoff,))
+            deleted += cursor.rowcount
+    conn.commit()
+    return deleted
+
+
+def _pragma(conn, name, schema="main"):
+    return conn.execute(f"PRAGMA {schema}.{name}").fetchone()[0]
+
+
+def compact(conn, schema="main", full_vacuum=False, step_pages=VACUUM_STEP_PAGES, pause=0.0):
+    """Release free pages back to the filesystem.
+
+    Uses incremental_vacuum in small steps so writers are only briefly held up.
+    Databases created without auto_vacuum=INCREMENTAL need a one-time full
+    VACUUM (full_vacuum=True), which rewrites the whole file and blocks writers.
+    Returns the number of pages released.
+    """
+    page_size = _pragma(conn, "page_size", schema)
+    before = _pragma(conn, "page_count", schema)
+    if _pragma(conn, "auto_vacuum", schema) != 2:
+        if not full_vacuum:
+            logger.info("%s database is not in incremental auto_vacuum mode; run with --full-vacuum once", schema)
+            return 0
+        conn.execute(f"PRAGMA {schema}.auto_vacuum = INCREMENTAL")
+        conn.execute(f"VACUUM {schema}")
+    free = _pragma(conn, "freelist_count", schema)
+    while free > 0:
+        # execute() stops after the first freed page; executescript runs the pragma to completion
+        conn.executescript(f"PRAGMA {schema}.incremental_vacuum({step_pages});")
+        remaining = _pragma(conn, "freelist_count", schema)
+        if remaining >= free:
+            break
+        free = remaining
+        time.sleep(pause)
+    released = before - _pragma(conn, "page_count", schema)
+    logger.debug("Released %d pages (%d bytes) from %s", released, released * page_size, schema)
+    return released
+
+
+def _file_size(path):
+    return os.path.getsize(path) if os.path.exists(path) else 0
+
+
+def run_maintenance(version_days=VERSION_RETENTION_DAYS, keep_versions=KEEP_LATEST_VERSIONS,
+                    published_days=PUBLISHED_RETENTION_DAYS, draft_days=DRAFT_RETENTION_DAYS,
+                    change_log_days=CHANGE_LOG_RETENTION_DAYS, archive_days=ARCHIVE_RETENTION_DAYS,
+                    archive_db=None, batch_size=BATCH_SIZE, full_vacuum=False, dry_run=False, pause=0.01,
+                    job_days=JOB_RETENTION_DAYS):
+    """Archive, prune and compact modules.db. Returns a report dict.
+
+    Work is done in short batched transactions with a pause in between, so the
+    app keeps serving reads and writes while this runs.
+    """
+    started = time.perf_counter()
+    archive_db = archive_db or archive_path()
+    size_before = _file_size(database.current_db_path())
+    report = {'dry_run': dry_run, 'archive_path': archive_db}
+
+    with archive_connection(archive_db) as conn:
+        report['versions_archived'] = archive_versions(
+            conn, version_days, keep_versions, batch_size, dry_run, pause
+        )
+        published = find_archivable_modules(conn, 'published', published_days)
+        drafts = find_archivable_modules(conn, 'draft', draft_days)
+        report['published_modules_archived'] = len(published)
+        report['draft_modules_archived'] = len(drafts)
+        report['module_rows_archived'] = archive_modules(conn, published + drafts, dry_run, pause)
+        report['changes_pruned'] = prune_change_log(conn, change_log_days, batch_size, dry_run)
+        report['jobs_pruned'] = prune_jobs(conn, job_days, dry_run)
+        report['archive_rows_pruned'] = prune_archive(conn, archive_days, dry_run)
+
+        if not dry_run:
+            report['pages_released'] = compact(conn, "main", full_vacuum, pause=pause)
+            compact(conn, "archive", full_vacuum=True, pause=pause)
+            conn.execute("PRAGMA main.optimize")
+            # In WAL mode the file only shrinks once the freed pages are checkpointed
+            conn.execute("PRAGMA main.wal_checkpoint(PASSIVE)").fetchall()
+            conn.execute("PRAGMA archive.optimize")
+
+    size_after = _file_size(database.current_db_path())
+    report['bytes_before'] = size_before
+    report['bytes_after'] = size_after
+    report['bytes_reclaimed'] = size_before - size_after
+    report['archive_bytes'] = _file_size(archive_db)
+    report['seconds'] = time.perf_counter() - started
+    return report
+
+
+def start_maintenance_thread(interval_hours, **policy):
+    """Run maintenance every `interval_hours` on a daemon thread; returns a stop event."""
+    stop = threading.Event()
+
+    def loop():
+        while not stop.wait(interval_hours * 3600):
+            try:
+                report = run_maintenance(**policy)
+                logger.info("Maintenance finished: %s", report)
+            except Exception:
+                logger.exception("Scheduled maintenance failed")
+
+    threading.Thread(target=loop, name="modules-db-maintenance", daemon=True).start()
+    return stop
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Archive, prune and compact modules.db")
+    parser.add_argument("--version-days", type=int, default=VERSION_RETENTION_DAYS, help="Archive versions older than this")
+    parser.add_argument("--keep-versions", type=int, default=KEEP_LATEST_VERSIONS, help="Newest versions per section kept live")
+    parser.add_argument("--published-days", type=int, default=PUBLISHED_RETENTION_DAYS, help="Archive published modules idle this long")
+    parser.add_argument("--draft-days", type=int, default=DRAFT_RETENTION_DAYS, help="Archive drafts idle this long")
+    parser.add_argument("--change-log-days", type=int, default=CHANGE_LOG_RETENTION_DAYS, help="Delete change log entries older than this")
+    parser.add_argument("--archive-days", type=int, default=ARCHIVE_RETENTION_DAYS, help="Delete archived rows older than this (default: keep)")
+    parser.add_argument("--job-days", type=int, default=JOB_RETENTION_DAYS, help="Delete finished background jobs older than this")
+    parser.add_argument("--archive-db", help="Archive database path (default: <db>_archive.db)")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="Rows per transaction")
+    parser.add_argument("--full-vacuum", action="store_true", help="One-time VACUUM to enable incremental auto_vacuum (blocks writers)")
+    parser.add_argument("--dry-run", action="store_true", help="Report what would be archived without changing anything")
+    parser.add_argument("--restore", type=int, metavar="MODULE_ID", help="Move an archived module back into modules.db")
+    parser.add_argument("--list-archived", action="store_true", help="List archived modules")
+    args = parser.parse_args(argv)
+
+    if args.restore is not None:
+        init_db()
+        restored = restore_module(args.restore, args.archive_db)
+        print(f"Module {args.restore} {'restored' if restored else 'not found in the archive'}")
+        return 0 if restored else 1
+    if args.list_archived:
+        for module in list_archived_modules(args.archive_db):
+            print(f"  {module['id']:>6}  {module['status']:<10} archived {module['archived_at']}  {module['module_title']}")
+        return 0
+
+    init_db()
+    report = run_maintenance(
+        args.version_days, args.keep_versions, args.published_days, args.draft_days,
+        args.change_log_days, args.archive_days, args.archive_db, args.batch_size,
+        args.full_vacuum, args.dry_run, job_days=args.job_days
+    )
+    prefix = "Would archive" if args.dry_run else "Archived"
+    print(f"{prefix} {report['versions_archived']} versions, "
+          f"{report['published_modules_archived']} published and {report['draft_modules_archived']} draft modules")
+    print(f"  change log entries pruned: {report['changes_pruned']}")
+    print(f"  finished jobs pruned: {report['jobs_pruned']}")
+    print(f"  archived rows pruned: {report['archive_rows_pruned']}")
+    print(f"  size: {report['bytes_before']:,} -> {report['bytes_after']:,} bytes "
+          f"({report['bytes_reclaimed']:,} reclaimed); archive {report['archive_bytes']:,} bytes")
+    print(f"  finished in {report['seconds']:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
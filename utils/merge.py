@@ -0,0 +1,88 @@
+import difflib
+
+
+def _hunks(base_lines, other_lines, side):
+    """Return the changed regions of other relative to base as (start, end, lines, side)."""
+    matcher = difflib.SequenceMatcher(None, base_lines, other_lines, autojunk=False)
+    return [
+        (i1, i2, other_lines[j1:j2], side)
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes()
+        if tag != 'equal'
+    ]
+
+
+def _apply_hunks(base_lines, hunks, start, end):
+    """Rebuild base_lines[start:end] with the given hunks applied."""
+    result = []
+    pos = start
+    for h_start, h_end, lines, _ in hunks:
+        result.extend(base_lines[pos:h_start])
+        result.extend(lines)
+        pos = h_end
+    result.extend(base_lines[pos:end])
+    return result
+
+
+def _terminated(lines):
+    """Make sure the last line ends with a newline before adding conflict markers."""
+    if lines and not lines[-1].endswith("\n"):
+        return lines[:-1] + [lines[-1] + "\n"]
+    return lines
+
+
+def three_way_merge(base, ours, theirs):
+    """Line-based three-way merge of two edits made against the same base.
+
+    Returns (merged_text, has_conflicts). Overlapping changes that differ are
+    wrapped in conflict markers so a reviewer can resolve them by hand.
+    """
+    if ours == theirs or base == theirs:
+        return ours, False
+    if base == ours:
+        return theirs, False
+
+    base_lines = base.splitlines(keepends=True)
+    ours_lines = ours.splitlines(keepends=True)
+    theirs_lines = theirs.splitlines(keepends=True)
+
+    hunks = sorted(
+        _hunks(base_lines, ours_lines, 'ours') + _hunks(base_lines, theirs_lines, 'theirs'),
+        key=lambda h: (h[0], h[1])
+    )
+
+    merged = []
+    has_conflicts = False
+    pos = 0
+    idx = 0
+    while idx < len(hunks):
+        # Group hunks that overlap or touch in the base
+        group = [hunks[idx]]
+        group_start, group_end = hunks[idx][0], hunks[idx][1]
+        idx += 1
+        while idx < len(hunks) and hunks[idx][0] <= group_end:
+            group.append(hunks[idx])
+            group_end = max(group_end, hunks[idx][1])
+            idx += 1
+
+        merged.extend(base_lines[pos:group_start])
+        ours_hunks = [h for h in group if h[3] == 'ours']
+        theirs_hunks = [h for h in group if h[3] == 'theirs']
+        ours_region = _apply_hunks(base_lines, ours_hunks, group_start, group_end)
+        theirs_region = _apply_hunks(base_lines, theirs_hunks, group_start, group_end)
+
+        if not theirs_hunks or ours_region == theirs_region:
+            merged.extend(ours_region)
+        elif not ours_hunks:
+            merged.extend(theirs_region)
+        else:
+            has_conflicts = True
+            merged = _terminated(merged)
+            merged.append("<<<<<<< your edit\n")
+            merged.extend(_terminated(ours_region))
+            merged.append("=======\n")
+            merged.extend(_terminated(theirs_region))
+            merged.append(">>>>>>> latest saved\n")
+        pos = group_end
+
+    merged.extend(base_lines[pos:])
+    return "".join(merged), has_conflicts
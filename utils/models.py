@@ -0,0 +1,190 @@
+import os
+import sys
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field, fields
+
+# Ensure the project root is importable when running this module directly
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from utils import database
+
+# Upper bound (in characters) on section bodies kept in memory per process
+CONTENT_CACHE_CHARS = int(os.getenv("CONTENT_CACHE_CHARS", str(8 * 1024 * 1024)))
+
+
+class ContentCache:
+    """Process-wide LRU of section bodies keyed by (section id, version).
+
+    Sessions share one copy of every body instead of each holding its own.
+    Entries for a given version never change, so no invalidation is needed;
+    superseded versions simply age out. Entries are kept apart per workspace,
+    since section ids repeat across shards.
+    """
+
+    def __init__(self, max_chars=CONTENT_CACHE_CHARS):
+        self.max_chars = max_chars
+        self.source = database
+        self._entries = OrderedDict()
+        self._chars = 0
+        self._lock = threading.Lock()
+
+    def get(self, section_id, version):
+        key = (database.current_workspace(), section_id, version)
+        with self._lock:
+            content = self._entries.get(key)
+            if content is not None:
+                self._entries.move_to_end(key)
+                return content
+        return self.load([(section_id, version)])[(section_id, version)]
+
+    def load(self, keys):
+        """Fetch the (id, version) pairs not yet cached in one query; returns {key: content}."""
+        workspace = database.current_workspace()
+        result = {}
+        missing = []
+        with self._lock:
+            for key in keys:
+                content = self._entries.get((workspace, *key))
+                if content is None:
+                    missing.append(key)
+                else:
+                    self._entries.move_to_end((workspace, *key))
+                    result[key] = content
+        if not missing:
+            return result
+
+        rows = self.source.get_section_contents([section_id for section_id, _ in missing])
+        for section_id, version in missing:
+            current_version, content = rows.get(section_id, (None, None))
+            if current_version != version:
+                # The section moved on (or the replica lags); read the exact version
+                content = self.source.get_section_content_at_version(section_id, version)
+            result[(section_id, version)] = content or ""
+        with self._lock:
+            for key in missing:
+                self._store((workspace, *key), result[key])
+        return result
+
+    def _store(self, key, content):
+        if key in self._entries:
+            return
+        self._entries[key] = content
+        self._chars += len(content)
+        while self._chars > self.max_chars and len(self._entries) > 1:
+            _, evicted = self._entries.popitem(last=False)
+            self._chars -= len(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._chars = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+
+CONTENT_CACHE = ContentCache()
+
+
+def set_content_source(repository):
+    """Load section bodies through a repository (anything with get_section_contents)."""
+    CONTENT_CACHE.source = repository
+    CONTENT_CACHE.clear()
+
+
+@dataclass(slots=True)
+class Section:
+    """A module section without its body; `content` is loaded on first access."""
+
+    id: int
+    module_id: int
+    section_id: str
+    title: str
+    type: str
+    bloom_level: str = None
+    version: int = 1
+    is_approved: bool = False
+    is_rejected: bool = False
+    rejection_comments: str = None
+    created_at: str = None
+    updated_at: str = None
+    # utils.quality scores, 0-100; None until scored
+    quality_score: float = None
+    readability_score: float = None
+    length_score: float = None
+    coverage_score: float = None
+
+    @classmethod
+    def from_row(cls, row):
+        """Build from a sections/approvals row (dict or mapping); extra keys are ignored."""
+        return cls(**{name: row[name] for name in SECTION_FIELDS if name in row})
+
+    @property
+    def key(self):
+        """Stable identifier for widget and state keys (external id, else DB id)."""
+        return str(self.section_id or self.id)
+
+    @property
+    def content(self):
+        return CONTENT_CACHE.get(self.id, self.version)
+
+
+SECTION_FIELDS = tuple(f.name for f in fields(Section))
+
+
+@dataclass(slots=True)
+class Module:
+    """A module header and its sections, in section id order."""
+
+    id: int
+    module_title: str
+    status: str
+    created_at: str = None
+    updated_at: str = None
+    sections: list = field(default_factory=list)
+
+    @classmethod
+    def from_row(cls, row):
+        """Build from the dict returned by get_module_by_id."""
+        return cls(
+            id=row['id'],
+            module_title=row['module_title'],
+            status=row['status'],
+            created_at=row['created_at'],
+            updated_at=row['updated_at'],
+            sections=[Section.from_row(s) for s in row.get('sections', [])],
+        )
+
+    def apply_header(self, row):
+        """Update title, status and timestamps from a modules row."""
+        self.module_title = row['module_title']
+        self.status = row['status']
+        self.created_at = row['created_at']
+        self.updated_at = row['updated_at']
+
+    def replace_sections(self, section_ids, rows):
+        """Swap the given section ids for freshly loaded rows (missing ids are dropped)."""
+        kept = [s for s in self.sections if s.id not in section_ids]
+        self.sections = sorted(kept + [Section.from_row(r) for r in rows], key=lambda s: s.id)
+
+    def apply_changes(self, changes, repository):
+        """Apply change log entries (see changes_since), reloading only the rows they name.
+
+        Returns False if the module itself no longer exists.
+        """
+        if any(c['table_name'] == 'modules' for c in changes):
+            header = repository.get_modules_by_ids([self.id])
+            if not header:
+                return False
+            self.apply_header(header[0])
+        changed_ids = {c['row_id'] for c in changes if c['table_name'] in ('sections', 'approvals')}
+        if changed_ids:
+            self.replace_sections(changed_ids, repository.get_sections_by_ids(list(changed_ids), include_content=False))
+        return True
+
+    def prefetch_content(self):
+        """Load all uncached section bodies in a single query before rendering them."""
+        CONTENT_CACHE.load([(s.id, s.version) for s in self.sections])
@@ -0,0 +1,205 @@
+import argparse
+import os
+import re
+import sys
+import time
+
+import numpy as np
+
+# Allow running as `python utils/quality.py` as well as `python -m utils.quality`
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from utils import database
+from utils.bloom import load_lexicon, _stem
+from utils.database import get_db_connection
+from utils.state_store import module_namespace
+
+# Stored on every section, each 0-100 (higher is better)
+QUALITY_COLUMNS = ("quality_score", "readability_score", "length_score", "coverage_score")
+# quality_score = length_score% of the weighted readability/verb coverage mix,
+# so a stub or a wall of text scores low however readable it is
+WEIGHTS = np.array([0.6, 0.4])
+
+# Comfortable length in words per section type; outside it the length score falls off
+LENGTH_RANGES = {
+    "learning_objective": (15, 120),
+    "lesson": (120, 800),
+    "assessment": (30, 400),
+}
+DEFAULT_LENGTH_RANGE = (40, 800)
+# Share of sentences expected to start from an action verb for full coverage marks
+COVERAGE_TARGETS = {
+    "learning_objective": 1.0,
+    "assessment": 0.6,
+    "lesson": 0.2,
+}
+DEFAULT_COVERAGE_TARGET = 0.3
+
+# Sections scoring below this get a regeneration queued before anyone reviews them
+REGENERATE_BELOW = float(os.getenv("QUALITY_REGENERATE_BELOW", "40"))
+
+_WORD = re.compile(r"[a-z]+")
+_SENTENCE = re.compile(r"[^.!?\n]+")
+_VOWEL_GROUP = re.compile(r"[aeiouy]+")
+
+_lexicon = None
+
+
+def _text_counts(texts):
+    """Words, sentences, syllables and sentences with an action verb, one row per text."""
+    global _lexicon
+    if _lexicon is None:
+        _lexicon = load_lexicon()
+    counts = np.zeros((len(texts), 4), dtype=np.float64)
+    for row, text in enumerate(texts):
+        text = (text or "").lower()
+        words = sentences = verb_sentences = 0
+        for sentence in _SENTENCE.findall(text):
+            tokens = _WORD.findall(sentence)
+            if not tokens:
+                continue
+            sentences += 1
+            words += len(tokens)
+            if any(_stem(token) in _lexicon for token in tokens):
+                verb_sentences += 1
+        # Vowel groups approximate syllables; every word has at least one
+        syllables = max(len(_VOWEL_GROUP.findall(text)), words)
+        counts[row] = (words, sentences, syllables, verb_sentences)
+    return counts
+
+
+def score_texts(texts, types):
+    """Scores for many texts at once: array of shape (n, 4) in QUALITY_COLUMNS order."""
+    if not len(texts):
+        return np.zeros((0, len(QUALITY_COLUMNS)))
+    words, sentences, syllables, verb_sentences = _text_counts(texts).T
+    has_words = words > 0
+    safe_words = np.maximum(words, 1)
+    safe_sentences = np.maximum(sentences, 1)
+
+    # Flesch reading ease, clipped to 0-100
+    flesch = 206.835 - 1.015 * (words / safe_sentences) - 84.6 * (syllables / safe_words)
+    readability = np.where(has_words, np.clip(flesch, 0, 100), 0.0)
+
+    ranges = np.array([LENGTH_RANGES.get(t, DEFAULT_LENGTH_RANGE) for t in types], dtype=np.float64)
+    low, high = ranges[:, 0], ranges[:, 1]
+    length = 100 * np.where(words < low, words / low, np.where(words > high, high / safe_words, 1.0))
+
+    targets = np.array([COVERAGE_TARGETS.get(t, DEFAULT_COVERAGE_TARGET) for t in types])
+    coverage = 100 * np.clip(verb_sentences / safe_sentences / targets, 0, 1)
+
+    quality = (np.stack([readability, coverage], axis=1) @ WEIGHTS) * length / 100
+    return np.round(np.column_stack([quality, readability, length, coverage]), 1)
+
+
+def score_sections(contents, types):
+    """Score tuples (QUALITY_COLUMNS order) ready to be bound as SQL parameters."""
+    return [tuple(float(v) for v in row) for row in score_texts(list(contents), list(types))]
+
+
+def score_library(rescore=False, batch_size=1000):
+    """Fill in missing scores (or recompute all of them). Returns the number of sections scored."""
+    assignments = ", ".join(f"{column} = ?" for column in QUALITY_COLUMNS)
+    where = "" if rescore else "AND quality_score IS NULL"
+    scored = 0
+    last_id = 0
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        while True:
+            cursor.execute(f"""
+                SELECT id, content, type FROM sections
+                WHERE id > ? {where}
+                ORDER BY id LIMIT ?
+            """, (last_id, batch_size))
+            rows = cursor.fetchall()
+            if not rows:
+                return scored
+            last_id = rows[-1]['id']
+            scores = score_sections([r['content'] for r in rows], [r['type'] for r in rows])
+            cursor.executemany(
+                f"UPDATE sections SET {assignments} WHERE id = ?",
+                [values + (row['id'],) for values, row in zip(scores, rows)]
+            )
+            conn.commit()
+            scored += len(rows)
+
+
+def lowest_scoring_sections(limit=20, below=None):
+    """Sections with the lowest quality_score across the library."""
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(f"""
+            SELECT s.id, s.module_id, s.title, s.type, {', '.join('s.' + c for c in QUALITY_COLUMNS)}
+            FROM sections s
+            WHERE s.quality_score IS NOT NULL AND s.quality_score < ?
+            ORDER BY s.quality_score
+            LIMIT ?
+        """, (101 if below is None else below, limit))
+        return [dict(row) for row in cursor.fetchall()]
+
+
+def queue_low_quality_regeneration(job_queue, module, threshold=REGENERATE_BELOW):
+    """Queue regenerate jobs for a module's unapproved sections scoring below threshold.
+
+    `module` is a get_module_by_id() dict (with content). The rewrites land
+    as pending edits, so reviewers see them next to the original. Sections
+    that already have a regeneration queued or running are skipped. The jobs
+    run at background priority, and queuing stops early once the background
+    queue is full. Returns {section key: job id} for the jobs queued.
+    """
+    from utils.jobs import ACTIVE_STATUSES, QueueFullError
+    active = {
+        job['payload'].get('key')
+        for job in job_queue.list_jobs(kind='regenerate_section', module_id=module['id'],
+                                       statuses=ACTIVE_STATUSES, limit=1000)
+    }
+    queued = {}
+    for section in module['sections']:
+        key = str(section.get('section_id') or section.get('id'))
+        score = section.get('quality_score')
+        if score is None or score >= threshold or section.get('is_approved') or key in active:
+            continue
+        try:
+            queued[key] = job_queue.submit('regenerate_section', {
+                'namespace': module_namespace(module['id'], "edits"), 'key': key, 'text': section['content']
+            }, module_id=module['id'], priority='background')
+        except QueueFullError:
+            break
+    return queued
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Content quality scores for modules.db")
+    parser.add_argument("--rescore", action="store_true", help="Recompute every score, not just missing ones")
+    parser.add_argument("--report", type=int, metavar="N", help="List the N lowest-scoring sections")
+    parser.add_argument("--below", type=float, help="Only report sections below this score")
+    parser.add_argument("--queue-regeneration", action="store_true",
+                        help=f"Queue regeneration for unapproved sections below --below (default {REGENERATE_BELOW:g})")
+    args = parser.parse_args(argv)
+
+    database.init_db()
+    started = time.perf_counter()
+    scored = score_library(rescore=args.rescore)
+    print(f"Scored {scored} sections in {time.perf_counter() - started:.2f}s")
+    if args.report:
+        for row in lowest_scoring_sections(args.report, args.below):
+            print(f"  {row['quality_score']:>5.1f}  (read {row['readability_score']:>5.1f}, length {row['length_score']:>5.1f}, "
+                  f"verbs {row['coverage_score']:>5.1f})  module {row['module_id']:>5} section {row['id']:>7}  {row['title']}")
+    if args.queue_regeneration:
+        # Jobs are picked up by the app's workers (utils.jobs)
+        from utils.jobs import JobQueue, SQLiteJobStore
+        job_queue = JobQueue(SQLiteJobStore(), workers=0)
+        threshold = REGENERATE_BELOW if args.below is None else args.below
+        module_ids = sorted({row['module_id'] for row in lowest_scoring_sections(10_000, threshold)})
+        queued = sum(
+            len(queue_low_quality_regeneration(job_queue, database.get_module_by_id(module_id), threshold))
+            for module_id in module_ids
+        )
+        print(f"Queued {queued} regenerations")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,297 @@
+import collections
+import logging
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+from utils import database
+
+logger = logging.getLogger(__name__)
+
+# Opt-in switches
+SQL_TRACE = os.getenv("SQL_TRACE", "").lower() in ("1", "true", "yes")
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "50"))
+
+# Most recent slow queries (with their plans), newest last
+SLOW_QUERY_LOG_SIZE = 100
+slow_queries = collections.deque(maxlen=SLOW_QUERY_LOG_SIZE)
+
+_listeners = []
+_local = threading.local()
+_THIS_FILE = os.path.abspath(__file__)
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+
+
+def normalize_sql(sql):
+    """Collapse whitespace and replace literals so equivalent statements group together."""
+    sql = " ".join(sql.split())
+    sql = _STRING_LITERAL.sub("?", sql)
+    sql = _NUMBER_LITERAL.sub("?", sql)
+    return _PLACEHOLDER_LIST.sub("(?)", sql)
+
+
+def _caller():
+    """Name of the first function outside this module and contextlib."""
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if os.path.abspath(filename) != _THIS_FILE and not filename.endswith("contextlib.py"):
+            module = os.path.splitext(os.path.basename(filename))[0]
+            return f"{module}.{frame.f_code.co_name}"
+        frame = frame.f_back
+    return "unknown"
+
+
+class QueryEntry:
+    """One executed statement: normalized text, duration, rows and caller."""
+
+    __slots__ = ("sql", "normalized", "params", "seconds", "rows", "caller", "many", "logged")
+
+    def __init__(self, sql, params, caller, many):
+        self.sql = sql
+        self.normalized = normalize_sql(sql)
+        self.params = params
+        self.seconds = 0.0
+        self.rows = 0
+        self.caller = caller
+        self.many = many
+        self.logged = False
+
+    def as_dict(self):
+        return {
+            "sql": self.normalized,
+            "ms": round(self.seconds * 1000, 3),
+            "rows": self.rows,
+            "caller": self.caller,
+        }
+
+
+class TracingCursor(sqlite3.Cursor):
+    """Cursor that times execution and fetching and counts returned rows."""
+
+    _entry = None
+
+    def _run(self, method, sql, params, many):
+        self._finish()
+        entry = QueryEntry(sql, params, _caller(), many)
+        t = time.perf_counter()
+        try:
+            result = method(self, sql, params) if params is not None else method(self, sql)
+        finally:
+            entry.seconds += time.perf_counter() - t
+        # Row counts for DML come from rowcount; SELECTs are counted as they are fetched
+        if self.description is None and self.rowcount > 0:
+            entry.rows = self.rowcount
+        self._entry = entry
+        if self.description is None:
+            self._finish()
+        else:
+            # Until its rows are read, so commit()/rollback() can record it
+            self.connection._pending_cursors.add(self)
+        return result
+
+    def execute(self, sql, params=None):
+        return self._run(sqlite3.Cursor.execute, sql, params, False)
+
+    def executemany(self, sql, params):
+        return self._run(sqlite3.Cursor.executemany, sql, params, True)
+
+    def _timed_fetch(self, method, *args):
+        t = time.perf_counter()
+        result = method(self, *args)
+        if self._entry is not None:
+            self._entry.seconds += time.perf_counter() - t
+        return result
+
+    def fetchone(self):
+        row = self._timed_fetch(sqlite3.Cursor.fetchone)
+        if row is None:
+            self._finish()
+        elif self._entry is not None:
+            self._entry.rows += 1
+        return row
+
+    def fetchmany(self, size=None):
+        rows = self._timed_fetch(sqlite3.Cursor.fetchmany, self.arraysize if size is None else size)
+        if self._entry is not None:
+            self._entry.rows += len(rows)
+        if not rows:
+            self._finish()
+        return rows
+
+    def fetchall(self):
+        rows = self._timed_fetch(sqlite3.Cursor.fetchall)
+        if self._entry is not None:
+            self._entry.rows += len(rows)
+        self._finish()
+        return rows
+
+    def __next__(self):
+        try:
+            row = self._timed_fetch(sqlite3.Cursor.__next__)
+        except StopIteration:
+            self._finish()
+            raise
+        if self._entry is not None:
+            self._entry.rows += 1
+        return row
+
+    def close(self):
+        self._finish()
+        super().close()
+
+    def _finish(self):
+        entry, self._entry = self._entry, None
+        if entry is not None:
+            self.connection._pending_cursors.discard(self)
+            _record(self.connection, entry)
+
+
+class TracingConnection(sqlite3.Connection):
+    """Connection whose cursors (including conn.execute shortcuts) are traced."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Cursors whose SELECT has not been fully read yet. Cached connections
+        # live as long as their thread, so finished cursors must not be kept.
+        self._pending_cursors = set()
+
+    def cursor(self, factory=TracingCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, *args):
+        return self.cursor().execute(sql, *args)
+
+    def executemany(self, sql, *args):
+        return self.cursor().executemany(sql, *args)
+
+    def _flush_cursors(self):
+        # SELECTs read with a single fetchone() are only recorded here
+        for cursor in list(self._pending_cursors):
+            cursor._finish()
+
+    def commit(self):
+        self._flush_cursors()
+        super().commit()
+
+    def rollback(self):
+        self._flush_cursors()
+        super().rollback()
+
+    def close(self):
+        self._flush_cursors()
+        super().close()
+
+
+def _record(conn, entry):
+    if entry.seconds * 1000 >= SLOW_QUERY_MS and not entry.logged:
+        entry.logged = True
+        plan = explain_query_plan(conn, entry)
+        slow_queries.append(dict(entry.as_dict(), plan=plan))
+        logger.warning(
+            "Slow query (%.1f ms, %d rows) in %s: %s\n%s",
+            entry.seconds * 1000, entry.rows, entry.caller, entry.normalized, "\n".join(plan)
+        )
+    captures = getattr(_local, "captures", None)
+    if captures:
+        for capture in captures:
+            capture.append(entry)
+    for listener in list(_listeners):
+        listener(entry)
+
+
+def explain_query_plan(conn, entry):
+    """Return EXPLAIN QUERY PLAN lines for a recorded statement (best effort)."""
+    params = entry.params
+    if entry.many:
+        params = next(iter(params), None) if params is not None else None
+    try:
+        cursor = sqlite3.Connection.cursor(conn)
+        cursor.execute(f"EXPLAIN QUERY PLAN {entry.sql}", params if params is not None else ())
+        return [row[-1] for row in cursor.fetchall()]
+    except (sqlite3.Error, TypeError, ValueError) as e:
+        return [f"(plan unavailable: {e})"]
+
+
+def enable_tracing(slow_ms=None):
+    """Trace every connection opened through utils.database from now on."""
+    global SLOW_QUERY_MS
+    if slow_ms is not None:
+        SLOW_QUERY_MS = slow_ms
+    database.CONNECTION_FACTORY = TracingConnection
+
+
+def disable_tracing():
+    database.CONNECTION_FACTORY = sqlite3.Connection
+
+
+def tracing_enabled():
+    return database.CONNECTION_FACTORY is TracingConnection
+
+
+def add_listener(callback):
+    """Call callback(entry) for every traced statement on any thread."""
+    _listeners.append(callback)
+
+
+def remove_listener(callback):
+    if callback in _listeners:
+        _listeners.remove(callback)
+
+
+def start_capture(reset=False):
+    """Start collecting the statements run by the current thread; returns the list.
+
+    reset=True drops captures left behind by an interrupted run (e.g. a
+    Streamlit rerun that never reached stop_capture).
+    """
+    captured = []
+    if reset or not hasattr(_local, "captures"):
+        _local.captures = []
+    _local.captures.append(captured)
+    return captured
+
+
+def stop_capture(captured):
+    captures = getattr(_local, "captures", [])
+    if captured in captures:
+        captures.remove(captured)
+
+
+@contextmanager
+def capture_queries():
+    """Collect the statements run by the current thread inside the block."""
+    captured = start_capture()
+    try:
+        yield captured
+    finally:
+        stop_capture(captured)
+
+
+def summarize(entries):
+    """Group entries by normalized statement: calls, total ms, rows and callers."""
+    groups = {}
+    for entry in entries:
+        group = groups.setdefault(entry.normalized, {
+            "sql": entry.normalized, "calls": 0, "total_ms": 0.0, "rows": 0, "callers": set()
+        })
+        group["calls"] += 1
+        group["total_ms"] += entry.seconds * 1000
+        group["rows"] += entry.rows
+        group["callers"].add(entry.caller)
+    result = sorted(groups.values(), key=lambda g: g["total_ms"], reverse=True)
+    for group in result:
+        group["total_ms"] = round(group["total_ms"], 3)
+        group["callers"] = ", ".join(sorted(group["callers"]))
+    return result
+
+
+if SQL_TRACE:
+    enable_tracing()
@@ -0,0 +1,712 @@
+import os
+import threading
+import uuid
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from datetime import datetime
+
+from utils import database
+from utils.database import StaleSectionError, merge_section_edit
+from utils.content_pack import build_pack
+
+# Backend selection - "sqlite" (default, modules.db) or "postgres" (DATABASE_URL)
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "sqlite")
+DATABASE_URL = os.getenv("DATABASE_URL", "")
+# Connections kept open per process by the PostgreSQL backend
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+
+
+class Repository(ABC):
+    """Interface for module, section, approval and version storage.
+
+    Method names, arguments and returned row shapes match the functions in
+    utils.database, so callers can switch between backends without changes.
+    Timestamps are returned as 'YYYY-MM-DD HH:MM:SS' UTC strings and
+    approval flags as 0/1 on every backend.
+    """
+
+    @abstractmethod
+    def init_schema(self):
+        """Create or migrate the tables."""
+        raise NotImplementedError
+
+    def save_module_to_db(self, module_title, sections):
+        """Save a module with its sections and approval records; returns its id."""
+        return self.save_modules([{'module_title': module_title, 'sections': sections}])[0]
+
+    @abstractmethod
+    def save_modules(self, modules):
+        """Insert several modules (dicts with module_title, sections and optional
+        status/approved) in one transaction; returns their ids."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_module_by_id(self, module_id, include_content=True):
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_modules_by_ids(self, module_ids):
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_sections_by_ids(self, section_ids, include_content=True):
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_section_contents(self, section_ids):
+        """Return {section id: (version, content)}."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_all_modules(self):
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_module_stats(self, module_id):
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_labelled_sections(self, limit=1000):
+        """Newest approved sections with a Bloom level: dicts with title, content, bloom_level."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_change_cursor(self):
+        raise NotImplementedError
+
+    @abstractmethod
+    def changes_since(self, change_cursor, module_id=None, limit=1000):
+        raise NotImplementedError
+
+    @abstractmethod
+    def update_section_content(self, section_id, new_content, expected_version=None):
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_section_content_at_version(self, section_id, version):
+        raise NotImplementedError
+
+    def save_section_edit(self, section_id, new_content, base_version, max_attempts=3):
+        return merge_section_edit(
+            self.update_section_content, self.get_section_content_at_version,
+            section_id, new_content, base_version, max_attempts
+        )
+
+    @abstractmethod
+    def apply_edits(self, edits, expected_versions=None):
+        """Save {section id: content} in one transaction; returns {section id: new version}."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def approve_sections(self, section_ids):
+        """Approve several sections in one transaction; returns the number updated."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def reject_sections(self, section_ids, comments=""):
+        raise NotImplementedError
+
+    def approve_section(self, section_id):
+        self.approve_sections([section_id])
+
+    def reject_section(self, section_id, comments=""):
+        self.reject_sections([section_id], comments)
+
+    @abstractmethod
+    def publish_module(self, module_id):
+        """Mark a module as published and compile its content pack."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_section_versions(self, section_id):
+        raise NotImplementedError
+
+    @abstractmethod
+    def iter_module_exports(self, module_ids=None, status=None, batch_size=500):
+        """Stream modules in the export layout (see utils.export)."""
+        raise NotImplementedError
+
+    def export_module_to_json(self, module_id):
+        module = self.get_module_by_id(module_id)
+        if not module:
+            return None
+        return {
+            'module_title': module['module_title'],
+            'sections': [
+                {
+                    'id': s['section_id'],
+                    'title': s['title'],
+                    'content': s['content'],
+                    'type': s['type'],
+                    'bloom_level': s['bloom_level'],
+                    'is_approved': s['is_approved'],
+                    'rejection_comments': s['rejection_comments']
+                }
+                for s in module['sections']
+            ]
+        }
+
+
+class SQLiteRepository(Repository):
+    """The modules.db backend: delegates to utils.database."""
+
+    init_schema = staticmethod(database.init_db)
+    get_module_by_id = staticmethod(database.get_module_by_id)
+    get_modules_by_ids = staticmethod(database.get_modules_by_ids)
+    get_sections_by_ids = staticmethod(database.get_sections_by_ids)
+    get_section_contents = staticmethod(database.get_section_contents)
+    get_all_modules = staticmethod(database.get_all_modules)
+    get_module_stats = staticmethod(database.get_module_stats)
+    get_labelled_sections = staticmethod(database.get_labelled_sections)
+    get_change_cursor = staticmethod(database.get_change_cursor)
+    changes_since = staticmethod(database.changes_since)
+    update_section_content = staticmethod(database.update_section_content)
+    get_section_content_at_version = staticmethod(database.get_section_content_at_version)
+    apply_edits = staticmethod(database.apply_edits)
+    approve_section = staticmethod(database.approve_section)
+    reject_section = staticmethod(database.reject_section)
+    approve_sections = staticmethod(database.approve_sections)
+    reject_sections = staticmethod(database.reject_sections)
+    publish_module = staticmethod(database.publish_module)
+    get_section_versions = staticmethod(database.get_section_versions)
+
+    def save_modules(self, modules):
+        with database.get_db_connection() as conn:
+            cursor = conn.cursor()
+            return [
+                database.insert_module(
+                    cursor, m['module_title'], m['sections'],
+                    m.get('status', 'draft'), m.get('approved', False)
+                )
+                for m in modules
+            ]
+
+    def iter_module_exports(self, module_ids=None, status=None, batch_size=500):
+        from utils.export import iter_module_exports
+        return iter_module_exports(module_ids, status, batch_size)
+
+
+# PostgreSQL schema: same tables and columns as init_db(). Timestamps default
+# to UTC and approval flags are 0/1 so rows look the same on both backends.
+POSTGRES_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS modules (
+        id BIGINT GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+        module_title TEXT NOT NULL,
+        created_at TIMESTAMP DEFAULT (now() AT TIME ZONE 'utc'),
+        updated_at TIMESTAMP DEFAULT (now() AT TIME ZONE 'utc'),
+        status TEXT DEFAULT 'draft'
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS sections (
+        id BIGINT GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+        module_id BIGINT NOT NULL REFERENCES modules(id) ON DELETE CASCADE,
+        section_id TEXT NOT NULL,
+        title TEXT NOT NULL,
+        content TEXT NOT NULL,
+        type TEXT NOT NULL,
+        bloom_level TEXT,
+        version INTEGER NOT NULL DEFAULT 1,
+        created_at TIMESTAMP DEFAULT (now() AT TIME ZONE 'utc'),
+        updated_at TIMESTAMP DEFAULT (now() AT TIME ZONE 'utc'),
+        UNIQUE (module_id, section_id)
+    )
+    """,
+    # Content quality scores (utils.quality)
+    """
+    ALTER TABLE sections
+        ADD COLUMN IF NOT EXISTS quality_score REAL,
+        ADD COLUMN IF NOT EXISTS readability_score REAL,
+        ADD COLUMN IF NOT EXISTS length_score REAL,
+        ADD COLUMN IF NOT EXISTS coverage_score REAL
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_sections_quality ON sections(quality_score)",
+    """
+    CREATE TABLE IF NOT EXISTS approvals (
+        id BIGINT GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+        section_id BIGINT NOT NULL UNIQUE REFERENCES sections(id) ON DELETE CASCADE,
+        is_approved SMALLINT DEFAULT 0,
+        is_rejected SMALLINT DEFAULT 0,
+        rejection_comments TEXT,
+        approved_at TIMESTAMP,
+        rejected_at TIMESTAMP
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS versions (
+        id BIGINT GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+        section_id BIGINT NOT NULL REFERENCES sections(id) ON DELETE CASCADE,
+        original_content TEXT NOT NULL,
+        edited_content TEXT NOT NULL,
+        version INTEGER,
+        created_at TIMESTAMP DEFAULT (now() AT TIME ZONE 'utc')
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_versions_section ON versions(section_id, version)",
+    """
+    CREATE TABLE IF NOT EXISTS changes (
+        id BIGINT GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+        table_name TEXT NOT NULL,
+        row_id BIGINT NOT NULL,
+        module_id BIGINT,
+        op TEXT NOT NULL,
+        changed_at TIMESTAMP DEFAULT (now() AT TIME ZONE 'utc')
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_changes_module ON changes(module_id, id)",
+    """
+    CREATE OR REPLACE FUNCTION log_change() RETURNS trigger AS $$
+    DECLARE
+        r RECORD;
+        changed_row BIGINT;
+        changed_module BIGINT;
+    BEGIN
+        IF TG_OP = 'DELETE' THEN r := OLD; ELSE r := NEW; END IF;
+        IF TG_TABLE_NAME = 'modules' THEN
+            changed_row := r.id; changed_module := r.id;
+        ELSIF TG_TABLE_NAME = 'sections' THEN
+            changed_row := r.id; changed_module := r.module_id;
+        ELSE
+            changed_row := r.section_id;
+            SELECT module_id INTO changed_module FROM sections WHERE id = r.section_id;
+        END IF;
+        INSERT INTO changes (table_name, row_id, module_id, op)
+        VALUES (TG_TABLE_NAME, changed_row, changed_module, lower(TG_OP));
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+] + [
+    f"""
+    DO $$ BEGIN
+        IF NOT EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = 'trg_{table}_changes') THEN
+            CREATE TRIGGER trg_{table}_changes AFTER INSERT OR UPDATE OR DELETE ON {table}
+            FOR EACH ROW EXECUTE FUNCTION log_change();
+        END IF;
+    END $$
+    """
+    for table in ("modules", "sections", "approvals")
+]
+
+SECTION_OUTLINE_COLUMNS = f"{database.SECTION_OUTLINE_COLUMNS}, a.is_approved, a.is_rejected, a.rejection_comments"
+SECTION_COLUMNS = f"{SECTION_OUTLINE_COLUMNS}, s.content"
+
+# A gap in change ids is an uncommitted (or rolled back) writer; readers wait
+# this long for it before moving past
+CHANGE_GAP_SECONDS = 10
+
+
+def _plain(row):
+    """Dict row with timestamps formatted like SQLite's CURRENT_TIMESTAMP."""
+    return {
+        key: value.strftime("%Y-%m-%d %H:%M:%S") if isinstance(value, datetime) else value
+        for key, value in row.items()
+    }
+
+
+class PostgresRepository(Repository):
+    """PostgreSQL backend for running several app nodes against one database.
+
+    Uses a thread-safe connection pool (callers wait for a free connection),
+    row locks instead of SQLite's whole-file write lock, RETURNING for bulk
+    inserts and server-side cursors for streaming exports. Requires psycopg2.
+    """
+
+    def __init__(self, dsn=None, pool_size=DB_POOL_SIZE):
+        import psycopg2.extras
+        import psycopg2.pool
+
+        self._extras = psycopg2.extras
+        self.dsn = dsn or DATABASE_URL
+        if not self.dsn:
+            raise ValueError("PostgresRepository needs a DSN (set DATABASE_URL)")
+        self.pool = psycopg2.pool.ThreadedConnectionPool(1, pool_size, self.dsn)
+        self._slots = threading.BoundedSemaphore(pool_size)
+
+    def close(self):
+        self.pool.closeall()
+
+    @contextmanager
+    def connection(self):
+        """Pooled connection; commits on success and rolls back on error."""
+        with self._slots:
+            conn = self.pool.getconn()
+            try:
+                yield conn
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                self.pool.putconn(conn)
+
+    @contextmanager
+    def _cursor(self):
+        with self.connection() as conn:
+            with conn.cursor(cursor_factory=self._extras.RealDictCursor) as cursor:
+                yield cursor
+
+    def init_schema(self):
+        with self._cursor() as cursor:
+            # Serialize concurrent migrations from several nodes
+            cursor.execute("SELECT pg_advisory_xact_lock(hashtext('modules_schema'))")
+            for statement in POSTGRES_SCHEMA:
+                cursor.execute(statement)
+
+    def save_modules(self, modules):
+        ids = []
+        with self._cursor() as cursor:
+            for module in modules:
+                approved = 1 if module.get('approved') else 0
+                cursor.execute(
+                    "INSERT INTO modules (module_title, status) VALUES (%s, %s) RETURNING id",
+                    (module['module_title'], module.get('status', 'draft'))
+                )
+                module_id = cursor.fetchone()['id']
+                from utils.quality import score_sections
+                scores = score_sections([s['content'] for s in module['sections']],
+                                        [s['type'] for s in module['sections']])
+                section_ids = self._extras.execute_values(cursor, """
+                    INSERT INTO sections (module_id, section_id, title, content, type, bloom_level,
+                                          quality_score, readability_score, length_score, coverage_score)
+                    VALUES %s RETURNING id
+                """, [
+                    (module_id, s['id'], s['title'], s['content'], s['type'], s.get('bloom_level')) + score
+                    for s, score in zip(module['sections'], scores)
+                ], fetch=True)
+                approved_at = "now() AT TIME ZONE 'utc'" if approved else "NULL"
+                self._extras.execute_values(cursor, """
+                    INSERT INTO approvals (section_id, is_approved, is_rejected, approved_at) VALUES %s
+                """, [(row['id'], approved) for row in section_ids], template=f"(%s, %s, 0, {approved_at})")
+                ids.append(module_id)
+        return ids
+
+    def get_module_by_id(self, module_id, include_content=True):
+        columns = SECTION_COLUMNS if include_content else SECTION_OUTLINE_COLUMNS
+        with self._cursor() as cursor:
+            cursor.execute(
+                "SELECT id, module_title, created_at, updated_at, status FROM modules WHERE id = %s",
+                (module_id,)
+            )
+            module = cursor.fetchone()
+            if not module:
+                return None
+            cursor.execute(f"""
+                SELECT {columns}
+                FROM sections s
+                LEFT JOIN approvals a ON s.id = a.section_id
+                WHERE s.module_id = %s
+                ORDER BY s.id
+            """, (module_id,))
+            module = _plain(module)
+            module['sections'] = [_plain(s) for s in cursor.fetchall()]
+            return module
+
+    def get_modules_by_ids(self, module_ids):
+        if not module_ids:
+            return []
+        with self._cursor() as cursor:
+            cursor.execute("""
+                SELECT id, module_title, created_at, updated_at, status
+                FROM modules WHERE id = ANY(%s)
+            """, (list(module_ids),))
+            return [_plain(m) for m in cursor.fetchall()]
+
+    def get_sections_by_ids(self, section_ids, include_content=True):
+        if not section_ids:
+            return []
+        columns = SECTION_COLUMNS if include_content else SECTION_OUTLINE_COLUMNS
+        with self._cursor() as cursor:
+            cursor.execute(f"""
+                SELECT {columns}
+                FROM sections s
+                LEFT JOIN approvals a ON s.id = a.section_id
+                WHERE s.id = ANY(%s)
+                ORDER BY s.id
+            """, (list(section_ids),))
+            return [_plain(s) for s in cursor.fetchall()]
+
+    def get_section_contents(self, section_ids):
+        if not section_ids:
+            return {}
+        with self._cursor() as cursor:
+            cursor.execute(
+                "SELECT id, version, content FROM sections WHERE id = ANY(%s)", (list(section_ids),)
+            )
+            return {row['id']: (row['version'], row['content']) for row in cursor.fetchall()}
+
+    def get_all_modules(self):
+        with self._cursor() as cursor:
+            cursor.execute("""
+                SELECT id, module_title, created_at, updated_at, status
+                FROM modules
+                ORDER BY created_at DESC, id DESC
+            """)
+            return [_plain(m) for m in cursor.fetchall()]
+
+    def get_labelled_sections(self, limit=1000):
+        with self._cursor() as cursor:
+            cursor.execute("""
+                SELECT s.title, s.content, s.bloom_level
+                FROM sections s
+                JOIN approvals a ON a.section_id = s.id
+                WHERE a.is_approved = 1 AND s.bloom_level IS NOT NULL AND s.bloom_level != ''
+                ORDER BY s.updated_at DESC, s.id DESC
+                LIMIT %s
+            """, (limit,))
+            return [dict(row) for row in cursor.fetchall()]
+
+    def get_module_stats(self, module_id):
+        with self._cursor() as cursor:
+            cursor.execute("""
+                SELECT
+                    COUNT(*) AS total_sections,
+                    COALESCE(SUM(CASE WHEN is_approved = 1 THEN 1 ELSE 0 END), 0) AS approved_count,
+                    COALESCE(SUM(CASE WHEN is_rejected = 1 THEN 1 ELSE 0 END), 0) AS rejected_count
+                FROM sections s
+                LEFT JOIN approvals a ON s.id = a.section_id
+                WHERE s.module_id = %s
+            """, (module_id,))
+            stats = {key: int(value) for key, value in cursor.fetchone().items()}
+            stats['pending_count'] = stats['total_sections'] - stats['approved_count'] - stats['rejected_count']
+            return stats
+
+    def _contiguous_changes(self, cursor, after, scan):
+        """Change rows after `after`, stopping at an id gap a live writer may still fill.
+
+        Identity values are handed out at insert time but become visible at
+        commit, so a higher id can show up before a lower one.
+        """
+        cursor.execute("""
+            SELECT id, table_name, row_id, module_id, op, changed_at,
+                   EXTRACT(EPOCH FROM (now() AT TIME ZONE 'utc') - changed_at) AS age
+            FROM changes
+            WHERE id > %s
+            ORDER BY id
+            LIMIT %s
+        """, (after, scan))
+        expected = after + 1
+        for row in cursor.fetchall():
+            if row['id'] != expected and row['age'] < CHANGE_GAP_SECONDS:
+                return
+            expected = row['id'] + 1
+            yield row
+
+    def get_change_cursor(self):
+        with self._cursor() as cursor:
+            cursor.execute("SELECT COALESCE(MAX(id), 0) AS head FROM changes")
+            # Start a little behind the head so a still-open writer below it is not skipped
+            start = max(0, cursor.fetchone()['head'] - 1000)
+            head = start
+            for row in self._contiguous_changes(cursor, start, 1000):
+                head = row['id']
+            return head
+
+    def changes_since(self, change_cursor, module_id=None, limit=1000):
+        with self._cursor() as cursor:
+            changes = []
+            head = change_cursor
+            for row in self._contiguous_changes(cursor, change_cursor, max(limit, 1000)):
+                head = row['id']
+                if module_id is None or row['module_id'] == module_id:
+                    row.pop('age')
+                    changes.append(_plain(row))
+                    if len(changes) == limit:
+                        break
+            return changes, head
+
+    def update_section_content(self, section_id, new_content, expected_version=None):
+        with self._cursor() as cursor:
+            # Row lock: concurrent writers on other nodes queue here instead of racing
+            cursor.execute("SELECT content, version, type FROM sections WHERE id = %s FOR UPDATE", (section_id,))
+            current = cursor.fetchone()
+            if not current:
+                return None
+            if expected_version is not None and expected_version != current['version']:
+                raise StaleSectionError(section_id, expected_version, current['version'], current['content'])
+            from utils.quality import score_sections
+            scores = score_sections([new_content], [current['type']])[0]
+            cursor.execute("""
+                UPDATE sections
+                SET content = %s, version = version + 1, updated_at = now() AT TIME ZONE 'utc',
+                    quality_score = %s, readability_score = %s, length_score = %s, coverage_score = %s
+                WHERE id = %s
+                RETURNING version
+            """, (new_content, *scores, section_id))
+            version = cursor.fetchone()['version']
+            cursor.execute("""
+                INSERT INTO versions (section_id, original_content, edited_content, version)
+                VALUES (%s, %s, %s, %s)
+            """, (section_id, current['content'], new_content, version))
+            return version
+
+    def get_section_content_at_version(self, section_id, version):
+        with self._cursor() as cursor:
+            cursor.execute("SELECT content, version FROM sections WHERE id = %s", (section_id,))
+            current = cursor.fetchone()
+            if not current:
+                return None
+            if current['version'] == version:
+                return current['content']
+            # The edit that produced this version, or else the one that replaced it
+            cursor.execute("""
+                SELECT content FROM (
+                    SELECT 0 AS preference, edited_content AS content
+                    FROM versions WHERE section_id = %s AND version = %s
+                    UNION ALL
+                    SELECT 1, original_content
+                    FROM versions WHERE section_id = %s AND version = %s
+                ) candidates
+                ORDER BY preference
+                LIMIT 1
+            """, (section_id, version, section_id, version + 1))
+            row = cursor.fetchone()
+            return row['content'] if row else None
+
+    def apply_edits(self, edits, expected_versions=None):
+        if not edits:
+            return {}
+        expected_versions = expected_versions or {}
+        with self._cursor() as cursor:
+            # Lock the rows (in id order, so two bulk edits cannot deadlock)
+            cursor.execute("""
+                SELECT id, content, version, type FROM sections
+                WHERE id = ANY(%s) ORDER BY id FOR UPDATE
+            """, (list(edits),))
+            current = {row['id']: row for row in cursor.fetchall()}
+            for section_id, row in current.items():
+                expected = expected_versions.get(section_id)
+                if expected is not None and expected != row['version']:
+                    raise StaleSectionError(section_id, expected, row['version'], row['content'])
+            ids = [section_id for section_id in edits if section_id in current]
+            if not ids:
+                return {}
+            from utils.quality import score_sections
+            scores = score_sections([edits[i] for i in ids], [current[i]['type'] for i in ids])
+            updated = self._extras.execute_values(cursor, """
+                UPDATE sections s
+                SET content = v.content, version = s.version + 1, updated_at = now() AT TIME ZONE 'utc',
+                    quality_score = v.quality_score, readability_score = v.readability_score,
+                    length_score = v.length_score, coverage_score = v.coverage_score
+                FROM (VALUES %s) AS v(id, content, quality_score, readability_score, length_score, coverage_score)
+                WHERE s.id = v.id
+                RETURNING s.id, s.version
+            """, [(i, edits[i], *score) for i, score in zip(ids, scores)], fetch=True)
+            versions = {row['id']: row['version'] for row in updated}
+            self._extras.execute_values(cursor, """
+                INSERT INTO versions (section_id, original_content, edited_content, version) VALUES %s
+            """, [(i, current[i]['content'], edits[i], versions[i]) for i in ids])
+            return versions
+
+    def approve_sections(self, section_ids):
+        with self._cursor() as cursor:
+            cursor.execute("""
+                UPDATE approvals
+                SET is_approved = 1, is_rejected = 0, approved_at = now() AT TIME ZONE 'utc'
+                WHERE section_id = ANY(%s)
+            """, (list(section_ids),))
+            return cursor.rowcount
+
+    def reject_sections(self, section_ids, comments=""):
+        with self._cursor() as cursor:
+            cursor.execute("""
+                UPDATE approvals
+                SET is_rejected = 1, is_approved = 0, rejection_comments = %s,
+                    rejected_at = now() AT TIME ZONE 'utc'
+                WHERE section_id = ANY(%s)
+            """, (comments, list(section_ids)))
+            return cursor.rowcount
+
+    def publish_module(self, module_id):
+        # Pack first, as in database.publish_module
+        module = self.get_module_by_id(module_id)
+        if not module:
+            return
+        path = build_pack(module)
+        try:
+            with self._cursor() as cursor:
+                cursor.execute("""
+                    UPDATE modules
+                    SET status = 'published', updated_at = now() AT TIME ZONE 'utc'
+                    WHERE id = %s
+                """, (module_id,))
+                if cursor.rowcount == 0:
+                    raise LookupError(f"Module {module_id} was deleted while publishing")
+        except Exception:
+            if module['status'] != 'published':
+                os.remove(path)
+            raise
+
+    def get_section_versions(self, section_id):
+        with self._cursor() as cursor:
+            cursor.execute("""
+                SELECT id, original_content, edited_content, created_at
+                FROM versions
+                WHERE section_id = %s
+                ORDER BY created_at DESC, id DESC
+            """, (section_id,))
+            return [_plain(v) for v in cursor.fetchall()]
+
+    def iter_module_exports(self, module_ids=None, status=None, batch_size=500):
+        conditions = []
+        params = []
+        if module_ids:
+            conditions.append("m.id = ANY(%s)")
+            params.append(list(module_ids))
+        if status:
+            conditions.append("m.status = %s")
+            params.append(status)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        with self.connection() as conn:
+            # Named cursor: rows stay on the server and arrive batch_size at a time
+            cursor = conn.cursor(name=f"export_{uuid.uuid4().hex}", cursor_factory=self._extras.RealDictCursor)
+            cursor.itersize = batch_size
+            cursor.execute(f"""
+                SELECT m.id AS module_id, m.module_title, m.status, m.created_at, m.updated_at,
+                       s.id AS section_db_id, s.section_id, s.title, s.content, s.type,
+                       s.bloom_level, a.is_approved, a.rejection_comments
+                FROM modules m
+                LEFT JOIN sections s ON s.module_id = m.id
+                LEFT JOIN approvals a ON a.section_id = s.id
+                {where}
+                ORDER BY m.id, s.id
+            """, params)
+            module = None
+            for row in cursor:
+                row = _plain(row)
+                if module is None or module['id'] != row['module_id']:
+                    if module is not None:
+                        yield module
+                    module = {
+                        'id': row['module_id'],
+                        'module_title': row['module_title'],
+                        'status': row['status'],
+                        'created_at': row['created_at'],
+                        'updated_at': row['updated_at'],
+                        'sections': []
+                    }
+                if row['section_db_id'] is not None:
+                    module['sections'].append({
+                        'id': row['section_id'],
+                        'title': row['title'],
+                        'content': row['content'],
+                        'type': row['type'],
+                        'bloom_level': row['bloom_level'],
+                        'is_approved': row['is_approved'],
+                        'rejection_comments': row['rejection_comments']
+                    })
+            cursor.close()
+            if module is not None:
+                yield module
+
+
+def create_repository(backend=None, dsn=None):
+    """Create the configured storage backend."""
+    backend = backend or STORAGE_BACKEND
+    if backend == "sqlite":
+        return SQLiteRepository()
+    if backend == "postgres":
+        return PostgresRepository(dsn)
+    raise ValueError(f"Unknown storage backend: {backend}")
@@ -0,0 +1,415 @@
+import argparse
+import os
+import sys
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+# Allow running as `python utils/review_log.py` as well as `python -m utils.review_log`
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from utils.database import get_db_connection, register_schema
+
+# Reviewer actions and the metrics column each one counts towards
+ACTION_COLUMNS = {
+    'view': 'views',
+    'edit': 'edits',
+    'accept': 'accepts',
+    'reject': 'rejects',
+    'regenerate': 'regenerations',
+    'publish': 'publishes',
+}
+# Actions that concern one section (the others concern the whole module)
+SECTION_ACTIONS = ('edit', 'accept', 'reject', 'regenerate')
+# A reviewer idle on a module for longer than this starts a new review session
+REVIEW_SESSION_GAP_SECONDS = int(os.getenv("REVIEW_SESSION_GAP_SECONDS", "1800"))
+# Events read per query while rebuilding the metrics
+REBUILD_BATCH_SIZE = 5000
+
+MODULE_COUNTERS = ('events', *ACTION_COLUMNS.values(), 'sessions', 'reviewers', 'approved_sections')
+SECTION_COUNTERS = tuple(ACTION_COLUMNS[action] for action in SECTION_ACTIONS)
+
+
+def review_event(action, module_id, section_id=None, reviewer=None):
+    """An event dict for ReviewLog.record(), stamped with the current UTC time."""
+    if action not in ACTION_COLUMNS:
+        raise ValueError(f"Unknown review action: {action}")
+    return {
+        'action': action,
+        'module_id': module_id,
+        'section_id': section_id,
+        'reviewer': reviewer,
+        'created_at': datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S.%f")[:-3],
+    }
+
+
+def _parse(value):
+    if value is None or isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(value)
+
+
+def _fold(events, modules, sections, activity):
+    """Apply events, in log order, to the loaded metric rows (changed in place).
+
+    modules: {module_id: row}, sections: {section_id: row},
+    activity: {(module_id, reviewer): row}; missing rows are created.
+    """
+    for event in events:
+        at = _parse(event['created_at'])
+        column = ACTION_COLUMNS[event['action']]
+        module = modules.get(event['module_id'])
+        if module is None:
+            module = modules[event['module_id']] = dict(
+                {name: 0 for name in MODULE_COUNTERS},
+                approval_seconds=0.0, first_event_at=None, last_event_at=None,
+            )
+        module['events'] += 1
+        module[column] += 1
+        module['first_event_at'] = min(module['first_event_at'] or at, at)
+        module['last_event_at'] = max(module['last_event_at'] or at, at)
+
+        if event['reviewer']:
+            key = (event['module_id'], event['reviewer'])
+            seen = activity.get(key)
+            if seen is None:
+                seen = activity[key] = {'sessions': 0, 'last_event_at': None}
+                module['reviewers'] += 1
+            if seen['last_event_at'] is None or (at - seen['last_event_at']).total_seconds() > REVIEW_SESSION_GAP_SECONDS:
+                seen['sessions'] += 1
+                module['sessions'] += 1
+            seen['last_event_at'] = max(seen['last_event_at'] or at, at)
+
+        if event['section_id'] is None or event['action'] not in SECTION_ACTIONS:
+            continue
+        section = sections.get(event['section_id'])
+        if section is None:
+            section = sections[event['section_id']] = dict(
+                {name: 0 for name in SECTION_COUNTERS},
+                module_id=event['module_id'], first_event_at=None, approved_at=None, time_to_approval=None,
+            )
+        section[column] += 1
+        section['first_event_at'] = min(section['first_event_at'] or at, at)
+        if event['action'] == 'accept' and section['approved_at'] is None:
+            # Measured from when reviewers first opened the module
+            section['approved_at'] = at
+            section['time_to_approval'] = max(0.0, (at - module['first_event_at']).total_seconds())
+            module['approved_sections'] += 1
+            module['approval_seconds'] += section['time_to_approval']
+
+
+def _with_rates(row):
+    """Module metrics row plus average time to approval and regenerations per approval."""
+    row = dict(row)
+    approved = row['approved_sections']
+    row['avg_time_to_approval'] = row['approval_seconds'] / approved if approved else None
+    row['regenerations_per_approval'] = row['regenerations'] / approved if approved else None
+    return row
+
+
+class ReviewLog(ABC):
+    """Append-only log of reviewer actions plus metrics kept current from it.
+
+    record() appends a batch of events and folds them into per-module,
+    per-section and per-reviewer metrics in the same transaction, so the
+    dashboard reads small precomputed tables instead of scanning the log.
+    rebuild() recomputes the metrics from the whole log.
+
+    Backends provide _transaction() (a cursor holding the metrics lock),
+    _q() for placeholders and _ts() for timestamps going into the database.
+    """
+
+    @abstractmethod
+    def _transaction(self):
+        raise NotImplementedError
+
+    def _q(self, sql):
+        return sql
+
+    def _ts(self, value):
+        return value
+
+    def record(self, events):
+        """Append events (see review_event) and update the metrics; returns the number written."""
+        if not events:
+            return 0
+        with self._transaction() as cursor:
+            cursor.executemany(self._q("""
+                INSERT INTO review_events (module_id, section_id, action, reviewer, created_at)
+                VALUES (?, ?, ?, ?, ?)
+            """), [
+                (e['module_id'], e['section_id'], e['action'], e['reviewer'], self._ts(_parse(e['created_at'])))
+                for e in events
+            ])
+            self._apply(cursor, events)
+        return len(events)
+
+    def rebuild(self):
+        """Recompute every metric from the event log; returns the number of events replayed."""
+        with self._transaction() as cursor:
+            for table in ("module_review_metrics", "section_review_metrics", "review_activity"):
+                cursor.execute(f"DELETE FROM {table}")
+            modules, sections, activity = {}, {}, {}
+            cursor.execute("SELECT module_id, section_id, action, reviewer, created_at FROM review_events ORDER BY id")
+            replayed = 0
+            while True:
+                rows = cursor.fetchmany(REBUILD_BATCH_SIZE)
+                if not rows:
+                    break
+                _fold([dict(row) for row in rows], modules, sections, activity)
+                replayed += len(rows)
+            self._write(cursor, modules, sections, activity)
+        return replayed
+
+    def _apply(self, cursor, events):
+        module_ids = sorted({e['module_id'] for e in events})
+        section_ids = sorted({e['section_id'] for e in events if e['section_id'] is not None})
+        modules = self._load(cursor, "module_review_metrics", "module_id", module_ids)
+        sections = self._load(cursor, "section_review_metrics", "section_id", section_ids)
+        activity = {
+            (row['module_id'], row['reviewer']): row
+            for row in self._load(cursor, "review_activity", "module_id", module_ids, keyed=False)
+        }
+        for rows in (modules.values(), sections.values(), activity.values()):
+            for row in rows:
+                for name in ('first_event_at', 'last_event_at', 'approved_at'):
+                    if name in row:
+                        row[name] = _parse(row[name])
+        _fold(events, modules, sections, activity)
+        self._write(cursor, modules, sections, activity)
+
+    def _load(self, cursor, table, key, ids, keyed=True):
+        if not ids:
+            return {} if keyed else []
+        cursor.execute(self._q(f"SELECT * FROM {table} WHERE {key} IN ({','.join('?' * len(ids))})"), ids)
+        rows = [dict(row) for row in cursor.fetchall()]
+        return {row[key]: row for row in rows} if keyed else rows
+
+    def _write(self, cursor, modules, sections, activity):
+        module_columns = (*MODULE_COUNTERS, 'approval_seconds', 'first_event_at', 'last_event_at')
+        self._upsert(cursor, "module_review_metrics", ('module_id',), module_columns, [
+            (module_id, *(self._ts(row[c]) if c.endswith('_at') else row[c] for c in module_columns))
+            for module_id, row in modules.items()
+        ])
+        section_columns = ('module_id', *SECTION_COUNTERS, 'first_event_at', 'approved_at', 'time_to_approval')
+        self._upsert(cursor, "section_review_metrics", ('section_id',), section_columns, [
+            (section_id, *(self._ts(row[c]) if c.endswith('_at') else row[c] for c in section_columns))
+            for section_id, row in sections.items()
+        ])
+        self._upsert(cursor, "review_activity", ('module_id', 'reviewer'), ('sessions', 'last_event_at'), [
+            (module_id, reviewer, row['sessions'], self._ts(row['last_event_at']))
+            for (module_id, reviewer), row in activity.items()
+        ])
+
+    def _upsert(self, cursor, table, keys, columns, rows):
+        if not rows:
+            return
+        names = (*keys, *columns)
+        cursor.executemany(self._q(f"""
+            INSERT INTO {table} ({', '.join(names)}) VALUES ({', '.join('?' * len(names))})
+            ON CONFLICT ({', '.join(keys)})
+            DO UPDATE SET {', '.join(f'{c} = excluded.{c}' for c in columns)}
+        """), rows)
+
+    def module_metrics(self, module_ids=None, limit=50):
+        """Metrics of the given (or most recently reviewed) modules, newest activity first."""
+        with self._transaction(lock=False) as cursor:
+            if module_ids is None:
+                cursor.execute(self._q(
+                    "SELECT * FROM module_review_metrics ORDER BY last_event_at DESC LIMIT ?"
+                ), (limit,))
+                rows = cursor.fetchall()
+            else:
+                rows = self._load(cursor, "module_review_metrics", "module_id", list(module_ids)).values()
+            return [_with_rates(row) for row in rows]
+
+    def section_metrics(self, module_id):
+        """Per-section counts and time to approval (seconds) for one module."""
+        with self._transaction(lock=False) as cursor:
+            cursor.execute(self._q(
+                "SELECT * FROM section_review_metrics WHERE module_id = ? ORDER BY section_id"
+            ), (module_id,))
+            return [dict(row) for row in cursor.fetchall()]
+
+    def summary(self):
+        """Totals across modules: approvals, median and mean time to approval (s),
+        regenerations per approval and review sessions per module."""
+        with self._transaction(lock=False) as cursor:
+            cursor.execute("""
+                SELECT COUNT(*) AS modules, COALESCE(SUM(events), 0) AS events,
+                       COALESCE(SUM(approved_sections), 0) AS approved_sections,
+                       COALESCE(SUM(approval_seconds), 0) AS approval_seconds,
+                       COALESCE(SUM(regenerations), 0) AS regenerations,
+                       COALESCE(SUM(sessions), 0) AS sessions
+                FROM module_review_metrics
+            """)
+            totals = _with_rates(cursor.fetchone())
+            approved = totals['approved_sections']
+            totals['median_time_to_approval'] = None
+            if approved:
+                cursor.execute(self._q("""
+                    SELECT time_to_approval FROM section_review_metrics
+                    WHERE time_to_approval IS NOT NULL ORDER BY time_to_approval LIMIT 1 OFFSET ?
+                """), (approved // 2,))
+                row = cursor.fetchone()
+                totals['median_time_to_approval'] = row['time_to_approval'] if row else None
+            totals['sessions_per_module'] = totals['sessions'] / totals['modules'] if totals['modules'] else None
+            return totals
+
+
+def create_review_tables(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS review_events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            module_id INTEGER NOT NULL,
+            section_id INTEGER,
+            action TEXT NOT NULL,
+            reviewer TEXT,
+            created_at TIMESTAMP NOT NULL
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_review_events_module ON review_events(module_id, id)")
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS module_review_metrics (
+            module_id INTEGER PRIMARY KEY,
+            {', '.join(f'{c} INTEGER NOT NULL DEFAULT 0' for c in MODULE_COUNTERS)},
+            approval_seconds REAL NOT NULL DEFAULT 0,
+            first_event_at TIMESTAMP,
+            last_event_at TIMESTAMP
+        )
+    """)
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS section_review_metrics (
+            section_id INTEGER PRIMARY KEY,
+            module_id INTEGER NOT NULL,
+            {', '.join(f'{c} INTEGER NOT NULL DEFAULT 0' for c in SECTION_COUNTERS)},
+            first_event_at TIMESTAMP,
+            approved_at TIMESTAMP,
+            time_to_approval REAL
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_section_review_module ON section_review_metrics(module_id)")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS review_activity (
+            module_id INTEGER NOT NULL,
+            reviewer TEXT NOT NULL,
+            sessions INTEGER NOT NULL DEFAULT 0,
+            last_event_at TIMESTAMP,
+            PRIMARY KEY (module_id, reviewer)
+        )
+    """)
+
+
+class SQLiteReviewLog(ReviewLog):
+    """Review log in modules.db (each workspace shard keeps its own)."""
+
+    def __init__(self):
+        register_schema(create_review_tables)
+
+    @contextmanager
+    def _transaction(self, lock=True):
+        with get_db_connection() as conn:
+            if lock and not conn.in_transaction:
+                # Take the write lock before reading the metrics that get rewritten
+                conn.execute("BEGIN IMMEDIATE")
+            yield conn.cursor()
+
+    def _ts(self, value):
+        return value.strftime("%Y-%m-%d %H:%M:%S.%f")[:-3] if value is not None else None
+
+
+class PostgresReviewLog(ReviewLog):
+    """Review log in the PostgreSQL database of a PostgresRepository."""
+
+    def __init__(self, repository):
+        self.repository = repository
+        with repository.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS review_events (
+                    id BIGINT GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
+                    module_id BIGINT NOT NULL,
+                    section_id BIGINT,
+                    action TEXT NOT NULL,
+                    reviewer TEXT,
+                    created_at TIMESTAMP NOT NULL
+                )
+            """)
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_review_events_module ON review_events(module_id, id)")
+            cursor.execute(f"""
+                CREATE TABLE IF NOT EXISTS module_review_metrics (
+                    module_id BIGINT PRIMARY KEY,
+                    {', '.join(f'{c} INTEGER NOT NULL DEFAULT 0' for c in MODULE_COUNTERS)},
+                    approval_seconds DOUBLE PRECISION NOT NULL DEFAULT 0,
+                    first_event_at TIMESTAMP,
+                    last_event_at TIMESTAMP
+                )
+            """)
+            cursor.execute(f"""
+                CREATE TABLE IF NOT EXISTS section_review_metrics (
+                    section_id BIGINT PRIMARY KEY,
+                    module_id BIGINT NOT NULL,
+                    {', '.join(f'{c} INTEGER NOT NULL DEFAULT 0' for c in SECTION_COUNTERS)},
+                    first_event_at TIMESTAMP,
+                    approved_at TIMESTAMP,
+                    time_to_approval DOUBLE PRECISION
+                )
+            """)
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_section_review_module ON section_review_metrics(module_id)")
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS review_activity (
+                    module_id BIGINT NOT NULL,
+                    reviewer TEXT NOT NULL,
+                    sessions INTEGER NOT NULL DEFAULT 0,
+                    last_event_at TIMESTAMP,
+                    PRIMARY KEY (module_id, reviewer)
+                )
+            """)
+
+    @contextmanager
+    def _transaction(self, lock=True):
+        with self.repository._cursor() as cursor:
+            if lock:
+                cursor.execute("SELECT pg_advisory_xact_lock(hashtext('review_metrics'))")
+            yield cursor
+
+    def _q(self, sql):
+        return sql.replace("?", "%s")
+
+
+def create_review_log(repository=None):
+    """Review log living in the same database as the repository."""
+    if repository is not None and hasattr(repository, "connection"):
+        return PostgresReviewLog(repository)
+    return SQLiteReviewLog()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Reviewer throughput metrics from the review event log")
+    parser.add_argument("--rebuild", action="store_true", help="Recompute the metrics from the whole event log")
+    parser.add_argument("--modules", type=int, default=20, metavar="N", help="Show the N most recently reviewed modules")
+    args = parser.parse_args(argv)
+
+    log = create_review_log()
+    if args.rebuild:
+        print(f"Replayed {log.rebuild()} events")
+    totals = log.summary()
+    print(f"{totals['events']} events on {totals['modules']} modules, {totals['approved_sections']} sections approved")
+    for label, value in (("median time to approval", totals['median_time_to_approval']),
+                         ("mean time to approval", totals['avg_time_to_approval'])):
+        print(f"  {label}: {'-' if value is None else f'{value / 60:.1f} min'}")
+    rate = totals['regenerations_per_approval']
+    print(f"  regenerations per approval: {'-' if rate is None else f'{rate:.2f}'}")
+    per_module = totals['sessions_per_module']
+    print(f"  review sessions per module: {'-' if per_module is None else f'{per_module:.1f}'}")
+    for row in log.module_metrics(limit=args.modules):
+        print(f"  module {row['module_id']:>6}: {row['sessions']} sessions, {row['reviewers']} reviewers, "
+              f"{row['approved_sections']} approved, {row['regenerations']} regenerations, "
+              f"{row['edits']} edits, last activity {row['last_event_at']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,194 @@
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+
+# Allow running as `python utils/shards.py` as well as `python -m utils.shards`
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from utils import database
+from utils.content_pack import build_pack, pack_path
+from utils.database import (
+    DEFAULT_WORKSPACE, create_workspace, get_attached_connection, get_db_connection,
+    get_workspace_stats, list_workspaces, register_schema, use_workspace, workspace_db_path,
+)
+from utils.jobs import create_jobs_table
+from utils.review_log import create_review_tables
+from utils.state_store import create_app_state_table
+
+logger = logging.getLogger(__name__)
+
+# Modules moved per statement (keeps the IN lists well below SQLite's variable limit)
+BATCH_SIZE = 500
+
+# Tables that move with a module, parents first, and how their rows are picked
+_SECTION_ROWS = "section_id IN (SELECT id FROM main.sections WHERE module_id IN ({ids}))"
+MODULE_TABLES = (
+    ("modules", "id IN ({ids})"),
+    ("sections", "module_id IN ({ids})"),
+    ("approvals", _SECTION_ROWS),
+    ("versions", _SECTION_ROWS),
+    ("jobs", "module_id IN ({ids})"),
+    ("review_events", "module_id IN ({ids})"),
+    ("module_review_metrics", "module_id IN ({ids})"),
+    ("section_review_metrics", "module_id IN ({ids})"),
+    ("review_activity", "module_id IN ({ids})"),
+)
+# Append-only logs whose rows get new ids in the target (in their original order)
+RENUMBERED_TABLES = ("review_events",)
+
+
+class ShardConflictError(Exception):
+    """Raised when rows to be moved already exist (by id) in the target workspace."""
+
+
+def _columns(conn, schema, table):
+    return [row[1] for row in conn.execute(f"PRAGMA {schema}.table_info({table})").fetchall()]
+
+
+def _batches(module_ids):
+    for start in range(0, len(module_ids), BATCH_SIZE):
+        yield module_ids[start:start + BATCH_SIZE]
+
+
+def _state_filter(batch):
+    """app_state rows of the given modules (namespaces module:<id>:..., shared and per reviewer)."""
+    return " OR ".join("namespace LIKE ?" for _ in batch), [f"module:{module_id}:%" for module_id in batch]
+
+
+def split_workspace(workspace, module_ids, dry_run=False):
+    """Move modules (with their sections, approvals, versions, reviewer state,
+    jobs and review log) from the current workspace into another one, creating it if needed.
+
+    Ids are kept, so links and job references stay valid; a module whose id is
+    already taken in the target aborts the move before anything is changed.
+    Published modules get their content pack rebuilt in the target. Returns
+    {table: rows moved} (rows that would move, with dry_run).
+
+    The copy and the delete are one transaction, but in WAL mode SQLite only
+    makes it atomic per database file: after a crash mid-commit, rerunning
+    reports the already-copied modules as conflicts.
+
+    The change log follows the rows: the moved modules' history is pruned from
+    the source, leaving only the delete entries of the move itself (so open
+    views there drop the module), and the target logs their rows as inserted.
+    """
+    source = database.current_workspace()
+    if workspace == source:
+        raise ValueError(f"Modules are already in workspace {workspace!r}")
+    module_ids = sorted(set(module_ids))
+    for create_tables in (create_app_state_table, create_jobs_table, create_review_tables):
+        register_schema(create_tables)
+    if not dry_run:
+        create_workspace(workspace)
+    target = workspace_db_path(workspace)
+
+    report = {table: 0 for table, _ in MODULE_TABLES}
+    report['app_state'] = 0
+    published = []
+    with get_db_connection() if dry_run else get_attached_connection(target, "shard") as conn:
+        cursor = conn.cursor()
+        for batch in _batches(module_ids):
+            ids = ",".join("?" * len(batch))
+            cursor.execute(f"SELECT id FROM modules WHERE id IN ({ids}) AND status = 'published'", batch)
+            published += [row[0] for row in cursor.fetchall()]
+            for table, where in MODULE_TABLES:
+                where = where.format(ids=ids)
+                # Review metrics are keyed by the module/section ids checked above
+                if not dry_run and table not in RENUMBERED_TABLES and "id" in _columns(conn, "main", table):
+                    cursor.execute(f"""
+                        SELECT COUNT(*) FROM shard.{table}
+                        WHERE id IN (SELECT id FROM main.{table} WHERE {where})
+                    """, batch)
+                    taken = cursor.fetchone()[0]
+                    if taken:
+                        raise ShardConflictError(
+                            f"{taken} {table} row(s) already exist in workspace {workspace!r}"
+                        )
+                cursor.execute(f"SELECT COUNT(*) FROM main.{table} WHERE {where}", batch)
+                report[table] += cursor.fetchone()[0]
+            where, params = _state_filter(batch)
+            cursor.execute(f"SELECT COUNT(*) FROM main.app_state WHERE {where}", params)
+            report['app_state'] += cursor.fetchone()[0]
+        if dry_run:
+            return report
+
+        for batch in _batches(module_ids):
+            ids = ",".join("?" * len(batch))
+            state_where, state_params = _state_filter(batch)
+            moves = [(table, where.format(ids=ids), batch) for table, where in MODULE_TABLES]
+            moves.append(("app_state", state_where, state_params))
+            for table, where, params in moves:
+                target_columns = set(_columns(conn, "shard", table))
+                order = ""
+                if table in RENUMBERED_TABLES:
+                    target_columns.discard("id")
+                    order = "ORDER BY id"
+                columns = ", ".join(c for c in _columns(conn, "main", table) if c in target_columns)
+                cursor.execute(f"""
+                    INSERT INTO shard.{table} ({columns})
+                    SELECT {columns} FROM main.{table} WHERE {where} {order}
+                """, params)
+            cursor.execute(f"DELETE FROM main.changes WHERE module_id IN ({ids})", batch)
+            # Children first: their filters look up the parent sections
+            for table, where, params in reversed(moves):
+                cursor.execute(f"DELETE FROM main.{table} WHERE {where}", params)
+
+    for module_id in published:
+        with use_workspace(workspace):
+            build_pack(database.get_module_by_id(module_id))
+        try:
+            os.remove(pack_path(module_id))
+        except FileNotFoundError:
+            pass
+    logger.info("Moved %d module(s) from %s to %s", len(module_ids), source, workspace)
+    return report
+
+
+def split_database(mapping, dry_run=False):
+    """Run split_workspace for every {workspace: [module ids]} entry; returns {workspace: report}."""
+    return {
+        workspace: split_workspace(workspace, module_ids, dry_run)
+        for workspace, module_ids in mapping.items()
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Create workspaces and split modules.db into per-workspace shards")
+    parser.add_argument("--list", action="store_true", help="List workspaces with their module counts")
+    parser.add_argument("--create", metavar="WORKSPACE", help="Create an empty workspace")
+    parser.add_argument("--split", metavar="MAPPING_JSON",
+                        help='Move modules into workspaces, e.g. {"biology": [1, 2], "chemistry": [3]}')
+    parser.add_argument("--from", dest="source", default=DEFAULT_WORKSPACE, help="Workspace the modules are moved out of")
+    parser.add_argument("--dry-run", action="store_true", help="Report what would move without changing anything")
+    args = parser.parse_args(argv)
+
+    if args.create:
+        print(f"Workspace {args.create}: {create_workspace(args.create)}")
+    if args.split:
+        with open(args.split) as f:
+            mapping = json.load(f)
+        started = time.perf_counter()
+        with use_workspace(args.source):
+            try:
+                reports = split_database(mapping, args.dry_run)
+            except ShardConflictError as e:
+                print(f"Aborted: {e}")
+                return 1
+        prefix = "Would move" if args.dry_run else "Moved"
+        for workspace, report in reports.items():
+            print(f"{prefix} to {workspace}: " + ", ".join(f"{rows} {table}" for table, rows in report.items()))
+        print(f"  finished in {time.perf_counter() - started:.2f}s")
+    if args.list or not (args.create or args.split):
+        for workspace, stats in get_workspace_stats().items():
+            print(f"  {workspace:<20} {stats['modules']:>6} modules ({stats['published']} published), "
+                  f"{stats['sections']:>7} sections  {workspace_db_path(workspace)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,212 @@
+import json
+import os
+import threading
+from abc import ABC, abstractmethod
+
+from utils.database import get_db_connection, register_schema
+
+# Backend selection - "sqlite" (default), "postgres" (shares the storage
+# repository's connection pool) or "memory" for single-process use
+STATE_STORE_BACKEND = os.getenv("STATE_STORE_BACKEND", "sqlite")
+
+
+def module_namespace(module_id, kind, reviewer=None):
+    """Namespace of a module's state, e.g. ``module:3:edits``.
+
+    With a reviewer the namespace is private to them (``module:3:edits:<reviewer>``);
+    without one it is shared by every reviewer of the module.
+    """
+    namespace = f"module:{module_id}:{kind}"
+    return f"{namespace}:{reviewer}" if reviewer else namespace
+
+
+class StateStore(ABC):
+    """Interface for shared reviewer state (edits, summaries, publish info).
+
+    Values are grouped by namespace (see module_namespace) and must be
+    JSON-serializable so that any backend (SQLite, Redis, ...) can hold them.
+    """
+
+    @abstractmethod
+    def get_all(self, namespace):
+        """Return every key/value pair stored under a namespace."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def set_many(self, namespace, values):
+        """Store several key/value pairs under a namespace."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def delete(self, namespace, key=None):
+        """Delete one key, or the whole namespace when key is None."""
+        raise NotImplementedError
+
+    def get(self, namespace, key, default=None):
+        """Return a single value from a namespace."""
+        return self.get_all(namespace).get(key, default)
+
+    def set(self, namespace, key, value):
+        """Store a single value under a namespace."""
+        self.set_many(namespace, {key: value})
+
+
+def create_app_state_table(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS app_state (
+            namespace TEXT NOT NULL,
+            key TEXT NOT NULL,
+            value TEXT NOT NULL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (namespace, key)
+        )
+    """)
+
+
+class SQLiteStateStore(StateStore):
+    """State store backed by the `app_state` table in modules.db.
+
+    Every Streamlit worker process opening the same database file sees the
+    same state, so reviewers can be load-balanced across processes. Each
+    workspace keeps its state in its own shard.
+    """
+
+    def __init__(self):
+        register_schema(create_app_state_table)
+
+    def get_all(self, namespace):
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT key, value FROM app_state WHERE namespace = ?",
+                (namespace,)
+            )
+            return {row['key']: json.loads(row['value']) for row in cursor.fetchall()}
+
+    def set_many(self, namespace, values):
+        if not values:
+            return
+        with get_db_connection() as conn:
+            conn.executemany("""
+                INSERT INTO app_state (namespace, key, value)
+                VALUES (?, ?, ?)
+                ON CONFLICT(namespace, key)
+                DO UPDATE SET value = excluded.value, updated_at = CURRENT_TIMESTAMP
+            """, [(namespace, key, json.dumps(value)) for key, value in values.items()])
+
+    def delete(self, namespace, key=None):
+        with get_db_connection() as conn:
+            if key is None:
+                conn.execute("DELETE FROM app_state WHERE namespace = ?", (namespace,))
+            else:
+                conn.execute(
+                    "DELETE FROM app_state WHERE namespace = ? AND key = ?",
+                    (namespace, key)
+                )
+
+
+class PostgresStateStore(StateStore):
+    """State store in an `app_state` table of a PostgresRepository's database."""
+
+    def __init__(self, repository):
+        self.repository = repository
+        with repository.connection() as conn:
+            conn.cursor().execute("""
+                CREATE TABLE IF NOT EXISTS app_state (
+                    namespace TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    updated_at TIMESTAMP DEFAULT (now() AT TIME ZONE 'utc'),
+                    PRIMARY KEY (namespace, key)
+                )
+            """)
+
+    def get_all(self, namespace):
+        with self.repository.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT key, value FROM app_state WHERE namespace = %s", (namespace,))
+            return {key: json.loads(value) for key, value in cursor.fetchall()}
+
+    def set_many(self, namespace, values):
+        if not values:
+            return
+        with self.repository.connection() as conn:
+            conn.cursor().executemany("""
+                INSERT INTO app_state (namespace, key, value)
+                VALUES (%s, %s, %s)
+                ON CONFLICT (namespace, key)
+                DO UPDATE SET value = excluded.value, updated_at = now() AT TIME ZONE 'utc'
+            """, [(namespace, key, json.dumps(value)) for key, value in values.items()])
+
+    def delete(self, namespace, key=None):
+        with self.repository.connection() as conn:
+            if key is None:
+                conn.cursor().execute("DELETE FROM app_state WHERE namespace = %s", (namespace,))
+            else:
+                conn.cursor().execute(
+                    "DELETE FROM app_state WHERE namespace = %s AND key = %s",
+                    (namespace, key)
+                )
+
+
+class MemoryStateStore(StateStore):
+    """In-process state store (a stand-in for Redis in tests and single-worker runs)."""
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get_all(self, namespace):
+        with self._lock:
+            # Round-trip through JSON so callers never share mutable values
+            return json.loads(json.dumps(self._data.get(namespace, {})))
+
+    def set_many(self, namespace, values):
+        with self._lock:
+            self._data.setdefault(namespace, {}).update(json.loads(json.dumps(values)))
+
+    def delete(self, namespace, key=None):
+        with self._lock:
+            if key is None:
+                self._data.pop(namespace, None)
+            else:
+                self._data.get(namespace, {}).pop(key, None)
+
+
+class CachedStateStore(StateStore):
+    """Read-through cache around another store, meant to live for one rerun.
+
+    Each namespace is fetched at most once per rerun; writes go straight to
+    the backing store and invalidate the cached namespace.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self._cache = {}
+
+    def get_all(self, namespace):
+        if namespace not in self._cache:
+            self._cache[namespace] = self.backend.get_all(namespace)
+        return dict(self._cache[namespace])
+
+    def set_many(self, namespace, values):
+        self.backend.set_many(namespace, values)
+        self._cache.pop(namespace, None)
+
+    def delete(self, namespace, key=None):
+        self.backend.delete(namespace, key)
+        self._cache.pop(namespace, None)
+
+
+def create_state_store(backend=None, repository=None):
+    """Create the configured shared state store."""
+    backend = backend or STATE_STORE_BACKEND
+    if backend == "memory":
+        return MemoryStateStore()
+    if backend == "sqlite":
+        return SQLiteStateStore()
+    if backend == "postgres":
+        if repository is None or not hasattr(repository, "connection"):
+            raise ValueError("The postgres state store needs a PostgresRepository")
+        return PostgresStateStore(repository)
+    raise ValueError(f"Unknown state store backend: {backend}")
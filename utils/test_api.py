@@ -0,0 +1,92 @@
+import sys
+import os
+import gzip
+import http.client
+import json
+import threading
+# Ensure the project root is importable when running this test directly
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import pytest
+
+from utils import database
+from utils.api import ModuleAPI, create_server
+from utils.content_pack import pack_path
+from utils.database import get_module_by_id, init_db, publish_module, save_module_to_db, update_section_content
+from utils.repository import create_repository
+
+SECTIONS = [
+    {'id': 'lo1', 'title': 'Objective', 'content': 'Explain photosynthesis. ' * 80, 'type': 'learning_objective'},
+]
+
+
+@pytest.fixture
+def api(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "DB_PATH", str(tmp_path / "modules.db"))
+    init_db()
+    server = create_server(ModuleAPI(create_repository("sqlite"), check_interval=0), port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def get(server, path, **headers):
+    conn = http.client.HTTPConnection(*server.server_address)
+    conn.request("GET", path, headers=headers)
+    response = conn.getresponse()
+    body = response.read()
+    conn.close()
+    return response, body
+
+
+def test_lists_published_modules_in_pages(api):
+    ids = [save_module_to_db(f"Module {n}", SECTIONS) for n in range(3)]
+    assert json.loads(get(api, "/modules")[1])['total'] == 0
+    for module_id in ids[:2]:
+        publish_module(module_id)
+
+    response, body = get(api, "/modules?page=1&per_page=1")
+    page = json.loads(body)
+    assert response.status == 200
+    assert (page['total'], page['pages'], len(page['modules'])) == (2, 2, 1)
+    assert 'rel="next"' in response.getheader("Link")
+    assert get(api, "/modules?page=3&per_page=1")[0].status == 404
+    assert get(api, "/modules?per_page=abc")[0].status == 400
+
+
+def test_module_conditional_and_gzip_responses(api):
+    module_id = save_module_to_db("Photosynthesis", SECTIONS)
+    assert get(api, f"/modules/{module_id}")[0].status == 404
+    publish_module(module_id)
+
+    response, body = get(api, f"/modules/{module_id}")
+    assert response.status == 200
+    assert json.loads(body)['sections'][0]['id'] == 'lo1'
+    etag, last_modified = response.getheader("ETag"), response.getheader("Last-Modified")
+    assert get(api, f"/modules/{module_id}", **{"If-None-Match": etag})[0].status == 304
+    assert get(api, f"/modules/{module_id}", **{"If-Modified-Since": last_modified})[0].status == 304
+
+    response, zipped = get(api, f"/modules/{module_id}", **{"Accept-Encoding": "gzip"})
+    assert response.getheader("Content-Encoding") == "gzip"
+    assert gzip.decompress(zipped) == body and len(zipped) < len(body)
+    assert response.getheader("ETag") != etag
+    assert api.api.stats['hits'] >= 3
+
+
+def test_module_is_served_from_its_pack(api):
+    module_id = save_module_to_db("Photosynthesis", SECTIONS)
+    publish_module(module_id)
+    update_section_content(get_module_by_id(module_id)['sections'][0]['id'], "Edited after publishing")
+    api.api.invalidate()
+
+    section = json.loads(get(api, f"/modules/{module_id}")[1])['sections'][0]
+    assert (section['id'], section['content']) == ('lo1', SECTIONS[0]['content'])
+
+    # Modules published before packs existed are served from the database
+    os.remove(pack_path(module_id))
+    api.api.invalidate()
+    assert json.loads(get(api, f"/modules/{module_id}")[1])['sections'][0]['content'] == "Edited after publishing"
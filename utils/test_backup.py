@@ -0,0 +1,29 @@
+import sys
+import os
+# Ensure the project root is importable when running this test directly
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from utils import database, backup
+from utils.database import init_db, save_module_to_db, get_module_by_id, update_section_content
+
+
+def test_backup_restore_and_retention(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "DB_PATH", str(tmp_path / "modules.db"))
+    init_db()
+    module_id = save_module_to_db("Backup", [{"id": "s1", "title": "T", "content": "original", "type": "lesson"}])
+    section_id = get_module_by_id(module_id)['sections'][0]['id']
+
+    snapshot = backup.backup_database(pages=1, pause=0)
+    assert snapshot.endswith(".db.gz") and os.path.dirname(snapshot) == str(tmp_path / "backups")
+
+    update_section_content(section_id, "changed after the snapshot")
+    backup.restore_backup(snapshot)
+    assert get_module_by_id(module_id)['sections'][0]['content'] == "original"
+    # The state before the restore was kept as a safety snapshot
+    assert len(backup.list_backups()) == 2
+
+    for _ in range(3):
+        backup.backup_database(keep=2)
+    assert len(backup.list_backups()) == 2
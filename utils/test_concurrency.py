@@ -0,0 +1,136 @@
+import sys
+import os
+import threading
+# Ensure the project root is importable when running this test directly
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import pytest
+
+from utils import database
+from utils.database import (
+    init_db, save_module_to_db, get_module_by_id, update_section_content, apply_edits, get_db_connection,
+    save_section_edit, get_section_content_at_version, StaleSectionError, SectionMergeConflict
+)
+from utils import quality
+from utils.merge import three_way_merge
+
+
+@pytest.fixture
+def section(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "DB_PATH", str(tmp_path / "modules.db"))
+    init_db()
+    module_id = save_module_to_db("Concurrency", [
+        {"id": "sec1", "title": "Intro", "content": "line one\nline two\nline three\n", "type": "lesson"}
+    ])
+    return get_module_by_id(module_id)['sections'][0]
+
+
+def test_stale_update_fails_fast(section):
+    assert section['version'] == 1
+    assert update_section_content(section['id'], "first writer\n", expected_version=1) == 2
+    with pytest.raises(StaleSectionError) as exc:
+        update_section_content(section['id'], "second writer\n", expected_version=1)
+    assert exc.value.current_version == 2
+    assert exc.value.current_content == "first writer\n"
+
+
+def test_content_at_version_uses_history(section):
+    update_section_content(section['id'], "v2\n")
+    update_section_content(section['id'], "v3\n")
+    assert get_section_content_at_version(section['id'], 1) == "line one\nline two\nline three\n"
+    assert get_section_content_at_version(section['id'], 2) == "v2\n"
+    assert get_section_content_at_version(section['id'], 3) == "v3\n"
+
+
+def test_non_overlapping_edits_are_merged(section):
+    save_section_edit(section['id'], "line ONE\nline two\nline three\n", base_version=1)
+    version, content = save_section_edit(section['id'], "line one\nline two\nline THREE\n", base_version=1)
+    assert version == 3
+    assert content == "line ONE\nline two\nline THREE\n"
+
+
+def test_bulk_edit_of_a_section_deleted_meanwhile_saves_nothing(section, monkeypatch):
+    other = save_module_to_db("Other", [
+        {"id": "sec1", "title": "Intro", "content": "other intro\n", "type": "lesson"}
+    ])
+    other_section = get_module_by_id(other)['sections'][0]['id']
+    real_score = quality.score_sections
+
+    def delete_then_score(texts, types):
+        # Runs between apply_edits' read and its update
+        with get_db_connection() as conn:
+            conn.execute("DELETE FROM approvals WHERE section_id = ?", (other_section,))
+            conn.execute("DELETE FROM sections WHERE id = ?", (other_section,))
+        return real_score(texts, types)
+
+    monkeypatch.setattr(quality, "score_sections", delete_then_score)
+    with pytest.raises(LookupError):
+        apply_edits({section['id']: "bulk edit\n", other_section: "gone\n"})
+    assert get_module_by_id(section['module_id'])['sections'][0]['version'] == 1
+
+
+def test_overlapping_edits_raise_conflict(section):
+    save_section_edit(section['id'], "line one\nline 2 (A)\nline three\n", base_version=1)
+    with pytest.raises(SectionMergeConflict) as exc:
+        save_section_edit(section['id'], "line one\nline 2 (B)\nline three\n", base_version=1)
+    assert "<<<<<<<" in exc.value.merged_content
+    assert get_module_by_id(section['module_id'])['sections'][0]['version'] == 2
+
+
+def test_concurrent_writers_lose_no_updates(section):
+    lines = ["line %d\n" % i for i in range(8)]
+    update_section_content(section['id'], "".join(lines), expected_version=1)
+
+    def edit(i):
+        edited = list(lines)
+        edited[i] = "edited %d\n" % i
+        save_section_edit(section['id'], "".join(edited), base_version=2, max_attempts=20)
+
+    threads = [threading.Thread(target=edit, args=(i,)) for i in range(0, 8, 2)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    content = get_module_by_id(section['module_id'])['sections'][0]['content']
+    for i in range(0, 8, 2):
+        assert "edited %d\n" % i in content
+
+
+def test_reads_are_not_blocked_by_open_write(section, monkeypatch):
+    monkeypatch.setattr(database, "READ_REPLICA", "ro")
+    writer = database.sqlite3.connect(database.DB_PATH)
+    writer.execute("BEGIN IMMEDIATE")
+    writer.execute("UPDATE sections SET content = 'uncommitted' WHERE id = ?", (section['id'],))
+    try:
+        assert get_module_by_id(section['module_id'])['sections'][0]['content'] == section['content']
+    finally:
+        writer.rollback()
+        writer.close()
+
+
+def test_memory_replica_refreshes_after_interval(section, monkeypatch):
+    monkeypatch.setattr(database, "READ_REPLICA", "memory")
+    monkeypatch.setattr(database, "REPLICA_REFRESH_SECONDS", 3600)
+    with database.replica_reads():
+        assert get_module_by_id(section['module_id'])['sections'][0]['version'] == 1
+        update_section_content(section['id'], "new\n")
+        # Served from the snapshot until it is refreshed
+        assert get_module_by_id(section['module_id'])['sections'][0]['version'] == 1
+        monkeypatch.setattr(database, "REPLICA_REFRESH_SECONDS", 0)
+        assert get_module_by_id(section['module_id'])['sections'][0]['version'] == 2
+    # Outside replica_reads() reads always see the primary
+    monkeypatch.setattr(database, "REPLICA_REFRESH_SECONDS", 3600)
+    update_section_content(section['id'], "newer\n")
+    assert get_module_by_id(section['module_id'])['sections'][0]['version'] == 3
+
+
+def test_three_way_merge_identical_changes():
+    merged, conflicts = three_way_merge("a\nb\n", "a\nc\n", "a\nc\n")
+    assert merged == "a\nc\n" and not conflicts
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,78 @@
+import sys
+import os
+# Ensure the project root is importable when running this test directly
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import pytest
+
+from utils import database
+from utils.content_pack import ContentPack, ContentPackError, get_published_section, open_pack, pack_path
+from utils.database import init_db, get_module_by_id, publish_module, save_module_to_db, update_section_content
+
+SECTIONS = [
+    {'id': 'lo1', 'title': 'Objective', 'content': 'Explain photosynthesis.', 'type': 'learning_objective'},
+    {'id': 'l1', 'title': 'Lesson', 'content': 'Plants turn light into sugar. ' * 50, 'type': 'lesson'},
+]
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "DB_PATH", str(tmp_path / "modules.db"))
+    init_db()
+    return tmp_path
+
+
+def test_publish_compiles_a_readable_pack(db):
+    module_id = save_module_to_db("Photosynthesis", SECTIONS)
+    assert open_pack(module_id) is None
+    publish_module(module_id)
+
+    pack = open_pack(module_id)
+    assert pack_path(module_id).startswith(str(db / "packs"))
+    assert pack.meta['module_title'] == "Photosynthesis"
+    assert [s['section_id'] for s in pack.sections] == ['lo1', 'l1']
+    sections = get_module_by_id(module_id)['sections']
+    for section in sections:
+        assert pack.get_content(section['id']) == section['content']
+    # The short body is stored as-is, the repetitive one compressed
+    assert [pack.raw(s['id'])[1] for s in sections] == [False, True]
+    assert get_published_section(module_id, sections[0]['id'])['title'] == 'Objective'
+    assert get_published_section(module_id, -1) is None
+
+
+def test_republish_swaps_in_a_new_pack(db):
+    module_id = save_module_to_db("Photosynthesis", SECTIONS)
+    publish_module(module_id)
+    old = open_pack(module_id)
+    section_id = old.sections[0]['id']
+
+    update_section_content(section_id, "Describe photosynthesis.")
+    publish_module(module_id)
+
+    assert open_pack(module_id).get_content(section_id) == "Describe photosynthesis."
+    # Readers of the previous mapping are unaffected
+    assert old.get_content(section_id) == "Explain photosynthesis."
+    old.close()
+
+
+def test_rejects_files_that_are_not_packs(tmp_path):
+    path = tmp_path / "module_1.pack"
+    path.write_bytes(b"SQLite format 3\0" + b"\0" * 64)
+    with pytest.raises(ContentPackError):
+        ContentPack(str(path))
+
+
+def test_failed_pack_build_does_not_publish(db, monkeypatch):
+    from utils import content_pack
+    module_id = save_module_to_db("Photosynthesis", SECTIONS)
+
+    def full_disk(module, directory=None):
+        raise OSError("No space left on device")
+
+    monkeypatch.setattr(content_pack, "build_pack", full_disk)
+    with pytest.raises(OSError):
+        publish_module(module_id)
+    assert get_module_by_id(module_id)['status'] == 'draft'
+    assert open_pack(module_id) is None
@@ -0,0 +1,51 @@
+import sys
+import os
+# Ensure the project root is importable when running this test directly
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import pytest
+
+from utils import database
+from utils.content_pack import open_pack
+from utils.database import (
+    changes_since, get_db_connection, init_db, publish_module, reset_db, save_module_to_db,
+)
+from utils.jobs import SQLiteJobStore
+from utils.review_log import SQLiteReviewLog, review_event
+from utils.state_store import SQLiteStateStore, module_namespace
+
+SECTIONS = [{'id': 'lo1', 'title': 'Objective', 'content': 'Explain photosynthesis.', 'type': 'learning_objective'}]
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "DB_PATH", str(tmp_path / "modules.db"))
+    init_db()
+    return tmp_path
+
+
+def test_reset_leaves_nothing_behind(db):
+    state, jobs, log = SQLiteStateStore(), SQLiteJobStore(), SQLiteReviewLog()
+    module_id = save_module_to_db("Old", SECTIONS)
+    publish_module(module_id)
+    state.set(module_namespace(module_id, "edits", "r1"), "lo1", "draft")
+    jobs.submit('record', {}, module_id=module_id)
+    log.record([review_event('view', module_id, reviewer="r1")])
+
+    reset_db()
+
+    with get_db_connection() as conn:
+        tables = [row[0] for row in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"
+        ).fetchall()]
+        assert {"changes", "jobs", "app_state", "review_events"} <= set(tables)
+        assert {table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] for table in tables} == \
+            dict.fromkeys(tables, 0)
+    assert open_pack(module_id) is None
+
+    # The tables keep working after the reset
+    new_id = save_module_to_db("New", SECTIONS)
+    assert {c['op'] for c in changes_since(0)[0]} == {'insert'}
+    assert {c['module_id'] for c in changes_since(0)[0]} == {new_id}
@@ -5,8 +5,14 @@ ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 if ROOT not in sys.path:
     sys.path.insert(0, ROOT)
 
+import tempfile
+from utils import database
 from utils.database import reset_db, init_db, save_module_to_db, get_module_by_id, update_section_content, approve_section, reject_section, get_module_stats, get_section_versions
 
+# Work on a throwaway database so the real modules.db is never reset
+database.DB_PATH = os.path.join(tempfile.mkdtemp(), "modules.db")
+init_db()
+
 # Reset and init
 reset_db()
 init_db()
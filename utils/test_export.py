@@ -0,0 +1,72 @@
+import sys
+import os
+import json
+import zipfile
+# Ensure the project root is importable when running this test directly
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import pytest
+
+from utils import database
+from utils.database import approve_section, get_module_by_id, init_db, publish_module, save_module_to_db
+from utils.export import export_modules, iter_module_exports
+
+SECTIONS = [
+    {'id': 'lo1', 'title': 'Objective', 'content': 'Explain photosynthesis.', 'type': 'learning_objective',
+     'bloom_level': 'Understand'},
+    {'id': 'c1', 'title': 'Content', 'content': 'Plants turn light into sugar.\n\nThey need <water>.',
+     'type': 'content'},
+]
+
+
+@pytest.fixture
+def library(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "DB_PATH", str(tmp_path / "modules.db"))
+    init_db()
+    draft = save_module_to_db("Draft module", SECTIONS)
+    published = save_module_to_db("Published module", SECTIONS)
+    approve_section(get_module_by_id(published)['sections'][0]['id'])
+    publish_module(published)
+    return tmp_path, draft, published
+
+
+def test_jsonl_round_trip(library):
+    tmp_path, draft, published = library
+    stats = export_modules(str(tmp_path / "all.jsonl"), "jsonl")
+    assert (stats['modules'], stats['sections']) == (2, 4)
+    modules = [json.loads(line) for line in (tmp_path / "all.jsonl").read_text().splitlines()]
+    assert [m['id'] for m in modules] == [draft, published]
+    assert [(s['id'], s['content'], s['bloom_level']) for s in modules[1]['sections']] == [
+        (s['id'], s['content'], s.get('bloom_level')) for s in SECTIONS
+    ]
+    assert modules[1]['sections'][0]['is_approved'] and not modules[1]['sections'][1]['is_approved']
+
+    export_modules(str(tmp_path / "published.jsonl"), "jsonl", status="published")
+    assert [json.loads(line)['id'] for line in (tmp_path / "published.jsonl").read_text().splitlines()] == [published]
+    assert [m['id'] for m in iter_module_exports(module_ids=[draft])] == [draft]
+
+
+def test_parquet_round_trip(library):
+    pq = pytest.importorskip("pyarrow.parquet")
+    tmp_path, draft, published = library
+    stats = export_modules(str(tmp_path / "published.parquet"), "parquet", status="published")
+    assert (stats['modules'], stats['sections']) == (1, 2)
+    rows = pq.read_table(tmp_path / "published.parquet").to_pylist()
+    assert [(r['module_id'], r['module_status'], r['section_id'], r['content'], r['is_approved']) for r in rows] == [
+        (published, 'published', 'lo1', SECTIONS[0]['content'], True),
+        (published, 'published', 'c1', SECTIONS[1]['content'], False),
+    ]
+
+
+def test_course_zip(library):
+    tmp_path, draft, published = library
+    export_modules(str(tmp_path / "courses.zip"), "zip", status="draft")
+    with zipfile.ZipFile(tmp_path / "courses.zip") as zf:
+        folder = f"module_{draft}"
+        assert sorted(zf.namelist()) == [f"{folder}/imsmanifest.xml", f"{folder}/index.html", f"{folder}/module.json"]
+        assert json.loads(zf.read(f"{folder}/module.json"))['sections'][1]['content'] == SECTIONS[1]['content']
+        page = zf.read(f"{folder}/index.html").decode()
+        assert "<p>They need &lt;water&gt;.</p>" in page
+        assert "<title>Draft module</title>" in zf.read(f"{folder}/imsmanifest.xml").decode()
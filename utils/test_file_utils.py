@@ -0,0 +1,110 @@
+import sys
+import os
+import json
+import threading
+import time
+from types import SimpleNamespace
+# Ensure the project root is importable when running this test directly
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from utils import file_utils
+from utils.file_utils import load_json_cached, save_json
+
+
+def test_cached_load_reuses_parsed_document(tmp_path):
+    path = tmp_path / "doc.json"
+    save_json(path, {"module_title": "A"})
+    first = load_json_cached(path)
+    assert load_json_cached(path) is first
+
+    save_json(path, {"module_title": "B"})
+    assert load_json_cached(path) == {"module_title": "B"}
+
+
+def test_touch_without_change_keeps_cached_object(tmp_path):
+    path = tmp_path / "doc.json"
+    save_json(path, {"n": 1})
+    first = load_json_cached(path)
+    os.utime(path, ns=(1, 1))
+    assert load_json_cached(path) is first
+
+
+def test_concurrent_writes_never_expose_partial_json(tmp_path):
+    path = tmp_path / "doc.json"
+    save_json(path, {"sections": []})
+    errors = []
+    stop = threading.Event()
+
+    def writer(n):
+        for i in range(50):
+            save_json(path, {"writer": n, "sections": [{"content": "x" * 2000}] * (i % 7)})
+
+    def reader():
+        while not stop.is_set():
+            try:
+                with open(path) as f:
+                    json.load(f)
+            except ValueError as e:
+                errors.append(e)
+
+    readers = [threading.Thread(target=reader) for _ in range(2)]
+    writers = [threading.Thread(target=writer, args=(n,)) for n in range(4)]
+    for t in readers + writers:
+        t.start()
+    for t in writers:
+        t.join()
+    stop.set()
+    for t in readers:
+        t.join()
+
+    assert not errors
+    assert not [p for p in os.listdir(tmp_path) if p.startswith(".tmp-")]
+
+
+
+class SlowClient:
+    """Local stand-in for the Groq client that answers after a delay."""
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, model, messages, temperature=None, max_tokens=None):
+        self.calls += 1
+        time.sleep(self.delay)
+        text = "Rewritten " + messages[-1]["content"].split()[-1]
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=text))])
+
+
+def test_identical_in_flight_llm_calls_are_merged(monkeypatch):
+    client = SlowClient(delay=0.3)
+    monkeypatch.setattr(file_utils, "get_client", lambda: client)
+    file_utils.reset_llm_call_stats()
+    results = []
+
+    def regenerate(text):
+        results.append(file_utils.regenerate_content(text))
+
+    threads = [threading.Thread(target=regenerate, args=("same text",)) for _ in range(5)]
+    threads.append(threading.Thread(target=regenerate, args=("other text",)))
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert client.calls == 2
+    assert sorted(results) == ["Rewritten text"] * 6
+    stats = file_utils.llm_call_stats()
+    assert stats["calls"] == 2 and stats["merged"] == 4 and stats["in_flight"] == 0
+
+    # Once finished, the same request goes to the API again (no result caching)
+    file_utils.regenerate_content("same text")
+    assert client.calls == 3
+
+
+if __name__ == "__main__":
+    import pytest
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,101 @@
+import sys
+import os
+import json
+# Ensure the project root is importable when running this test directly
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import pytest
+
+from utils import database, importer
+from utils.database import (
+    get_all_modules, get_db_connection, get_module_by_id, get_section_versions, init_db, save_section_edit,
+    update_section_content
+)
+from utils.state_store import SQLiteStateStore, module_namespace
+
+
+@pytest.fixture
+def sources(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "DB_PATH", str(tmp_path / "modules.db"))
+    init_db()
+    paths = []
+    for n in range(5):
+        path = tmp_path / f"lesson_{n}.json"
+        path.write_text(json.dumps({'module_title': f"Lesson {n}", 'sections': [
+            {'id': f"lo{n}", 'title': 'Objective', 'content': f"Objective {n}", 'type': 'learning_objective'},
+            {'id': 'c1', 'title': 'Content', 'content': f"Content {n}", 'type': 'content'},
+        ]}))
+        paths.append(str(path))
+    versions = tmp_path / "versions"
+    versions.mkdir()
+    for name, section_id in (("unique", "lo3"), ("ambiguous", "c1")):
+        (versions / f"section_{name}.json").write_text(json.dumps(
+            {'section_id': section_id, 'timestamp': "20250102_030405", 'content': f"Edited {name}"}
+        ))
+    return paths, str(versions)
+
+
+def test_rerun_imports_nothing(sources):
+    paths, versions = sources
+    report = importer.run_import(paths, versions, batch_size=2, workers=0)
+    assert report['imported'] == 6
+    # c1 exists in every module, so that snapshot is not attached anywhere
+    assert report['unmatched_versions'] == 1
+    assert report['rows'] == 5 * 3 + 1
+
+    # The snapshot is a shared draft of lo3, not a saved version
+    module = next(m for m in get_all_modules() if m['module_title'] == "Lesson 3")
+    assert SQLiteStateStore().get_all(module_namespace(module['id'], "edits")) == {'lo3': "Edited unique"}
+    with get_db_connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM versions").fetchone()[0] == 0
+        row = conn.execute("SELECT updated_at FROM app_state WHERE key = 'lo3'").fetchone()
+    assert row['updated_at'] == importer._snapshot_time("20250102_030405")
+
+    again = importer.run_import(paths, versions, batch_size=2, workers=0)
+    assert (again['imported'], again['rows'], again['duplicates']) == (0, 0, 6)
+    assert len(get_all_modules()) == 5
+
+
+def test_resumes_after_failure_mid_batch(sources, monkeypatch):
+    paths, versions = sources
+    real_import = importer._import_module
+    calls = []
+
+    def failing_import(cursor, record):
+        calls.append(record['source'])
+        if len(calls) == 4:
+            raise RuntimeError("disk full")
+        return real_import(cursor, record)
+
+    monkeypatch.setattr(importer, "_import_module", failing_import)
+    with pytest.raises(RuntimeError):
+        importer.run_import(paths, versions, batch_size=2, workers=0)
+    # The first batch is committed, the failed one rolled back as a whole
+    assert sorted(m['module_title'] for m in get_all_modules()) == ["Lesson 0", "Lesson 1"]
+
+    monkeypatch.setattr(importer, "_import_module", real_import)
+    report = importer.run_import(paths, versions, batch_size=2, workers=0)
+    assert (report['imported'], report['duplicates']) == (4, 2)
+    assert sorted(m['module_title'] for m in get_all_modules()) == [f"Lesson {n}" for n in range(5)]
+
+
+def test_imported_draft_is_not_a_merge_base(sources):
+    paths, versions = sources
+    lines = ["Objective 3", "Explain the steps.", "Name the inputs.", "Name the outputs.", "Give an example."]
+    lesson = json.loads(open(paths[3]).read())
+    lesson['sections'][0]['content'] = "\n".join(lines)
+    with open(paths[3], 'w') as f:
+        json.dump(lesson, f)
+    importer.run_import(paths, versions, batch_size=2, workers=0)
+    module = next(m for m in get_all_modules() if m['module_title'] == "Lesson 3")
+    section_id = get_module_by_id(module['id'])['sections'][0]['id']
+
+    # Another reviewer saves v2; a non-overlapping edit based on v1 still merges
+    theirs = "\n".join(["Objective 3", "Explain every step."] + lines[2:])
+    ours = "\n".join(lines[:-1] + ["Give two examples."])
+    update_section_content(section_id, theirs, expected_version=1)
+    version, content = save_section_edit(section_id, ours, base_version=1)
+    assert (version, content) == (3, "\n".join(["Objective 3", "Explain every step."] + lines[2:4] + ["Give two examples."]))
+    assert "Edited unique" not in [v['edited_content'] for v in get_section_versions(section_id)]
@@ -0,0 +1,146 @@
+import sys
+import os
+import threading
+# Ensure the project root is importable when running this test directly
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import pytest
+
+from utils import database, file_utils
+from utils.database import init_db, get_db_connection
+from utils.jobs import JobError, JobQueue, JobStore, PostgresJobStore, QueueFullError, SQLiteJobStore, create_job_store
+from utils.state_store import MemoryStateStore
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "DB_PATH", str(tmp_path / "modules.db"))
+    init_db()
+    return tmp_path
+
+
+def test_workers_run_jobs_and_store_results(db, monkeypatch):
+    monkeypatch.setattr(file_utils, "regenerate_content", lambda text: text.upper())
+    state = MemoryStateStore()
+    queue = JobQueue(SQLiteJobStore(), state_store=state, workers=2, poll_interval=0.05).start()
+    try:
+        job_id = queue.submit("regenerate_section", {"namespace": "module:1:edits", "key": "s1", "text": "draft"}, module_id=1)
+        job = queue.wait(job_id, timeout=5)
+    finally:
+        queue.stop()
+
+    assert job['status'] == 'done'
+    assert job['result'] == {'content': 'DRAFT'}
+    assert job['attempts'] == 1
+    assert state.get("module:1:edits", "s1") == "DRAFT"
+    assert queue.list_jobs(module_id=1)[0]['id'] == job_id
+
+
+def test_each_job_is_claimed_once_and_failures_are_recorded(db):
+    seen = []
+    lock = threading.Lock()
+
+    def record(payload, repository, state_store):
+        with lock:
+            seen.append(payload['n'])
+        if payload['n'] == 0:
+            raise JobError("bad prompt")
+        return payload['n']
+
+    queue = JobQueue(SQLiteJobStore(), handlers={'record': record}, workers=4, poll_interval=0.05)
+    ids = [queue.submit('record', {'n': n}) for n in range(20)]
+    queue.start()
+    try:
+        jobs = [queue.wait(job_id, timeout=10) for job_id in ids]
+    finally:
+        queue.stop()
+
+    assert sorted(seen) == list(range(20))
+    assert jobs[0]['status'] == 'failed' and jobs[0]['error'] == "bad prompt"
+    assert [job['result'] for job in jobs[1:]] == list(range(1, 20))
+
+
+def test_lost_running_jobs_are_requeued(db):
+    store = SQLiteJobStore()
+    job_id = store.submit('record', {})
+    assert store.claim("dead-worker")['id'] == job_id
+    with get_db_connection() as conn:
+        conn.execute("UPDATE jobs SET started_at = datetime('now', '-1 hour')")
+
+    assert store.requeue_stale(timeout=60) == 1
+    assert store.get_job(job_id)['status'] == 'queued'
+
+
+def test_priority_classes_fair_share_and_admission(db):
+    order = []
+    queue = JobQueue(SQLiteJobStore(), workers=0, background_slots=1,
+                     queue_limits={'interactive': 0, 'batch': 0, 'background': 2},
+                     handlers={'record': lambda payload, repository, state_store: order.append(payload['n'])})
+    queue.submit('record', {'n': 'batch'}, priority='batch')
+    for n in range(3):
+        queue.submit('record', {'n': f"alice{n}"}, owner='alice')
+    queue.submit('record', {'n': 'bob0'}, owner='bob')
+    queue.submit('record', {'n': 'bg0'}, priority='background')
+    queue.submit('record', {'n': 'bg1'}, priority='background')
+    with pytest.raises(QueueFullError):
+        queue.submit('record', {'n': 'bg2'}, priority='background')
+
+    while queue.run_next():
+        pass
+    # Interactive first, alternating between reviewers, then batch, then background
+    assert order == ['alice0', 'bob0', 'alice1', 'alice2', 'batch', 'bg0', 'bg1']
+
+    stats = queue.stats()
+    assert stats['interactive']['started'] == 4 and stats['background']['refused'] == 1
+    assert stats['batch']['queued'] == 0 and stats['interactive']['wait_p95_s'] >= 0
+
+
+def test_background_slots_keep_workers_free_for_interactive_jobs(db):
+    store = SQLiteJobStore()
+    queue = JobQueue(store, workers=0, background_slots=1,
+                     handlers={'record': lambda payload, repository, state_store: payload['n']})
+    long_job = queue.submit('record', {'n': 0}, priority='batch')
+    assert store.claim("busy-worker", background_slots=1)['id'] == long_job
+    waiting = queue.submit('record', {'n': 1}, priority='batch')
+    interactive = queue.submit('record', {'n': 2})
+
+    assert queue.run_next() and not queue.run_next()
+    assert queue.get(interactive)['status'] == 'done'
+    assert queue.get(waiting)['status'] == 'queued'
+    assert queue.stats()['batch'] == {**queue.stats()['batch'], 'queued': 1, 'running': 1}
+
+
+def test_postgres_job_store(postgres_repository):
+    def fail(payload, repository, state_store):
+        raise JobError("bad prompt")
+
+    store = create_job_store(postgres_repository)
+    assert isinstance(store, PostgresJobStore)
+    queue = JobQueue(store, workers=0, handlers={
+        'record': lambda payload, repository, state_store: payload['n'], 'fail': fail,
+    })
+    ids = [queue.submit('record', {'n': n}, module_id=7) for n in range(3)]
+    failed = queue.submit('fail', {})
+    while queue.run_next():
+        pass
+    assert [queue.get(job_id)['result'] for job_id in ids] == [0, 1, 2]
+    assert queue.get(failed)['status'] == 'failed' and queue.get(failed)['error'] == "bad prompt"
+    assert [job['id'] for job in queue.list_jobs(module_id=7)] == ids[::-1]
+
+    job_id = store.submit('record', {'n': 3})
+    assert store.claim("dead-worker")['id'] == job_id
+    with postgres_repository.connection() as conn:
+        conn.cursor().execute("UPDATE jobs SET started_at = started_at - interval '1 hour'")
+    assert store.requeue_stale(timeout=60) == 1
+    assert store.get_job(job_id)['status'] == 'queued'
+
+
+def test_job_store_interface_is_abstract():
+    class SubmitOnly(JobStore):
+        def submit(self, kind, payload, module_id=None, priority=0, owner=None):
+            return 1
+
+    with pytest.raises(TypeError, match="claim"):
+        SubmitOnly()
@@ -0,0 +1,81 @@
+import sys
+import os
+# Ensure the project root is importable when running this test directly
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import pytest
+
+from utils import database, maintenance
+from utils.database import (
+    init_db, save_module_to_db, get_module_by_id, get_all_modules, publish_module,
+    update_section_content, get_section_versions, get_db_connection, get_attached_connection
+)
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "DB_PATH", str(tmp_path / "modules.db"))
+    init_db()
+    return tmp_path
+
+
+def _age(table, days):
+    with get_db_connection() as conn:
+        column = "created_at" if table == "versions" else "updated_at"
+        conn.execute(f"UPDATE {table} SET {column} = datetime('now', ?)", (f"-{days} days",))
+
+
+def test_archives_old_versions_and_published_modules(db):
+    draft_id = save_module_to_db("Draft", [{"id": "s1", "title": "T", "content": "v1", "type": "lesson"}])
+    published_id = save_module_to_db("Published", [{"id": "s1", "title": "T", "content": "v1", "type": "lesson"}])
+    draft_section = get_module_by_id(draft_id)['sections'][0]['id']
+    for n in range(2, 10):
+        update_section_content(draft_section, f"v{n}")
+    publish_module(published_id)
+    _age("versions", 200)
+    _age("modules", 60)
+    _age("sections", 60)
+
+    report = maintenance.run_maintenance(keep_versions=3, pause=0)
+
+    assert report['versions_archived'] == 5
+    assert len(get_section_versions(draft_section)) == 3
+    assert report['published_modules_archived'] == 1
+    assert report['draft_modules_archived'] == 0
+    assert [m['id'] for m in get_all_modules()] == [draft_id]
+    assert [m['id'] for m in maintenance.list_archived_modules()] == [published_id]
+    assert os.path.exists(db / "modules_archive.db")
+
+    assert maintenance.restore_module(published_id)
+    restored = get_module_by_id(published_id)
+    assert restored['status'] == 'published'
+    assert restored['sections'][0]['content'] == "v1"
+    assert restored['sections'][0]['quality_score'] is not None
+    assert maintenance.list_archived_modules() == []
+
+
+def test_restore_from_archive_without_score_columns(db):
+    module_id = save_module_to_db("Old", [{"id": "s1", "title": "T", "content": "Plants make sugar.", "type": "content"}])
+    score = get_module_by_id(module_id)['sections'][0]['quality_score']
+    # An archive written before the score columns were mirrored
+    legacy = dict(maintenance.ARCHIVE_COLUMNS, sections=maintenance.ARCHIVE_COLUMNS["sections"][:10])
+    with get_attached_connection(maintenance.archive_path(), "archive") as conn:
+        cursor = conn.cursor()
+        for table, columns in legacy.items():
+            cursor.execute(f"CREATE TABLE archive.{table} ({', '.join(columns)}, archived_at TIMESTAMP)")
+            if table != "versions":
+                cursor.execute(f"INSERT INTO archive.{table} ({', '.join(columns)}) "
+                               f"SELECT {', '.join(columns)} FROM main.{table}")
+        for table in ("approvals", "sections", "modules"):
+            cursor.execute(f"DELETE FROM main.{table}")
+
+    assert maintenance.restore_module(module_id)
+    assert get_module_by_id(module_id)['sections'][0]['quality_score'] == score
+    with maintenance.archive_connection() as conn:
+        columns = [row[1] for row in conn.execute("PRAGMA archive.table_info(sections)").fetchall()]
+    assert "coverage_score" in columns
+    # The cached connection is handed back without the archive attached
+    with get_db_connection() as conn:
+        assert [row[1] for row in conn.execute("PRAGMA database_list").fetchall()] == ["main"]
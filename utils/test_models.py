@@ -0,0 +1,123 @@
+import sys
+import os
+# Ensure the project root is importable when running this test directly
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import pytest
+
+from utils import database
+from utils.database import (
+    approve_section, changes_since, get_change_cursor, get_db_connection, get_module_by_id, init_db,
+    save_module_to_db, update_section_content
+)
+from utils.models import CONTENT_CACHE, Module
+from utils.repository import create_repository
+
+SECTIONS = [
+    {"id": "s1", "title": "A", "content": "first", "type": "lesson"},
+    {"id": "s2", "title": "B", "content": "second", "type": "assessment"},
+    {"id": "s3", "title": "C", "content": "third", "type": "lesson"},
+]
+
+
+class RecordingRepository:
+    """SQLite repository that records which section ids were reloaded."""
+
+    def __init__(self):
+        self.repository = create_repository("sqlite")
+        self.loaded = []
+
+    def get_modules_by_ids(self, module_ids):
+        return self.repository.get_modules_by_ids(module_ids)
+
+    def get_sections_by_ids(self, section_ids, include_content=True):
+        self.loaded.append(sorted(section_ids))
+        return self.repository.get_sections_by_ids(section_ids, include_content)
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "DB_PATH", str(tmp_path / "modules.db"))
+    init_db()
+    CONTENT_CACHE.clear()
+    yield tmp_path
+    CONTENT_CACHE.clear()
+
+
+def test_sections_load_content_lazily_and_keep_their_version(db):
+    module_id = save_module_to_db("M", [
+        {"id": "s1", "title": "A", "content": "first", "type": "lesson"},
+        {"id": "s2", "title": "B", "content": "second", "type": "assessment", "bloom_level": "Apply"},
+    ])
+    row = get_module_by_id(module_id, include_content=False)
+    assert 'content' not in row['sections'][0]
+
+    module = Module.from_row(row)
+    assert not hasattr(module.sections[0], "__dict__")
+    assert len(CONTENT_CACHE) == 0
+    module.prefetch_content()
+    assert len(CONTENT_CACHE) == 2
+    assert [s.content for s in module.sections] == ["first", "second"]
+    assert module.sections[1].key == "s2"
+
+    # A stale view still shows the version it was loaded at
+    section = module.sections[0]
+    update_section_content(section.id, "edited")
+    CONTENT_CACHE.clear()
+    assert section.content == "first"
+
+    module.replace_sections({section.id}, database.get_sections_by_ids([section.id], include_content=False))
+    assert module.sections[0].version == 2
+    assert module.sections[0].content == "edited"
+
+
+def test_writes_to_modules_and_sections_are_logged(db):
+    cursor = get_change_cursor()
+    module_id = save_module_to_db("M", SECTIONS[:1])
+    section_id = get_module_by_id(module_id)['sections'][0]['id']
+    update_section_content(section_id, "edited")
+    with get_db_connection() as conn:
+        conn.execute("UPDATE modules SET module_title = 'Renamed' WHERE id = ?", (module_id,))
+        conn.execute("DELETE FROM approvals WHERE section_id = ?", (section_id,))
+        conn.execute("DELETE FROM sections WHERE id = ?", (section_id,))
+        conn.execute("DELETE FROM modules WHERE id = ?", (module_id,))
+
+    changes, new_cursor = changes_since(cursor, module_id=module_id)
+    logged = [(c['table_name'], c['op']) for c in changes]
+    for entry in [('modules', 'insert'), ('sections', 'insert'), ('sections', 'update'),
+                  ('modules', 'update'), ('sections', 'delete'), ('modules', 'delete')]:
+        assert entry in logged
+    assert all(c['row_id'] == section_id for c in changes if c['table_name'] == 'sections')
+    assert new_cursor == get_change_cursor() and changes_since(new_cursor) == ([], new_cursor)
+
+
+def test_view_applies_only_the_changed_rows(db):
+    module_id = save_module_to_db("M", SECTIONS)
+    cursor = get_change_cursor()
+    module = Module.from_row(get_module_by_id(module_id, include_content=False))
+    first, second, third = (s.id for s in module.sections)
+    repository = RecordingRepository()
+
+    update_section_content(first, "edited")
+    approve_section(second)
+    changes, cursor = changes_since(cursor, module_id=module_id)
+    assert module.apply_changes(changes, repository)
+    assert repository.loaded == [[first, second]]
+    assert [(s.version, s.is_approved) for s in module.sections] == [(2, False), (1, True), (1, False)]
+
+    with get_db_connection() as conn:
+        conn.execute("UPDATE modules SET status = 'published' WHERE id = ?", (module_id,))
+        conn.execute("DELETE FROM approvals WHERE section_id = ?", (third,))
+        conn.execute("DELETE FROM sections WHERE id = ?", (third,))
+    changes, cursor = changes_since(cursor, module_id=module_id)
+    assert module.apply_changes(changes, repository)
+    assert repository.loaded[-1] == [third]
+    assert module.status == 'published' and [s.id for s in module.sections] == [first, second]
+
+    with get_db_connection() as conn:
+        conn.execute("DELETE FROM approvals WHERE section_id IN (?, ?)", (first, second))
+        conn.execute("DELETE FROM sections WHERE module_id = ?", (module_id,))
+        conn.execute("DELETE FROM modules WHERE id = ?", (module_id,))
+    assert not module.apply_changes(changes_since(cursor, module_id=module_id)[0], repository)
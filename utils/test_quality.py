@@ -0,0 +1,68 @@
+import sys
+import os
+# Ensure the project root is importable when running this test directly
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import pytest
+
+from utils import database
+from utils.database import init_db, get_db_connection, get_module_by_id, save_module_to_db, update_section_content
+from utils.jobs import JobQueue, SQLiteJobStore
+from utils.quality import QUALITY_COLUMNS, queue_low_quality_regeneration, score_library, score_sections
+
+OBJECTIVE = "Students will be able to explain how photosynthesis turns light into chemical energy."
+LESSON = " ".join(["Plants use light to make sugar from water and air."] * 20)
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "DB_PATH", str(tmp_path / "modules.db"))
+    init_db()
+    return tmp_path
+
+
+def test_scores_reward_clear_objectives_and_penalize_stubs():
+    good, stub, long_lesson = score_sections(
+        [OBJECTIVE, "TBD", LESSON], ["learning_objective", "learning_objective", "lesson"]
+    )
+    assert all(0 <= value <= 100 for value in good + stub + long_lesson)
+    assert good[3] == 100  # objective verb in its only sentence
+    assert good[0] > 40 > stub[0]
+    assert long_lesson[2] == 100  # inside the lesson length range
+
+
+def test_scores_are_stored_on_insert_and_edit(db):
+    module_id = save_module_to_db("Photosynthesis", [
+        {'id': 'lo1', 'title': 'Objective', 'content': OBJECTIVE, 'type': 'learning_objective'},
+    ])
+    section = get_module_by_id(module_id)['sections'][0]
+    assert section['quality_score'] == score_sections([OBJECTIVE], ['learning_objective'])[0][0]
+
+    update_section_content(section['id'], "TBD")
+    edited = get_module_by_id(module_id)['sections'][0]
+    assert edited['quality_score'] < section['quality_score']
+
+    # Rows written before scoring existed are backfilled
+    with get_db_connection() as conn:
+        conn.execute(f"UPDATE sections SET {', '.join(c + ' = NULL' for c in QUALITY_COLUMNS)}")
+    assert score_library() == 1
+    assert get_module_by_id(module_id)['sections'][0]['quality_score'] == edited['quality_score']
+    assert score_library() == 0
+
+
+def test_low_scoring_sections_are_queued_once(db):
+    module_id = save_module_to_db("Photosynthesis", [
+        {'id': 'lo1', 'title': 'Objective', 'content': OBJECTIVE, 'type': 'learning_objective'},
+        {'id': 'a1', 'title': 'Quiz', 'content': 'TBD', 'type': 'assessment'},
+    ])
+    queue = JobQueue(SQLiteJobStore(), workers=0)
+    module = get_module_by_id(module_id)
+
+    queued = queue_low_quality_regeneration(queue, module, threshold=50)
+    assert list(queued) == ['a1']
+    assert queue.get(queued['a1'])['payload'] == {
+        'namespace': f"module:{module_id}:edits", 'key': 'a1', 'text': 'TBD'
+    }
+    assert queue_low_quality_regeneration(queue, module, threshold=50) == {}
@@ -0,0 +1,90 @@
+import sys
+import os
+import sqlite3
+import threading
+# Ensure the project root is importable when running this test directly
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import pytest
+
+from utils import database, query_trace
+from utils.database import get_all_modules, get_module_by_id, init_db, save_module_to_db
+from utils.query_trace import TracingConnection, capture_queries, normalize_sql
+
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(":memory:", factory=TracingConnection)
+    conn.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, name TEXT)")
+    conn.executemany("INSERT INTO t (name) VALUES (?)", [("a",), ("b",), ("c",)])
+    yield conn
+    conn.close()
+
+
+def test_normalize_sql():
+    assert normalize_sql("SELECT *\n  FROM t WHERE name = 'it''s' AND id IN (?, ?, ?) LIMIT 10") == \
+        "SELECT * FROM t WHERE name = ? AND id IN (?) LIMIT ?"
+
+
+def test_row_counts(conn):
+    with capture_queries() as captured:
+        conn.execute("SELECT * FROM t").fetchall()
+        cursor = conn.execute("SELECT * FROM t WHERE id = ?", (1,))
+        cursor.fetchone()
+        conn.execute("UPDATE t SET name = 'x' WHERE id < 3")
+        # A single fetchone() is recorded once the transaction ends
+        conn.commit()
+    assert [(e.normalized, e.rows) for e in captured] == [
+        ("SELECT * FROM t", 3),
+        ("UPDATE t SET name = ? WHERE id < ?", 2),
+        ("SELECT * FROM t WHERE id = ?", 1),
+    ]
+    assert not conn._pending_cursors
+
+
+def test_slow_queries_are_logged_with_plan(conn, monkeypatch):
+    monkeypatch.setattr(query_trace, "SLOW_QUERY_MS", 0)
+    query_trace.slow_queries.clear()
+    conn.execute("SELECT name FROM t WHERE id = ?", (2,)).fetchall()
+    slow = query_trace.slow_queries[-1]
+    assert slow["sql"] == "SELECT name FROM t WHERE id = ?" and slow["rows"] == 1
+    assert any("USING INTEGER PRIMARY KEY" in line for line in slow["plan"])
+
+
+def test_captures_are_per_thread_and_nest(conn):
+    other = []
+
+    def run():
+        with capture_queries() as captured:
+            worker = sqlite3.connect(":memory:", factory=TracingConnection)
+            worker.execute("SELECT 1").fetchall()
+            worker.close()
+        other.extend(captured)
+
+    with capture_queries() as outer:
+        thread = threading.Thread(target=run)
+        thread.start()
+        thread.join()
+        with capture_queries() as inner:
+            conn.execute("SELECT COUNT(*) FROM t").fetchall()
+    assert [e.normalized for e in other] == ["SELECT ?"]
+    assert [e.normalized for e in inner] == ["SELECT COUNT(*) FROM t"]
+    assert [e.normalized for e in outer] == ["SELECT COUNT(*) FROM t"]
+
+
+def test_cached_connections_do_not_keep_cursors(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "DB_PATH", str(tmp_path / "modules.db"))
+    monkeypatch.setattr(database, "CONNECTION_FACTORY", TracingConnection)
+    init_db()
+    module_id = save_module_to_db("Traced", [{'id': 'c1', 'title': 'T', 'content': 'Body', 'type': 'content'}])
+    with capture_queries() as captured:
+        for _ in range(50):
+            get_all_modules()
+            get_module_by_id(module_id)
+    # Handing a connection back to the cache runs no queries of its own
+    assert captured and not any(e.normalized.startswith("PRAGMA") for e in captured)
+    traced = [e['conn'] for e in database._connections.entries.values() if isinstance(e['conn'], TracingConnection)]
+    assert traced and not any(conn._pending_cursors for conn in traced)
+    database._connections.clear()
@@ -0,0 +1,120 @@
+import sys
+import os
+import threading
+# Ensure the project root is importable when running this test directly
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import pytest
+
+from utils import database
+from utils.database import SectionMergeConflict, StaleSectionError
+from utils.repository import Repository, SQLiteRepository, create_repository
+
+SECTIONS = [
+    {"id": "s1", "title": "Intro", "content": "line one\nline two\nline three\n", "type": "lesson"},
+    {"id": "s2", "title": "Quiz", "content": "Q?", "type": "quiz", "bloom_level": "Apply"},
+]
+
+
+@pytest.fixture(params=["sqlite", "postgres"])
+def repo(request, tmp_path, monkeypatch):
+    if request.param == "postgres":
+        # See conftest.py: skipped with a reason, or failed with REQUIRE_POSTGRES=1
+        yield request.getfixturevalue("postgres_repository")
+        return
+    # Also keeps content packs written by publish_module in tmp_path
+    monkeypatch.setattr(database, "DB_PATH", str(tmp_path / "modules.db"))
+    repository = create_repository("sqlite")
+    repository.init_schema()
+    yield repository
+
+
+def test_module_round_trip(repo):
+    cursor = repo.get_change_cursor()
+    module_id = repo.save_module_to_db("Repo", SECTIONS)
+    module = repo.get_module_by_id(module_id)
+    assert module['module_title'] == "Repo" and module['status'] == 'draft'
+    assert [s['section_id'] for s in module['sections']] == ["s1", "s2"]
+    assert module['sections'][1]['bloom_level'] == "Apply"
+    assert len(module['created_at']) == 19
+    assert repo.get_module_stats(module_id) == {
+        'total_sections': 2, 'approved_count': 0, 'rejected_count': 0, 'pending_count': 2
+    }
+
+    first, second = (s['id'] for s in module['sections'])
+    repo.approve_section(first)
+    repo.reject_section(second, "too short")
+    repo.publish_module(module_id)
+    exported = repo.export_module_to_json(module_id)
+    assert [s['is_approved'] for s in exported['sections']] == [1, 0]
+    assert exported['sections'][1]['rejection_comments'] == "too short"
+    assert repo.get_module_stats(module_id)['pending_count'] == 0
+    assert repo.get_all_modules()[0]['status'] == 'published'
+    assert [m['id'] for m in repo.iter_module_exports(status='published')] == [module_id]
+
+    changes, _ = repo.changes_since(cursor, module_id=module_id)
+    assert {c['table_name'] for c in changes} == {'modules', 'sections', 'approvals'}
+    assert repo.changes_since(cursor, module_id=module_id + 1)[0] == []
+
+
+def test_versions_and_merge(repo):
+    module_id = repo.save_module_to_db("Repo", SECTIONS)
+    section_id = repo.get_module_by_id(module_id)['sections'][0]['id']
+    assert repo.update_section_content(section_id, "v2\n", expected_version=1) == 2
+    with pytest.raises(StaleSectionError):
+        repo.update_section_content(section_id, "late\n", expected_version=1)
+    assert repo.get_section_content_at_version(section_id, 1) == SECTIONS[0]['content']
+    assert len(repo.get_section_versions(section_id)) == 1
+
+    version, content = repo.save_section_edit(section_id, "v2\nmore\n", base_version=2)
+    assert version == 3
+    with pytest.raises(SectionMergeConflict):
+        repo.save_section_edit(section_id, "other\n", base_version=2)
+
+
+def test_concurrent_edits_are_serialized(repo):
+    module_id = repo.save_module_to_db("Repo", SECTIONS)
+    section_id = repo.get_module_by_id(module_id)['sections'][0]['id']
+    lines = ["line %d\n" % i for i in range(8)]
+    repo.update_section_content(section_id, "".join(lines))
+
+    def edit(i):
+        edited = list(lines)
+        edited[i] = "edited %d\n" % i
+        repo.save_section_edit(section_id, "".join(edited), base_version=2, max_attempts=20)
+
+    threads = [threading.Thread(target=edit, args=(i,)) for i in range(0, 8, 2)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    content = repo.get_sections_by_ids([section_id])[0]['content']
+    assert all("edited %d\n" % i in content for i in range(0, 8, 2))
+
+
+def test_bulk_edits_and_approvals(repo):
+    module_id = repo.save_module_to_db("Repo", SECTIONS)
+    first, second = (s['id'] for s in repo.get_module_by_id(module_id)['sections'])
+
+    assert repo.apply_edits({first: "new intro\n", second: "Q2?"}, {first: 1, second: 1}) == {first: 2, second: 2}
+    with pytest.raises(StaleSectionError):
+        repo.apply_edits({first: "late\n", second: "Q3?"}, {first: 1, second: 2})
+    sections = repo.get_module_by_id(module_id)['sections']
+    assert [s['content'] for s in sections] == ["new intro\n", "Q2?"]
+    assert [len(repo.get_section_versions(s['id'])) for s in sections] == [1, 1]
+
+    assert repo.approve_sections([first, second]) == 2
+    assert repo.get_module_stats(module_id)['approved_count'] == 2
+    assert repo.reject_sections([second], "needs work") == 1
+    exported = repo.export_module_to_json(module_id)
+    assert [s['is_approved'] for s in exported['sections']] == [1, 0]
+    assert exported['sections'][1]['rejection_comments'] == "needs work"
+
+
+def test_repository_interface_is_abstract():
+    # The backends implement every abstract method; a partial one cannot be created
+    assert SQLiteRepository.__abstractmethods__ == frozenset()
+    with pytest.raises(TypeError, match="get_module_by_id"):
+        type("Partial", (Repository,), {})()
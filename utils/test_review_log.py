@@ -0,0 +1,65 @@
+import sys
+import os
+# Ensure the project root is importable when running this test directly
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import pytest
+
+from utils import database
+from utils.database import init_db
+from utils.review_log import SQLiteReviewLog, review_event
+
+
+@pytest.fixture
+def log(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "DB_PATH", str(tmp_path / "modules.db"))
+    log = SQLiteReviewLog()
+    init_db()
+    return log
+
+
+def event(action, module_id, section_id, reviewer, minute):
+    e = review_event(action, module_id, section_id, reviewer)
+    e['created_at'] = f"2026-01-01 {9 + minute // 60:02d}:{minute % 60:02d}:00.000"
+    return e
+
+
+def test_metrics_are_maintained_incrementally(log):
+    # Two batches, as the editor flushes them; alice comes back after lunch
+    log.record([
+        event('view', 1, None, "alice", 0),
+        event('regenerate', 1, 10, "alice", 2),
+        event('regenerate', 1, 10, "alice", 3),
+        event('accept', 1, 10, "alice", 5),
+    ])
+    log.record([
+        event('view', 1, None, "bob", 20),
+        event('edit', 1, 11, "bob", 21),
+        event('reject', 1, 11, "bob", 22),
+        event('view', 1, None, "alice", 120),
+        event('accept', 1, 11, "alice", 125),
+        event('accept', 1, 11, "alice", 126),
+        event('publish', 1, None, "alice", 127),
+        event('view', 2, None, "bob", 30),
+    ])
+
+    module = log.module_metrics([1])[0]
+    assert module['events'] == 11
+    assert (module['views'], module['edits'], module['accepts'], module['publishes']) == (3, 1, 3, 1)
+    assert module['reviewers'] == 2
+    assert module['sessions'] == 3
+    assert module['approved_sections'] == 2
+    assert module['regenerations_per_approval'] == 1.0
+    # Measured from the module's first event; only the first accept counts
+    assert [s['time_to_approval'] for s in log.section_metrics(1)] == [300.0, 125 * 60.0]
+
+    summary = log.summary()
+    assert summary['modules'] == 2
+    assert summary['median_time_to_approval'] == 125 * 60.0
+    assert summary['sessions_per_module'] == 2.0
+
+    before = (log.module_metrics(), log.section_metrics(1), log.summary())
+    assert log.rebuild() == 12
+    assert (log.module_metrics(), log.section_metrics(1), log.summary()) == before
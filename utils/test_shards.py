@@ -0,0 +1,118 @@
+import sys
+import os
+import json
+# Ensure the project root is importable when running this test directly
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import pytest
+
+from utils import database, shards
+from utils.content_pack import open_pack
+from utils.database import (
+    changes_since, create_workspace, get_all_modules, get_change_cursor, get_all_modules_all_workspaces, get_module_by_id,
+    get_workspace_stats, init_db, list_workspaces, publish_module, save_module_to_db, use_workspace,
+)
+from utils.jobs import JobQueue, SQLiteJobStore
+from utils.review_log import SQLiteReviewLog, review_event
+from utils.state_store import SQLiteStateStore, module_namespace
+
+SECTIONS = [
+    {'id': 'lo1', 'title': 'Objective', 'content': 'Explain photosynthesis.', 'type': 'learning_objective'},
+    {'id': 'c1', 'title': 'Content', 'content': 'Plants turn light into sugar.', 'type': 'content'},
+]
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "DB_PATH", str(tmp_path / "modules.db"))
+    init_db()
+    return tmp_path
+
+
+def test_workspaces_are_isolated(db):
+    create_workspace("biology")
+    default_id = save_module_to_db("Default module", SECTIONS)
+    with use_workspace("biology"):
+        biology_id = save_module_to_db("Biology module", SECTIONS)
+        assert [m['module_title'] for m in get_all_modules()] == ["Biology module"]
+    assert [m['module_title'] for m in get_all_modules()] == ["Default module"]
+    # Ids are per shard
+    assert default_id == biology_id
+    assert os.path.exists(db / "workspaces" / "biology" / "modules.db")
+
+    assert list_workspaces() == ["default", "biology"]
+    assert {(m['workspace'], m['module_title']) for m in get_all_modules_all_workspaces()} == {
+        ("default", "Default module"), ("biology", "Biology module")
+    }
+    assert get_workspace_stats()["biology"]["sections"] == 2
+    with pytest.raises(ValueError):
+        create_workspace("../escape")
+
+
+def test_jobs_run_in_their_workspace(db):
+    create_workspace("biology")
+    store = SQLiteJobStore()
+    state = SQLiteStateStore()
+    queue = JobQueue(store, state_store=state, workers=0, handlers={
+        'note': lambda payload, repository, state_store: state_store.set("notes", "n", payload['text']),
+    })
+    with use_workspace("biology"):
+        job_id = queue.submit('note', {'text': "bio"})
+    assert queue.run_next() and not queue.run_next()
+    with use_workspace("biology"):
+        assert queue.get(job_id)['status'] == 'done'
+        assert state.get("notes", "n") == "bio"
+    assert state.get("notes", "n") is None
+
+
+def test_split_moves_modules_with_state_and_packs(db):
+    SQLiteStateStore().set(module_namespace(1, "edits", "a1b2c3d4e5f6"), "lo1", "draft edit")
+    moved = save_module_to_db("Moved", SECTIONS)
+    kept = save_module_to_db("Kept", SECTIONS)
+    publish_module(moved)
+    log = SQLiteReviewLog()
+    log.record([review_event('view', moved, reviewer="r1"), review_event('view', kept, reviewer="r1")])
+
+    assert shards.split_workspace("chemistry", [moved], dry_run=True)['sections'] == 2
+    assert list_workspaces() == ["default"]
+
+    mapping = db / "mapping.json"
+    mapping.write_text(json.dumps({"chemistry": [moved]}))
+    assert shards.main(["--split", str(mapping)]) == 0
+    assert [m['id'] for m in get_all_modules()] == [kept]
+    assert open_pack(moved) is None
+    with use_workspace("chemistry"):
+        assert get_module_by_id(moved)['status'] == 'published'
+        assert SQLiteStateStore().get(module_namespace(1, "edits", "a1b2c3d4e5f6"), "lo1") == "draft edit"
+        assert open_pack(moved).get_content(get_module_by_id(moved)['sections'][0]['id'])
+        assert [m['module_id'] for m in log.module_metrics()] == [moved]
+        assert log.rebuild() == 1
+    assert [m['module_id'] for m in log.module_metrics()] == [kept]
+
+    # Ids are kept, so moving a module whose id is taken there is refused
+    with use_workspace("chemistry"):
+        save_module_to_db("Chemistry", SECTIONS)
+    with pytest.raises(shards.ShardConflictError):
+        shards.split_workspace("chemistry", [kept])
+    assert [m['id'] for m in get_all_modules()] == [kept]
+
+
+def test_split_moves_the_change_log_with_the_modules(db):
+    moved = save_module_to_db("Moved", SECTIONS)
+    kept = save_module_to_db("Kept", SECTIONS)
+    publish_module(moved)
+    cursor = get_change_cursor()
+    shards.split_workspace("chemistry", [moved])
+
+    # The source keeps only the move's own delete entries for the module
+    ops = {(c['table_name'], c['op']) for c in changes_since(0, module_id=moved)[0]}
+    assert ops == {('modules', 'delete'), ('sections', 'delete'), ('approvals', 'delete')}
+    assert [c['op'] for c in changes_since(cursor)[0]] == ['delete'] * 5
+    assert {c['op'] for c in changes_since(0, module_id=kept)[0]} == {'insert'}
+    with use_workspace("chemistry"):
+        changes = changes_since(0)[0]
+        assert {c['module_id'] for c in changes} == {moved}
+        assert sorted(c['table_name'] for c in changes) == ['approvals'] * 2 + ['modules'] + ['sections'] * 2
+        assert {c['op'] for c in changes} == {'insert'}
@@ -0,0 +1,104 @@
+import sys
+import os
+# Ensure the project root is importable when running this test directly
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import pytest
+
+from utils import database
+from utils.database import init_db
+from utils.state_store import (
+    CachedStateStore, MemoryStateStore, StateStore, PostgresStateStore, SQLiteStateStore, create_state_store, module_namespace
+)
+
+
+class CountingStore(MemoryStateStore):
+    def __init__(self):
+        super().__init__()
+        self.reads = 0
+
+    def get_all(self, namespace):
+        self.reads += 1
+        return super().get_all(namespace)
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "DB_PATH", str(tmp_path / "modules.db"))
+    init_db()
+    return tmp_path
+
+
+def test_cached_store_reads_once_per_rerun():
+    backend = CountingStore()
+    backend.set("module:1:edits", "s1", "draft")
+    cached = CachedStateStore(backend)
+    assert cached.get("module:1:edits", "s1") == "draft"
+    assert cached.get_all("module:1:edits") == {"s1": "draft"}
+    assert backend.reads == 1
+
+    # Writes go through and invalidate only their namespace
+    cached.get_all("module:1:diff_summaries")
+    cached.set("module:1:edits", "s2", "second")
+    assert cached.get_all("module:1:edits") == {"s1": "draft", "s2": "second"}
+    cached.get_all("module:1:diff_summaries")
+    assert backend.reads == 3
+    cached.delete("module:1:edits", "s1")
+    assert cached.get_all("module:1:edits") == {"s2": "second"}
+
+    # Returned dicts are copies, not the cache itself
+    cached.get_all("module:1:edits")["s3"] = "local"
+    assert "s3" not in cached.get_all("module:1:edits")
+
+    # The next rerun starts with a fresh cache and sees other processes' writes
+    backend.set("module:1:edits", "s2", "changed elsewhere")
+    assert cached.get("module:1:edits", "s2") == "second"
+    assert CachedStateStore(backend).get("module:1:edits", "s2") == "changed elsewhere"
+
+
+def test_incomplete_backend_fails_at_instantiation():
+    class NoDelete(StateStore):
+        def get_all(self, namespace):
+            return {}
+
+        def set_many(self, namespace, values):
+            pass
+
+    with pytest.raises(TypeError, match="delete"):
+        NoDelete()
+
+
+def test_sqlite_store_is_shared_between_instances(db):
+    # Two instances stand in for two Streamlit worker processes
+    first, second = SQLiteStateStore(), SQLiteStateStore()
+    first.set_many("module:1:edits", {"s1": "draft", "s2": {"nested": [1, 2]}})
+    assert second.get_all("module:1:edits") == {"s1": "draft", "s2": {"nested": [1, 2]}}
+    second.set("module:1:edits", "s1", "revised")
+    assert first.get("module:1:edits", "s1") == "revised"
+    first.delete("module:1:edits")
+    assert second.get_all("module:1:edits") == {}
+
+
+def test_reviewer_drafts_are_separate(db):
+    store = SQLiteStateStore()
+    alice, bob = module_namespace(1, "edits", "alice"), module_namespace(1, "edits", "bob")
+    store.set(alice, "s1", "Alice's draft")
+    store.set(bob, "s1", "Bob's draft")
+    assert store.get(alice, "s1") == "Alice's draft"
+    assert store.get(module_namespace(1, "edits"), "s1") is None
+
+
+def test_postgres_store(postgres_repository):
+    store = create_state_store("postgres", repository=postgres_repository)
+    assert isinstance(store, PostgresStateStore)
+    store.set_many("module:1:edits", {"s1": "draft", "s2": {"nested": [1, 2]}})
+    store.set("module:1:edits", "s1", "revised")
+    assert PostgresStateStore(postgres_repository).get_all("module:1:edits") == {
+        "s1": "revised", "s2": {"nested": [1, 2]}
+    }
+    store.delete("module:1:edits", "s2")
+    assert store.get_all("module:1:edits") == {"s1": "revised"}
+    store.delete("module:1:edits")
+    assert store.get("module:1:edits", "s1") is None